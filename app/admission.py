@@ -0,0 +1,295 @@
+# app/admission.py
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+from app import profiling
+
+# --- CONFIG --- #
+CHAT_MAX_INFLIGHT = int(os.environ.get("CHAT_MAX_INFLIGHT", "16"))
+CHAT_MAX_QUEUE = int(os.environ.get("CHAT_MAX_QUEUE", "64"))
+CHAT_QUEUE_TIMEOUT = float(os.environ.get("CHAT_QUEUE_TIMEOUT", "10"))
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "8"))
+DB_CONCURRENCY = int(os.environ.get("DB_CONCURRENCY", "8"))
+STAGE_WAIT_TIMEOUT = float(os.environ.get("STAGE_WAIT_TIMEOUT", "15"))
+# /chat/batch questions get their own, smaller, share of the worker threadpool and wait longer
+BATCH_MAX_INFLIGHT = int(os.environ.get("BATCH_MAX_INFLIGHT", "4"))
+BATCH_MAX_QUEUE = int(os.environ.get("BATCH_MAX_QUEUE", "256"))
+BATCH_QUEUE_TIMEOUT = float(os.environ.get("BATCH_QUEUE_TIMEOUT", "120"))
+# LLM scheduling: a waiting call moves up one priority class per LLM_PRIORITY_AGING seconds,
+# and every LLM_COST_CHARS prompt characters count as one more unit of a session's fair share
+LLM_PRIORITY_AGING = float(os.environ.get("LLM_PRIORITY_AGING", "5"))
+LLM_COST_CHARS = int(os.environ.get("LLM_COST_CHARS", "4000"))
+
+# Most urgent first. Calls made outside any request (warm-up, scripts) are background.
+PRIORITY_CLASSES = ("interactive", "batch", "background")
+
+class Overloaded(Exception):
+    """Raised when a request is shed; the API turns it into a 429/503 with Retry-After"""
+
+    def __init__(self, status_code: int, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Caps concurrent /chat requests. Extra requests wait in a bounded queue ordered by
+    deadline (earliest first); a full queue is rejected immediately with 429 and a
+    request whose deadline passes while queued gets 503.
+    Lives on the event loop, so it is only touched from async code.
+    """
+
+    def __init__(self, max_inflight: int, max_queue: int, queue_timeout: float):
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.queued = 0
+        self._waiters = []  # heap of (deadline, seq, future); cancelled futures are skipped lazily
+        self._seq = itertools.count()
+        self._avg_service = 1.0
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_deadline": 0}
+
+    def retry_after(self) -> int:
+        # rough time until the current backlog drains
+        return max(1, math.ceil(self._avg_service * (self.queued + 1) / self.max_inflight))
+
+    @asynccontextmanager
+    async def admit(self, budget_seconds: Optional[float] = None):
+        budget = self.queue_timeout if budget_seconds is None else min(budget_seconds, self.queue_timeout)
+        await self._acquire(time.monotonic() + budget)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - start)
+            self._release()
+
+    async def _acquire(self, deadline: float):
+        if self.in_flight < self.max_inflight and self.queued == 0:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return
+        if self.queued >= self.max_queue:
+            self.stats["rejected_queue_full"] += 1
+            raise Overloaded(429, "Server is busy, please retry shortly.", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (deadline, next(self._seq), future))
+        self.queued += 1
+        self.stats["queued"] += 1
+        try:
+            # the slot is handed over by _release (in_flight is not decremented in between)
+            await asyncio.wait_for(future, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self.stats["rejected_deadline"] += 1
+            raise Overloaded(503, "Request timed out waiting for capacity.", self.retry_after())
+        except asyncio.CancelledError:
+            # client went away; if a slot was already handed to us, pass it on
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+        finally:
+            self.queued -= 1
+        self.stats["admitted"] += 1
+
+    def _release(self):
+        now = time.monotonic()
+        while self._waiters:
+            deadline, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            if deadline <= now:
+                # its wait_for will fire momentarily; don't hand it a slot it can't use
+                continue
+            future.set_result(True)
+            return
+        self.in_flight -= 1
+
+class StageLimiter:
+    """
+    Concurrency limit for one pipeline stage (LLM calls, DB queries).
+    Stages run in worker threads, hence a threading semaphore with a bounded wait.
+    """
+
+    def __init__(self, name: str, limit: int, wait_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.wait_timeout = wait_timeout
+        self._sem = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.stats = {"active": 0, "calls": 0, "rejected": 0}
+
+    @contextmanager
+    def slot(self):
+        wait_start = time.perf_counter()
+        if not self._sem.acquire(timeout=self.wait_timeout):
+            with self._lock:
+                self.stats["rejected"] += 1
+            raise Overloaded(503, f"The {self.name} stage is at capacity, please retry shortly.",
+                             max(1, math.ceil(self.wait_timeout / 2)))
+        with self._lock:
+            self.stats["active"] += 1
+            self.stats["calls"] += 1
+        profiling.record("slot", stage=self.name, wait_ms=round((time.perf_counter() - wait_start) * 1000, 1))
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stats["active"] -= 1
+            self._sem.release()
+
+# (priority class, session id) of the request running in this context
+_llm_caller: contextvars.ContextVar = contextvars.ContextVar("llm_caller", default=("background", None))
+
+@contextmanager
+def llm_priority(priority: str, session_id: Optional[str] = None):
+    """LLM calls made inside this block are scheduled as `priority`, fair-shared per session"""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"unknown priority class '{priority}'")
+    token = _llm_caller.set((priority, session_id))
+    try:
+        yield
+    finally:
+        _llm_caller.reset(token)
+
+class _LLMWaiter:
+    __slots__ = ("rank", "session", "start_tag", "finish_tag", "enqueued", "event", "granted")
+
+    def __init__(self, rank: int, session: str, start_tag: float, finish_tag: float):
+        self.rank = rank
+        self.session = session
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+        self.granted = False
+
+class LLMScheduler:
+    """
+    Concurrency limit for LLM calls that decides who goes next instead of leaving it to the
+    semaphore. A free slot goes to the waiter with the best priority class (interactive >
+    batch > background, improved by one class per `aging` seconds waited, so nothing waits
+    forever), and within a class to the smallest fair-queuing finish tag: each session's
+    calls are tagged with its accumulated cost, so one session's burst or a long summarization
+    prompt can't hold back another session's short Cypher-generation call.
+    Same slot() / stats interface as StageLimiter.
+    """
+
+    def __init__(self, name: str, limit: int, wait_timeout: float, aging: float = LLM_PRIORITY_AGING,
+                 cost_chars: int = LLM_COST_CHARS):
+        self.name = name
+        self.limit = limit
+        self.wait_timeout = wait_timeout
+        self.aging = aging
+        self.cost_chars = cost_chars
+        self._lock = threading.Lock()
+        self._waiters = []  # few enough to scan on every grant (ranks change as waiters age)
+        self._session_tags = {}
+        self._virtual_time = 0.0
+        self.stats = {"active": 0, "calls": 0, "rejected": 0}
+        self.classes = {c: {"queue_depth": 0, "calls": 0, "queued": 0, "rejected": 0,
+                            "wait_ms_total": 0.0, "max_wait_ms": 0.0} for c in PRIORITY_CLASSES}
+
+    def _tags(self, session: str, prompt_chars: int):
+        # start-time fair queuing: a session's next call starts where its previous one finished
+        start = max(self._session_tags.get(session, 0.0), self._virtual_time)
+        finish = start + 1.0 + prompt_chars / self.cost_chars
+        self._session_tags[session] = finish
+        return start, finish
+
+    def _grant(self, waiter: _LLMWaiter):
+        self._virtual_time = max(self._virtual_time, waiter.start_tag)
+        if len(self._session_tags) > 1000:
+            # sessions that are all caught up carry no state worth keeping
+            self._session_tags = {s: t for s, t in self._session_tags.items() if t > self._virtual_time}
+
+    def _next_waiter(self) -> Optional[_LLMWaiter]:
+        now = time.monotonic()
+        best, best_key = None, None
+        for waiter in self._waiters:
+            rank = waiter.rank - int((now - waiter.enqueued) / self.aging) if self.aging > 0 else waiter.rank
+            key = (max(rank, 0), waiter.finish_tag, waiter.enqueued)
+            if best_key is None or key < best_key:
+                best, best_key = waiter, key
+        return best
+
+    def _record_wait(self, priority: str, waited: float):
+        wait_ms = waited * 1000
+        stats = self.classes[priority]
+        stats["calls"] += 1
+        stats["wait_ms_total"] += wait_ms
+        stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+
+    @contextmanager
+    def slot(self, prompt_chars: int = 0):
+        priority, session_id = _llm_caller.get()
+        session = f"{priority}:{session_id or 'anonymous'}"
+        wait_start = time.perf_counter()
+        with self._lock:
+            start_tag, finish_tag = self._tags(session, prompt_chars)
+            waiter = _LLMWaiter(PRIORITY_CLASSES.index(priority), session, start_tag, finish_tag)
+            if self.stats["active"] < self.limit and not self._waiters:
+                waiter.granted = True
+                self._grant(waiter)
+                self.stats["active"] += 1
+            else:
+                self._waiters.append(waiter)
+                self.classes[priority]["queue_depth"] += 1
+                self.classes[priority]["queued"] += 1
+        if not waiter.granted:
+            waiter.event.wait(self.wait_timeout)
+            with self._lock:
+                if waiter in self._waiters:
+                    # still queued: timed out (a grant removes the waiter under the lock)
+                    self._waiters.remove(waiter)
+                    self.classes[priority]["queue_depth"] -= 1
+                    self.classes[priority]["rejected"] += 1
+                    self.stats["rejected"] += 1
+                    raise Overloaded(503, f"The {self.name} stage is at capacity, please retry shortly.",
+                                     max(1, math.ceil(self.wait_timeout / 2)))
+        waited = time.perf_counter() - wait_start
+        with self._lock:
+            self.stats["calls"] += 1
+            self._record_wait(priority, waited)
+        profiling.record("slot", stage=self.name, priority=priority, wait_ms=round(waited * 1000, 1))
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            waiter = self._next_waiter()
+            if waiter is None:
+                self.stats["active"] -= 1
+                return
+            # the slot passes straight to the waiter, so "active" doesn't change
+            self._waiters.remove(waiter)
+            self.classes[PRIORITY_CLASSES[waiter.rank]]["queue_depth"] -= 1
+            waiter.granted = True
+            self._grant(waiter)
+            waiter.event.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "classes": {c: {**{k: v for k, v in s.items() if k != "wait_ms_total"},
+                                "avg_wait_ms": round(s["wait_ms_total"] / s["calls"], 1) if s["calls"] else 0.0,
+                                "max_wait_ms": round(s["max_wait_ms"], 1)}
+                            for c, s in self.classes.items()},
+            }
+
+chat_admission = AdmissionController(CHAT_MAX_INFLIGHT, CHAT_MAX_QUEUE, CHAT_QUEUE_TIMEOUT)
+batch_admission = AdmissionController(BATCH_MAX_INFLIGHT, BATCH_MAX_QUEUE, BATCH_QUEUE_TIMEOUT)
+llm_limiter = LLMScheduler("LLM", LLM_CONCURRENCY, STAGE_WAIT_TIMEOUT)
+db_limiter = StageLimiter("database", DB_CONCURRENCY, STAGE_WAIT_TIMEOUT)
@@ -0,0 +1,88 @@
+# app/answer_renderer.py
+import re
+from typing import Any, Dict, List, Optional
+
+# Results larger than this still go to the LLM summary
+MAX_TEMPLATED_ROWS = 10
+MAX_TEMPLATED_METRICS = 3
+
+def humanize_column(column: str) -> str:
+    """'SUM(r.goalAssist)' -> 'goal assist', 'total_goals' -> 'total goals'; other expressions are kept as-is"""
+    props = re.findall(r"\b[A-Za-z_]\w*\.([A-Za-z_]\w*)", column)
+    if re.fullmatch(r"[A-Za-z_]\w*", column.strip()):
+        base = column.strip()
+    elif len(props) == 1:
+        base = props[0]
+    else:
+        return column
+    base = re.sub(r"(?<=[a-z0-9])(?=[A-Z][a-z])", " ", base).replace("_", " ")
+    # keep acronyms such as xG / xA as written
+    words = [w if any(c.isupper() for c in w[1:]) else w.lower() for w in base.split()]
+    return " ".join(words) or column
+
+def format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, int):
+        return f"{value:,}"
+    if isinstance(value, float):
+        return f"{value:,.0f}" if value.is_integer() else f"{value:,.2f}"
+    return str(value)
+
+def _is_identifier_or_time(column: str) -> bool:
+    # ids, dates and timestamps are numbers but not metrics ("1,691,780,400 date")
+    name = re.split(r"[.(]", column.strip().rstrip(")"))[-1]
+    return bool(re.search(r"(?:^|_)(?:id|date|timestamp|time)$", name.lower())
+                or re.search(r"[a-z0-9](?:Id|ID|Date|Timestamp)$", name))
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _metrics(row: Dict[str, Any], columns: List[str]) -> str:
+    return ", ".join(f"{format_value(row[c])} {humanize_column(c)}" for c in columns)
+
+def render_trivial_answer(rows: Any) -> Optional[str]:
+    """
+    Deterministic answer for results that don't need a paragraph: a single scalar,
+    a short single-column list, one labelled row, or a short table of a label plus a few numbers.
+    Returns None when the shape isn't trivially answerable (or has id / date columns).
+    """
+    if not isinstance(rows, list) or not rows or len(rows) > MAX_TEMPLATED_ROWS:
+        return None
+    if not all(isinstance(r, dict) for r in rows):
+        return None
+    columns = list(rows[0].keys())
+    if any(list(r.keys()) != columns for r in rows):
+        return None
+    if any(_is_identifier_or_time(c) for c in columns):
+        return None
+
+    # 1. single scalar
+    if len(rows) == 1 and len(columns) == 1:
+        value = rows[0][columns[0]]
+        if isinstance(value, (dict, list)) or value is None:
+            return None
+        return f"**{format_value(value)}** ({humanize_column(columns[0])})."
+
+    # 2. short list of one column: team / player names
+    if len(columns) == 1:
+        values = [r[columns[0]] for r in rows]
+        if any(isinstance(v, (dict, list)) or v is None for v in values):
+            return None
+        return f"{humanize_column(columns[0]).capitalize()}:\n" + "\n".join(f"• {format_value(v)}" for v in values)
+
+    labels = [c for c in columns if isinstance(rows[0][c], str)]
+    numbers = [c for c in columns if all(_is_number(r[c]) for r in rows)]
+    if len(labels) != 1 or not numbers or len(numbers) > MAX_TEMPLATED_METRICS:
+        return None
+    if len(labels) + len(numbers) != len(columns):
+        return None
+    label = labels[0]
+
+    # 3. one labelled row: "Erling Haaland: 27 goals, 5 goal assist"
+    if len(rows) == 1:
+        return f"**{rows[0][label]}**: {_metrics(rows[0], numbers)}."
+
+    # 4. short ranked table
+    lines = [f"{i}. **{r[label]}** — {_metrics(r, numbers)}" for i, r in enumerate(rows, 1)]
+    return "\n".join(lines)
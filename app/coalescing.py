@@ -0,0 +1,64 @@
+# app/coalescing.py
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict, List
+
+def normalize_question(text: str) -> str:
+    """'  Who   scored most goals?? ' -> 'who scored most goals'"""
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip("?!. ")
+
+def coalescing_key(message: str, history: List[Dict[str, Any]] = None, history_window: int = 6,
+                   variant: str = "") -> str:
+    """
+    Requests share a key when the normalized question and the part of the
+    history the pipeline actually reads (the last `history_window` turns) match.
+    `variant` separates requests that ask for a different kind of answer.
+    """
+    tail = [
+        {"role": m.get("role", "user"), "content": normalize_question(str(m.get("content", "")))}
+        for m in (history or [])[-history_window:]
+    ]
+    payload = json.dumps({"q": normalize_question(message), "h": tail, "v": variant}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller (leader) runs the work,
+    callers arriving while it is in flight await the leader's result instead of repeating it.
+    Per event loop, so per worker process.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "in_flight": 0}
+
+    async def run(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            # shield: a follower disconnecting must not cancel the leader's work
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.stats["leaders"] += 1
+        self.stats["in_flight"] = len(self._inflight)
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # mark retrieved so a leader without followers doesn't log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            self.stats["in_flight"] = len(self._inflight)
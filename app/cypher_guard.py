@@ -1,6 +1,10 @@
 # app/retriever.py
 from app.neo4j_client import db
-import re, json
+from app.admission import Overloaded, db_limiter
+from app import profiling
+import re, json, hashlib, threading
+from typing import Optional
+from collections import Counter
 
 # Security: disallow writes/admin and multiple statements
 _DISALLOWED = [
@@ -47,6 +51,68 @@ def uses_only_allowed_labels_and_rels(query: str):
             return False, f"Unknown relationship type '{r}'"
     return True, None
 
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NODE_BINDING = re.compile(r"\(\s*([A-Za-z_]\w*)\s*:\s*([A-Za-z_]\w*)")
+_REL_BINDING = re.compile(r"\[\s*([A-Za-z_]\w*)\s*:\s*([A-Za-z_]\w*)\s*(?![|\w])")
+_PROPERTY_ACCESS = re.compile(r"(?<![\w$.])([A-Za-z_]\w*)\.([A-Za-z_]\w*)")
+
+def uses_only_known_properties(query: str):
+    """
+    Rejects property names that don't exist on the bound label / relationship type
+    (e.g. r.xg on PLAYED_IN), using the cached schema catalog instead of the database.
+    """
+    stripped = _STRING_LITERAL.sub("''", query)
+
+    bindings = {}
+    ambiguous = set()
+    for pattern, kind in ((_NODE_BINDING, "label"), (_REL_BINDING, "rel")):
+        for var, type_name in pattern.findall(stripped):
+            if bindings.get(var, (kind, type_name)) != (kind, type_name):
+                ambiguous.add(var)
+            bindings[var] = (kind, type_name)
+
+    for var, prop in _PROPERTY_ACCESS.findall(stripped):
+        if var not in bindings or var in ambiguous:
+            continue
+        kind, type_name = bindings[var]
+        known = db.get_label_properties(type_name) if kind == "label" else db.get_rel_properties(type_name)
+        if not known:
+            # unknown type or empty catalog: nothing to validate against
+            continue
+        if prop not in known:
+            target = f"(:{type_name})" if kind == "label" else f"[:{type_name}]"
+            return False, (f"Unknown property '{var}.{prop}' on {target}. "
+                           f"Available properties: {', '.join(sorted(known))}")
+    return True, None
+
+_SEASON_FILTER = re.compile(r"([A-Za-z_]\w*)\.season\s+IN\s+\$seasons\b", flags=re.IGNORECASE)
+_SEASONED_TYPE = re.compile(r":\s*(Match|PLAYED_IN)\b")
+
+def _unscoped_season_vars(stripped: str):
+    """(Match / PLAYED_IN variables lacking `.season IN $seasons`, variables that have it)"""
+    scoped = set(_SEASON_FILTER.findall(stripped))
+    required = ({var for var, label in _NODE_BINDING.findall(stripped) if label == "Match"}
+                or {var for var, rel in _REL_BINDING.findall(stripped) if rel == "PLAYED_IN"})
+    return sorted(required - scoped), scoped
+
+def ensure_season_scoped(query: str):
+    """
+    With several seasons in the graph, every Match (or PLAYED_IN edge, when the Match is
+    anonymous) must be filtered with `<var>.season IN $seasons`, so a query only ever
+    scans the requested seasons.
+    """
+    stripped = _STRING_LITERAL.sub("''", query)
+    if not _SEASONED_TYPE.search(stripped):
+        return True, None
+
+    missing, scoped = _unscoped_season_vars(stripped)
+    if missing or not scoped:
+        example = missing[0] if missing else "m"
+        return False, (f"Query must be limited to the requested seasons: add "
+                       f"`WHERE ($seasons IS NULL OR {example}.season IN $seasons)` for every Match"
+                       + (f" (unscoped: {', '.join(missing)})" if missing else "") + ".")
+    return True, None
+
 def validate_uses_score_parsing(query: str):
     # UPDATED: Only flag these words if they appear as properties (preceded by a dot)
     # OR if they are the specific hallucinated snake_case properties.
@@ -55,17 +121,448 @@ def validate_uses_score_parsing(query: str):
     if re.search(r"\b(home_team_goals|away_team_goals)\b", query, flags=re.IGNORECASE):
          return False, "Query uses hallucinated properties (home_team_goals/away_team_goals). Use split(m.score, '-') instead."
 
-    # 2. Check for season property (common hallucination)
-    if re.search(r"\.season\b", query, flags=re.IGNORECASE):
-        return False, "Query references 'season' property which does not exist."
-
-    # 3. Check for object-like access to homeTeam/awayTeam (e.g. m.homeTeam)
+    # 2. Check for object-like access to homeTeam/awayTeam (e.g. m.homeTeam)
     # We allow the WORD 'homeTeam' (as a variable), but not PROPERTY '.homeTeam'
     if re.search(r"\.(homeTeam|awayTeam)\b", query, flags=re.IGNORECASE):
         return False, "Query references non-existent properties (m.homeTeam / m.awayTeam). Use relationships -[:HOME_TEAM]-> instead."
 
     return True, None
 
+# --- LITERAL PARAMETERIZATION --- #
+# Neo4j caches plans by query text, so 'Salah' and 'Haaland' variants of one question should
+# reach it as the same text with different parameters.
+_TOKEN = re.compile(r"""
+    (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<word>`[^`]*`|[A-Za-z_$][\w$]*)
+  | (?P<number>\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.]))
+  | (?P<space>\s+)
+  | (?P<other>\.\.|.)
+""", re.VERBOSE | re.DOTALL)
+# Cypher's string escapes; \uXXXX / \UXXXXXXXX are handled in _string_value
+_STRING_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "'": "'", '"': '"', "\\": "\\"}
+_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)", re.DOTALL)
+# numbers after these stay literal (LIMIT/SKIP for readability, .. is a var-length bound)
+_KEEP_NUMBER_AFTER = {"LIMIT", "SKIP", ".."}
+# clauses that end a RETURN / WITH projection list
+_PROJECTION_END = {"RETURN", "WITH", "ORDER", "SKIP", "LIMIT", "WHERE", "MATCH", "OPTIONAL", "UNWIND",
+                   "UNION", "CALL", "CREATE", "MERGE", "SET", "DELETE", "DETACH", "REMOVE", "FOREACH"}
+QUERY_SHAPE_MAX = 2000
+
+def _string_value(token: str) -> Optional[str]:
+    """The value of a string literal token; None if it has an escape we don't decode (left as a literal)"""
+    unknown = False
+
+    def decode(match):
+        nonlocal unknown
+        escape = match.group(1)
+        if escape[0] in "uU" and len(escape) > 1 and int(escape[1:], 16) <= 0x10FFFF:
+            return chr(int(escape[1:], 16))
+        if escape not in _STRING_ESCAPES:
+            unknown = True
+            return escape
+        return _STRING_ESCAPES[escape]
+
+    value = _ESCAPE.sub(decode, token[1:-1])
+    return None if unknown else value
+
+def _number_value(token: str):
+    return float(token) if any(c in token for c in ".eE") else int(token)
+
+def parameterize_literals(query: str, params: dict = None):
+    """
+    Rewrites string and numeric literals into $lit0, $lit1, ... (in order of appearance)
+    and drops comments and extra whitespace, so queries that differ only in their literals
+    share one canonical text. A list of literals after IN becomes a single parameter,
+    so the shape doesn't depend on how many names were asked about.
+    Returns (canonical query, params including the extracted literals).
+    """
+    params = dict(params or {})
+    query = _alias_projections(query)
+    tokens = []  # (kind, text)
+    for match in _TOKEN.finditer(query):
+        kind = match.lastgroup
+        if kind == "comment":
+            continue
+        if kind == "space":
+            if tokens and tokens[-1][0] != "space":
+                tokens.append(("space", " "))
+            continue
+        tokens.append((kind, match.group()))
+
+    names = (f"lit{i}" for i in range(len(tokens) + len(params)) if f"lit{i}" not in params)
+    out = []
+    significant = []  # previous non-space token texts in the output
+    i = 0
+    while i < len(tokens):
+        kind, text = tokens[i]
+        if kind == "other" and text == "[" and significant and significant[-1].upper() == "IN":
+            values, j = _literal_list(tokens, i)
+            if values is not None:
+                name = next(names)
+                params[name] = values
+                out.append(f"${name}")
+                significant.append(f"${name}")
+                i = j
+                continue
+        value = _string_value(text) if kind == "string" else None
+        if (kind == "string" and value is not None) or (kind == "number" and not _keep_number(out, significant)):
+            name = next(names)
+            params[name] = value if kind == "string" else _number_value(text)
+            text = f"${name}"
+        out.append(text)
+        if kind != "space":
+            significant.append(text)
+        i += 1
+    return "".join(out).strip(), params
+
+def _alias_projections(query: str) -> str:
+    """
+    Neo4j names an unaliased RETURN / WITH item after its text, so an item the rewrite
+    would change (a literal, a comment, a line break) gets `AS `<original text>``
+    to keep the column name the query asked for.
+    """
+    inserts = []
+    depth = 0
+    item = None  # (kind, text, start, end) of the current projection item; None outside one
+    last_word = None
+
+    def close():
+        if not item or (len(item) >= 2 and item[-2][1].upper() == "AS"):
+            return
+        text = query[item[0][2]:item[-1][3]]
+        if any(kind in ("string", "number", "comment") for kind, *_ in item) or re.search(r"[^\S ]| {2}", text):
+            inserts.append((item[-1][3], " AS `" + text.replace("`", "``") + "`"))
+
+    for match in _TOKEN.finditer(query):
+        kind, text = match.lastgroup, match.group()
+        if kind == "space":
+            continue
+        upper = text.upper() if kind == "word" else None
+        if depth == 0 and upper in _PROJECTION_END and not (upper == "WITH" and last_word in ("STARTS", "ENDS")):
+            close()
+            item = [] if upper in ("RETURN", "WITH") else None
+        elif item is not None and depth == 0 and text == ",":
+            close()
+            item = []
+        elif item == [] and upper == "DISTINCT":
+            pass
+        elif item is not None:
+            item.append((kind, text, match.start(), match.end()))
+        if kind == "other":
+            depth += 1 if text in "([{" else -1 if text in ")]}" else 0
+        if kind == "word":
+            last_word = upper
+    close()
+
+    for position, alias in reversed(inserts):
+        query = query[:position] + alias + query[position:]
+    return query
+
+def _keep_number(out, significant) -> bool:
+    if significant and significant[-1].upper() in _KEEP_NUMBER_AFTER:
+        return True
+    # [:PLAYED_IN*2] / [*1..3]: a '*' glued to both the pattern and the number is a var-length bound,
+    # while `r.x * 100` is a multiplication
+    return len(out) >= 2 and out[-1] == "*" and out[-2] != " "
+
+def _literal_list(tokens, start):
+    """Values of a `[lit, lit, ...]` list starting at tokens[start], and the index after it"""
+    values = []
+    expect_value = True
+    i = start + 1
+    while i < len(tokens):
+        kind, text = tokens[i]
+        if kind == "space":
+            pass
+        elif expect_value and kind in ("string", "number"):
+            value = _string_value(text) if kind == "string" else _number_value(text)
+            if value is None:
+                return None, start
+            values.append(value)
+            expect_value = False
+        elif not expect_value and text == ",":
+            expect_value = True
+        elif text == "]" and (not expect_value or not values):
+            return values, i + 1
+        else:
+            return None, start
+        i += 1
+    return None, start
+
+def query_shape_key(canonical_query: str) -> str:
+    """Stable id of a canonical query text (usable as a cache key together with the params)"""
+    return hashlib.sha1(canonical_query.encode("utf-8")).hexdigest()[:16]
+
+class QueryShapeStats:
+    """Executions vs distinct canonical shapes; a high reuse ratio means Neo4j plan-cache hits"""
+
+    def __init__(self, max_shapes: int = QUERY_SHAPE_MAX):
+        self.max_shapes = max_shapes
+        self.executions = 0
+        self.untracked = 0
+        self._counts = Counter()
+        self._texts = {}
+        self._lock = threading.Lock()
+
+    def record(self, canonical_query: str) -> str:
+        key = query_shape_key(canonical_query)
+        with self._lock:
+            self.executions += 1
+            if key in self._counts or len(self._counts) < self.max_shapes:
+                self._counts[key] += 1
+                self._texts.setdefault(key, canonical_query)
+            else:
+                self.untracked += 1
+        return key
+
+    def snapshot(self, top: int = 5):
+        with self._lock:
+            distinct = len(self._counts)
+            return {
+                "executions": self.executions,
+                "distinct_shapes": distinct,
+                "untracked_executions": self.untracked,
+                "reuse_ratio": round(1 - distinct / self.executions, 3) if self.executions else 0.0,
+                "top_shapes": [{"shape": key, "executions": n, "query": self._texts[key][:300]}
+                               for key, n in self._counts.most_common(top)],
+            }
+
+query_shapes = QueryShapeStats()
+
+# --- LOCAL REPAIR --- #
+# The mistakes the checks above diagnose have one correct form each, so they are rewritten
+# here instead of paying for another LLM round-trip.
+_CLAUSE_WORDS = {"MATCH", "OPTIONAL", "WHERE", "WITH", "RETURN", "UNWIND", "ORDER", "SKIP", "LIMIT", "UNION", "CALL"}
+_OPENERS, _CLOSERS = "([{", ")]}"
+_SCORE_PROPERTY = re.compile(r"(?<![\w$.])([A-Za-z_]\w*)\.(home|away)_team_goals\b", flags=re.IGNORECASE)
+_SCORE_ALIAS = re.compile(r"\b(home|away)_team_goals\b", flags=re.IGNORECASE)
+_SIDE_PROPERTY = re.compile(r"(?<![\w$.])([A-Za-z_]\w*)\.(home|away)Team(?:\.name)?\b", flags=re.IGNORECASE)
+_SEASON_LITERAL = re.compile(r"(?:19|20)?\d{2}\s*[-/]\s*(?:19|20)?\d{2}")
+
+def _clauses(query: str):
+    """Top-level clauses as (KEYWORD, start, end); keywords inside (), [], {} or strings don't count"""
+    clauses = []
+    depth = 0
+    previous = ""
+    for match in _TOKEN.finditer(query):
+        kind, text = match.lastgroup, match.group()
+        if kind == "other" and text in _OPENERS:
+            depth += 1
+        elif kind == "other" and text in _CLOSERS:
+            depth -= 1
+        elif kind == "word" and depth == 0:
+            word = text.upper()
+            # OPTIONAL MATCH is one clause; STARTS WITH / ENDS WITH are operators
+            if word in _CLAUSE_WORDS and not (word == "MATCH" and previous == "OPTIONAL") \
+                    and not (word == "WITH" and previous in ("STARTS", "ENDS")):
+                if clauses:
+                    clauses[-1][2] = match.start()
+                clauses.append([word, match.start(), len(query)])
+            previous = word
+    return [tuple(c) for c in clauses]
+
+def _binding_clause(query: str, pattern: str):
+    """The first MATCH clause binding `pattern` (a regex), and the clause after it (or None)"""
+    clauses = _clauses(query)
+    for i, (word, start, end) in enumerate(clauses):
+        if word in ("MATCH", "OPTIONAL") and re.search(pattern, query[start:end]):
+            return (start, end), (clauses[i + 1] if i + 1 < len(clauses) else None)
+    return None, None
+
+def _add_pattern(query: str, var: str, pattern: str):
+    """Appends `, pattern` to the MATCH clause that binds `var`; None if there is none"""
+    clause, _ = _binding_clause(query, rf"\(\s*{re.escape(var)}\s*[:){{\s]")
+    if clause is None:
+        return None
+    end = len(query[:clause[1]].rstrip())
+    return query[:end] + f", {pattern}" + query[end:]
+
+def _repair_side_properties(query: str, fixes: list) -> str:
+    # m.homeTeam / m.homeTeam.name -> the team node across HOME_TEAM (reused if already matched)
+    for var, side in sorted({(v, s.lower()) for v, s in _SIDE_PROPERTY.findall(query)}):
+        rel = f"{side.upper()}_TEAM"
+        existing = re.search(rf"\(\s*{re.escape(var)}\s*(?::\s*Match\s*)?\)\s*-\s*\[\s*\w*\s*:\s*{rel}\s*\]"
+                             rf"\s*->\s*\(\s*([A-Za-z_]\w*)", query)
+        team = existing.group(1) if existing else f"{var}_{side}"
+        if not existing:
+            added = _add_pattern(query, var, f"({var})-[:{rel}]->({team}:Team)")
+            if added is None:
+                continue
+            query = added
+        query = re.sub(rf"(?<![\w$.]){re.escape(var)}\.{side}Team(?:\.name)?\b", f"{team}.name", query,
+                       flags=re.IGNORECASE)
+        fixes.append(f"{var}.{side}Team")
+    return query
+
+def _repair_score_properties(query: str, fixes: list) -> str:
+    # m.home_team_goals -> the parsed score; the same words used as aliases are renamed
+    if _SCORE_PROPERTY.search(query):
+        query = _SCORE_PROPERTY.sub(
+            lambda m: f"toInteger(split({m.group(1)}.score, '-')[{0 if m.group(2).lower() == 'home' else 1}])", query)
+        fixes.append("score_parsing")
+    if _SCORE_ALIAS.search(query):
+        query = _SCORE_ALIAS.sub(lambda m: f"{m.group(1).lower()}_goals", query)
+        fixes.append("score_alias")
+    return query
+
+def _repair_season_literals(query: str, fixes: list) -> str:
+    # '2023/24', '23-24', '2023-2024' -> '2023-24', the stored form
+    from app.seasons import normalize_season
+
+    def fix(match):
+        text = match.group()
+        value = _string_value(text)
+        season = normalize_season(value) if value and _SEASON_LITERAL.fullmatch(value.strip()) else None
+        if not season or season == value:
+            return text
+        fixes.append(f"season '{value}'")
+        return f"'{season}'"
+
+    return _STRING_LITERAL.sub(fix, query)
+
+def _repair_season_scope(query: str, fixes: list) -> str:
+    # adds `<var>.season IN $seasons` to the MATCH that binds each unscoped Match / PLAYED_IN
+    missing, _ = _unscoped_season_vars(_STRING_LITERAL.sub("''", query))
+    for var in missing:
+        binding = rf"(\(|\[)\s*{re.escape(var)}\s*:\s*(Match|PLAYED_IN)\b"
+        clause, following = _binding_clause(query, binding)
+        if clause is None:
+            continue
+        condition = f"($seasons IS NULL OR {var}.season IN $seasons)"
+        if following and following[0] == "WHERE":
+            body_start = following[1] + len("WHERE")
+            body_end = len(query[:following[2]].rstrip())
+            query = (query[:body_start] + f" {condition} AND ({query[body_start:body_end].strip()})"
+                     + query[body_end:])
+        else:
+            end = len(query[:clause[1]].rstrip())
+            query = query[:end] + f" WHERE {condition}" + query[end:]
+        fixes.append(f"{var}.season scope")
+    return query
+
+def _repair_return(query: str, fixes: list) -> str:
+    # a query ending in WITH meant RETURN; otherwise return the matched variables
+    clauses = _clauses(query)
+    if not clauses or any(word == "RETURN" for word, _, _ in clauses):
+        return query
+    word, start, _ = clauses[-1]
+    if word == "WITH":
+        fixes.append("WITH -> RETURN")
+        return query[:start] + "RETURN" + query[start + len("WITH"):]
+    stripped = _STRING_LITERAL.sub("''", query)
+    variables = list(dict.fromkeys(var for var, _ in _NODE_BINDING.findall(stripped)))
+    if not variables or word not in ("MATCH", "OPTIONAL", "WHERE"):
+        return query
+    fixes.append("RETURN added")
+    return query.rstrip() + f"\nRETURN {', '.join(variables)}"
+
+def repair_cypher(query: str, params: dict = None):
+    """
+    Deterministic fixes for the mistakes the guard rejects (trailing semicolon, m.homeTeam,
+    home_team_goals, missing RETURN, season format / scope).
+    Returns (query, fixes); fixes is empty when nothing was changed.
+    """
+    fixes = []
+    repaired = query.strip()
+    if repaired.endswith(";"):
+        repaired = repaired.rstrip(";").rstrip()
+        fixes.append("trailing semicolon")
+    repaired = _repair_side_properties(repaired, fixes)
+    repaired = _repair_score_properties(repaired, fixes)
+    repaired = _repair_season_literals(repaired, fixes)
+    if (params or {}).get("seasons") and _SEASONED_TYPE.search(_STRING_LITERAL.sub("''", repaired)):
+        repaired = _repair_season_scope(repaired, fixes)
+    repaired = _repair_return(repaired, fixes)
+    return repaired, fixes
+
+# Error kinds (see classify_cypher_error) that a rewritten query can plausibly fix;
+# "unknown" is retried too, as every failure was before errors were classified
+LLM_RETRYABLE_ERRORS = {"syntax", "schema", "semantic", "parameter", "too_long", "unknown"}
+
+_NEO4J_CODE = re.compile(r"\bNeo\.(?:ClientError|ClientNotification|TransientError|DatabaseError)\.[\w.]+")
+# Neo.ClientError.<category>.<title> -> kind; looked up by the full code, then by category
+_CODE_KINDS = {
+    "Neo.ClientError.Statement.SyntaxError": "syntax",
+    "Neo.ClientError.Statement.ParameterMissing": "parameter",
+    "Neo.ClientError.Statement.AccessMode": "forbidden",
+    "Neo.ClientError.Security": "forbidden",
+    "Neo.ClientError.Schema": "schema",
+    "Neo.ClientError.Statement": "semantic",
+    "Neo.ClientError.Transaction": "unavailable",
+    "Neo.ClientError.Cluster": "unavailable",
+    "Neo.ClientError.Database": "unavailable",
+}
+
+def classify_cypher_error(message: str, code: Optional[str] = None) -> str:
+    """
+    Buckets an execute_safe_cypher_and_format_results / Neo4j error: empty (ran, matched
+    nothing), forbidden (write/admin operation), unavailable (transient errors, timeouts,
+    connection), syntax, schema (unknown label/property/relationship, season scope, score
+    parsing, RETURN), parameter (a $param wasn't passed), semantic (types, variables,
+    functions), too_long, or unknown. Neo4j errors are classified by their status code
+    (`code`, or the one in the message), the guard's own messages by their text.
+    """
+    text = (message or "").lower()
+    if text.startswith("no results"):
+        return "empty"
+    if "disallowed" in text or "multiple statements" in text:
+        return "forbidden"
+    if text == "query too long.":
+        return "too_long"
+    if any(k in text for k in ("unknown property", "unknown relationship", "requested seasons",
+                               "hallucinated", "non-existent properties", "return clause")):
+        return "schema"
+
+    found = _NEO4J_CODE.search(message or "")
+    code = code or (found.group() if found else None)
+    if code:
+        if code.startswith("Neo.TransientError."):
+            return "unavailable"
+        category = ".".join(code.split(".")[:3])
+        return _CODE_KINDS.get(code) or _CODE_KINDS.get(category) or "unknown"
+
+    # driver errors without a status code (connection, routing, timeouts)
+    if any(k in text for k in ("couldn't connect", "unable to retrieve routing", "failed to establish",
+                               "serviceunavailable", "session expired", "defunct connection",
+                               "connection", "timed out", "timeout")):
+        return "unavailable"
+    return "unknown"
+
+class RepairStats:
+    """How failed queries were handled: local repairs vs LLM retries vs given up"""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.rules = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+
+    def record_error(self, kind: str):
+        with self._lock:
+            self.errors[kind] += 1
+
+    def record_local(self, fixes, ok: bool):
+        with self._lock:
+            self.counts["local_repairs"] += 1
+            self.counts["local_repairs_ok" if ok else "local_repairs_failed"] += 1
+            self.rules.update(fix.split(" '")[0] for fix in fixes)
+
+    def record_llm(self, ok: bool):
+        with self._lock:
+            self.counts["llm_retries"] += 1
+            self.counts["llm_retries_ok" if ok else "llm_retries_failed"] += 1
+
+    def record_skipped(self):
+        with self._lock:
+            self.counts["llm_retries_skipped"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.counts, "errors": dict(self.errors), "rules": dict(self.rules)}
+
+cypher_repairs = RepairStats()
+
 def execute_safe_cypher_and_format_results(cypher: str, params: dict = None, max_rows: int = 1000):
     params = params or {}
 
@@ -89,6 +586,15 @@ def execute_safe_cypher_and_format_results(cypher: str, params: dict = None, max
     if not ok:
         return {"status": "error", "message": reason}
 
+    ok, reason = uses_only_known_properties(cypher)
+    if not ok:
+        return {"status": "error", "message": reason}
+
+    if params.get("seasons"):
+        ok, reason = ensure_season_scoped(cypher)
+        if not ok:
+            return {"status": "error", "message": reason}
+
     # 2) Force LIMIT
     safe_cypher = add_limit_if_missing(cypher, default_limit=max_rows)
 
@@ -96,11 +602,18 @@ def execute_safe_cypher_and_format_results(cypher: str, params: dict = None, max
     if len(safe_cypher) > 20000:
         return {"status": "error", "message": "Query too long."}
 
-    # 4) Execute
+    # 4) Execute the canonical (literal-free) form
+    canonical, exec_params = parameterize_literals(safe_cypher, params)
+    shape = query_shapes.record(canonical)
+    profiling.record("cypher", text=canonical, shape=shape, params=sorted(exec_params))
     try:
-        rows = db.query(safe_cypher, params)
+        with db_limiter.slot():
+            rows = db.query(canonical, exec_params)
+    except Overloaded:
+        raise
     except Exception as e:
-        return {"status": "error", "message": f"Database execution error: {str(e)}"}
+        return {"status": "error", "message": f"Database execution error: {str(e)}",
+                "code": getattr(e, "code", None)}
 
     # 5) Validate results
     if not rows:
@@ -112,4 +625,4 @@ def execute_safe_cypher_and_format_results(cypher: str, params: dict = None, max
     except Exception:
         serializable = rows
 
-    return {"status": "ok", "data": serializable}
\ No newline at end of file
+    return {"status": "ok", "data": serializable, "shape": shape}
\ No newline at end of file
@@ -0,0 +1,193 @@
+# app/entity_matcher.py
+import threading
+import unicodedata
+from collections import deque
+from typing import Any, Dict, Iterable, List, Tuple
+from app.season_data import get_season_data, on_season_reload
+
+# Common ways people refer to clubs (canonical names are the ones stored on :Team)
+TEAM_ALIASES = {
+    "Manchester City": ["Man City", "City", "Man. City"],
+    "Manchester United": ["Man United", "Man Utd", "Man. United", "United"],
+    "Tottenham Hotspur": ["Tottenham", "Spurs"],
+    "Wolverhampton": ["Wolves", "Wolverhampton Wanderers"],
+    "Brighton & Hove Albion": ["Brighton", "Brighton and Hove Albion"],
+    "Aston Villa": ["Villa"],
+    "Nottingham Forest": ["Forest", "Nottm Forest", "Notts Forest"],
+    "Newcastle United": ["Newcastle"],
+    "West Ham United": ["West Ham"],
+    "Crystal Palace": ["Palace"],
+    "Sheffield United": ["Sheffield Utd", "Sheff Utd"],
+    "Luton Town": ["Luton"],
+    "Arsenal": ["Gunners"],
+}
+
+# Letters that NFKD does not decompose into an ASCII base
+_FOLD = str.maketrans({"ø": "o", "Ø": "O", "æ": "ae", "Æ": "AE", "ß": "ss", "đ": "d", "Đ": "D", "ł": "l", "Ł": "L"})
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so 'Ødegaard' / 'Martínez' match plain-ASCII questions"""
+    decomposed = unicodedata.normalize("NFKD", text.translate(_FOLD))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+class EntityMatcher:
+    """
+    Aho-Corasick automaton over team/player names and aliases.
+    Compiled once; each scan is a single linear pass over the text.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        # pattern id -> (length, kind, canonical name)
+        self._patterns: List[Tuple[int, str, str]] = []
+        self._seen = set()
+        self._compiled = False
+
+    def add(self, alias: str, kind: str, canonical: str):
+        key = normalize(alias).strip()
+        if not key or (key, kind, canonical) in self._seen:
+            return
+        self._seen.add((key, kind, canonical))
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self._patterns))
+        self._patterns.append((len(key), kind, canonical))
+        self._compiled = False
+
+    def compile(self):
+        queue = deque()
+        for nxt in self._goto[0].values():
+            self._fail[nxt] = 0
+            queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._compiled = True
+        return self
+
+    def scan(self, text: str) -> List[Tuple[int, int, str, str]]:
+        """
+        Returns non-overlapping (start, end, kind, canonical) hits on word boundaries,
+        preferring the longest match when aliases overlap ('Manchester City' over 'City').
+        """
+        if not self._compiled:
+            self.compile()
+        text = normalize(text)
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for pid in self._out[state]:
+                length, kind, canonical = self._patterns[pid]
+                start = i - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if i + 1 < len(text) and text[i + 1].isalnum():
+                    continue
+                hits.append((start, i + 1, kind, canonical))
+
+        hits.sort(key=lambda h: (h[0], -(h[1] - h[0])))
+        selected = []
+        last_end = -1
+        for hit in hits:
+            if hit[0] >= last_end:
+                selected.append(hit)
+                last_end = hit[1]
+        return selected
+
+    def find(self, question: str, rows: Any = None) -> Dict[str, Dict[str, int]]:
+        """
+        Counts entity hits in the question and in every string value of every result row.
+        Returns {"teams": {name: count}, "players": {name: count}}, most frequent first.
+        """
+        counts: Dict[str, Dict[str, int]] = {"teams": {}, "players": {}}
+        for text in self._iter_texts(question, rows):
+            for _, _, kind, canonical in self.scan(text):
+                bucket = counts[kind]
+                bucket[canonical] = bucket.get(canonical, 0) + 1
+        return {kind: dict(sorted(found.items(), key=lambda kv: -kv[1])) for kind, found in counts.items()}
+
+    @staticmethod
+    def _iter_texts(question: str, rows: Any) -> Iterable[str]:
+        if question:
+            yield question
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not isinstance(rows, list):
+            return
+        for row in rows:
+            if not isinstance(row, dict):
+                continue
+            for value in row.values():
+                if isinstance(value, str):
+                    yield value
+                elif isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, str):
+                            yield item
+
+def build_matcher(team_names: Iterable[str], players: Iterable[Dict[str, Any]]) -> EntityMatcher:
+    """
+    players: dicts with 'name' and optionally 'slug'.
+    Surnames are added as aliases only when no other player shares them.
+    """
+    matcher = EntityMatcher()
+    for team in team_names:
+        matcher.add(team, "teams", team)
+        for alias in TEAM_ALIASES.get(team, []):
+            matcher.add(alias, "teams", team)
+
+    players = [p for p in players if p.get("name")]
+    surnames: Dict[str, set] = {}
+    for p in players:
+        parts = p["name"].split()
+        if len(parts) > 1:
+            surnames.setdefault(normalize(parts[-1]), set()).add(p["name"])
+
+    for p in players:
+        name = p["name"]
+        matcher.add(name, "players", name)
+        if p.get("slug"):
+            matcher.add(p["slug"].replace("-", " "), "players", name)
+        parts = name.split()
+        if len(parts) > 1 and len(parts[-1]) >= 4 and len(surnames.get(normalize(parts[-1]), ())) == 1:
+            matcher.add(parts[-1], "players", name)
+    return matcher.compile()
+
+_matcher = None
+_matcher_lock = threading.Lock()
+
+def _reload_matcher(season_data):
+    global _matcher
+    _matcher = None
+
+on_season_reload(_reload_matcher)
+
+def get_dataset_matcher() -> EntityMatcher:
+    """Matcher over every team and player in the season data, rebuilt when the dataset version changes"""
+    global _matcher
+    season = get_season_data()
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                players = {p["player_id"]: p for p in season.performances}
+                _matcher = build_matcher(season.teams, players.values())
+    return _matcher
@@ -1,7 +1,21 @@
 # app/tactical_analyzer.py
-import google.generativeai as genai
 import json
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from app.entity_matcher import EntityMatcher, get_dataset_matcher
+from app.season_data import on_season_reload
+from app.profile_store import ProfileStore, get_profile_store
+from app.percentiles import PercentileTables, get_percentile_tables
+from app.admission import Overloaded, llm_limiter
+from app.llm import build_model
+from app.tactical_prefetch import TacticalPrefetch
+from app import profiling
+
+# Per kind (teams / players), how many detected entities get a context block in the prompt
+MAX_CONTEXT_ENTITIES = 6
+
+def _profile_season(seasons: Optional[List[str]]) -> Optional[str]:
+    # profiles and percentiles are per season: the most recent one in scope, None for the latest
+    return max(seasons) if seasons else None
 
 class TacticalAnalyzer:
     """
@@ -9,11 +23,7 @@ class TacticalAnalyzer:
     Combines database stats with football intelligence
     """
     
-    def __init__(self, model_name: str, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(
-            model_name,
-            system_instruction="""
+    SYSTEM_INSTRUCTION = """
 You are Michael Cox (The Athletic's Chief Tactical Analyst) meets Pep Guardiola's analyst team.
 
 YOUR EXPERTISE:
@@ -63,62 +73,45 @@ REMEMBER:
 You're not a data analyst who happens to know football.
 You're a football expert who uses data to support your analysis.
 """
-        )
-        
-        # Premier League 2023-24 Context Knowledge Base
-        self.pl_context = {
-            "teams": {
-                "Manchester City": {
-                    "style": "Possession-based positional play, high defensive line, inverted fullbacks",
-                    "manager": "Pep Guardiola",
-                    "key_players": ["Haaland (clinical finisher)", "De Bruyne (creative hub)", "Rodri (defensive anchor)"],
-                    "tactical_identity": "Control through possession, patient buildup, exploiting half-spaces"
-                },
-                "Arsenal": {
-                    "style": "High pressing, quick transitions, width from inverted fullbacks",
-                    "manager": "Mikel Arteta (ex-Guardiola assistant)",
-                    "key_players": ["Saka (inverted winger)", "Ødegaard (8/10 hybrid)", "Saliba (ball-playing CB)"],
-                    "tactical_identity": "Guardiola principles with more directness"
-                },
-                "Liverpool": {
-                    "style": "Gegenpressing, vertical transitions, fullback overloads",
-                    "manager": "Jürgen Klopp",
-                    "key_players": ["Salah (inside forward)", "Van Dijk (defensive leader)", "Alexander-Arnold (creative fullback)"],
-                    "tactical_identity": "High-intensity pressing, quick counter-attacks"
-                },
-                "Chelsea": {
-                    "style": "Varied (multiple managers), focus on youth development",
-                    "tactical_identity": "Transitional season, tactical identity in flux"
-                },
-                "Manchester United": {
-                    "style": "Counter-attacking, direct play",
-                    "manager": "Erik ten Hag",
-                    "tactical_identity": "Vertical passing, pressing in phases"
-                },
-                "Tottenham": {
-                    "style": "Counter-attacking, compact defending",
-                    "manager": "Ange Postecoglou (2023-24)",
-                    "tactical_identity": "High defensive line, aggressive pressing under Postecoglou"
-                }
-            },
-            
-            "player_archetypes": {
-                "Erling Haaland": "Pure penalty box striker - elite finishing, minimal buildup involvement",
-                "Mohamed Salah": "Inside forward - cuts inside from right, high-volume shooter",
-                "Bukayo Saka": "Inverted winger - dribbling threat, final third creativity",
-                "Kevin De Bruyne": "Advanced playmaker - through balls, chance creation from deep",
-                "Declan Rice": "Defensive midfielder - ball progression, defensive stability",
-                "Bruno Fernandes": "Risk-taking 10 - high creativity, high turnover rate"
-            },
-            
-            "tactical_trends_2023_24": [
-                "Increased use of inverted fullbacks (City, Arsenal)",
-                "High defensive lines becoming standard",
-                "Emphasis on progressive passing over possession for possession's sake",
-                "Pressing in organized structures rather than chaotic chasing"
-            ]
-        }
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+
+        # Season-wide tactical trends; team/player context comes from the ProfileStore
+        self.tactical_trends = [
+            "Increased use of inverted fullbacks (City, Arsenal)",
+            "High defensive lines becoming standard",
+            "Emphasis on progressive passing over possession for possession's sake",
+            "Pressing in organized structures rather than chaotic chasing"
+        ]
+
+        # built lazily on first use (need the graph)
+        self._entity_matcher = None
+        self._profile_stores: Dict[Optional[str], ProfileStore] = {}
+        self._percentile_tables: Dict[Optional[str], PercentileTables] = {}
+        on_season_reload(self._forget_season_views)
     
+    def _forget_season_views(self, season_data):
+        # a new dataset version: fetch fresh ones from the (rebuilt) module caches on next use
+        self._entity_matcher = None
+        self._profile_stores = {}
+        self._percentile_tables = {}
+
+    @property
+    def model(self):
+        # built on first use so constructing the analyzer doesn't touch Gemini
+        if self._model is None:
+            self._model = build_model(self.model_name, system_instruction=self.SYSTEM_INSTRUCTION)
+        return self._model
+
+    def warm_up(self):
+        """Builds the model, entity matcher, profile store and percentile tables up front instead of on the first question"""
+        self.model
+        self._get_entity_matcher()
+        self._get_profile_store()
+        self._get_percentile_tables()
+
     def should_use_tactical_analysis(self, question: str) -> bool:
         """Detects if question requires deep tactical analysis"""
         tactical_keywords = [
@@ -130,90 +123,105 @@ You're a football expert who uses data to support your analysis.
         question_lower = question.lower()
         return any(keyword in question_lower for keyword in tactical_keywords)
     
-    def _get_team_context(self, team_name: str) -> str:
+    def _get_profile_store(self, season: Optional[str] = None) -> Optional[ProfileStore]:
+        """Profiles of one season (default: the latest) precomputed from the season data (None if the graph is unreachable)"""
+        if season not in self._profile_stores:
+            try:
+                self._profile_stores[season] = get_profile_store(season)
+            except Exception as e:
+                print(f"⚠️ Profile store unavailable: {e}")
+                return None
+        return self._profile_stores[season]
+
+    def _get_percentile_tables(self, season: Optional[str] = None) -> Optional[PercentileTables]:
+        """Per-position percentile tables of one season (None if the graph is unreachable)"""
+        if season not in self._percentile_tables:
+            try:
+                self._percentile_tables[season] = get_percentile_tables(season)
+            except Exception as e:
+                print(f"⚠️ Percentile tables unavailable: {e}")
+                return None
+        return self._percentile_tables[season]
+
+    def percentile_context(self, question: str, data: Any, seasons: Optional[List[str]] = None) -> str:
+        """
+        Percentile ranks of the teams and players in the question or the data, for opinion
+        prompts, against the most recent season in scope (default: the latest)
+        """
+        tables = self._get_percentile_tables(_profile_season(seasons))
+        if not tables:
+            return ""
+        entities = self._extract_entities(question, data)
+        lines = "".join(tables.team_context(team) for team in entities["teams"])
+        lines += "".join(tables.player_context(player) for player in entities["players"])
+        return lines
+
+    def _get_team_context(self, team_name: str, season: Optional[str] = None) -> str:
         """Get tactical context for a specific team"""
-        context = self.pl_context["teams"].get(team_name, {})
-        if context:
-            return f"""
-TEAM CONTEXT - {team_name}:
-- Playing Style: {context.get('style', 'N/A')}
-- Manager: {context.get('manager', 'N/A')}
-- Tactical Identity: {context.get('tactical_identity', 'N/A')}
-- Key Players: {', '.join(context.get('key_players', []))}
-"""
-        return ""
+        store = self._get_profile_store(season)
+        return store.team_context(team_name) if store else ""
     
-    def _get_player_context(self, player_name: str) -> str:
+    def _get_player_context(self, player_name: str, season: Optional[str] = None) -> str:
         """Get tactical profile for a specific player"""
-        profile = self.pl_context["player_archetypes"].get(player_name, "")
-        if profile:
-            return f"\nPLAYER PROFILE - {player_name}: {profile}\n"
-        return ""
+        store = self._get_profile_store(season)
+        return store.player_context(player_name) if store else ""
     
-    def _extract_entities(self, question: str, data: Any) -> Dict[str, List[str]]:
-        """Extract teams and players mentioned in question or data"""
-        entities = {"teams": [], "players": []}
-        
-        question_lower = question.lower()
-        
-        # Check for teams
-        for team in self.pl_context["teams"].keys():
-            if team.lower() in question_lower:
-                entities["teams"].append(team)
-        
-        # Check for players
-        for player in self.pl_context["player_archetypes"].keys():
-            if player.lower() in question_lower:
-                entities["players"].append(player)
-        
-        # Extract from data if available
-        if isinstance(data, list) and data:
-            first_row = data[0]
-            # Check for team names in data
-            for key, value in first_row.items():
-                if isinstance(value, str):
-                    for team in self.pl_context["teams"].keys():
-                        if team in value and team not in entities["teams"]:
-                            entities["teams"].append(team)
-                    # Check player names
-                    for player in self.pl_context["player_archetypes"].keys():
-                        if player in value and player not in entities["players"]:
-                            entities["players"].append(player)
-        
-        return entities
+    def _get_entity_matcher(self) -> EntityMatcher:
+        """Dataset-wide matcher; an empty one if the graph is unreachable"""
+        if self._entity_matcher is None:
+            try:
+                self._entity_matcher = get_dataset_matcher()
+            except Exception as e:
+                print(f"⚠️ Entity matcher unavailable: {e}")
+                return EntityMatcher().compile()
+        return self._entity_matcher
+
+    def _extract_entities(self, question: str, data: Any) -> Dict[str, Dict[str, int]]:
+        """
+        Teams and players mentioned in the question or any data row, with hit counts.
+        Keeps the MAX_CONTEXT_ENTITIES most frequent of each kind so the prompt stays short.
+        """
+        found = self._get_entity_matcher().find(question, data)
+        return {kind: dict(list(hits.items())[:MAX_CONTEXT_ENTITIES]) for kind, hits in found.items()}
+
+    def prefetch_stats(self, question: str, seasons: Optional[List[str]] = None) -> TacticalPrefetch:
+        """Starts the stats lookups for the teams/players named in the question (no LLM involved)"""
+        return TacticalPrefetch(self._extract_entities(question, []), seasons)
     
     def generate_tactical_analysis(
         self, 
         data: Any, 
         question: str, 
-        history: List[Dict[str, str]] = None
+        history: List[Dict[str, str]] = None,
+        prefetch: Optional[TacticalPrefetch] = None,
+        seasons: Optional[List[str]] = None
     ) -> str:
         """
-        Generates expert tactical analysis combining data + football knowledge
+        Generates expert tactical analysis combining data + football knowledge.
+        With a prefetch, its stats become the data once the rest of the prompt is ready.
+        Profiles come from the most recent of `seasons` (default: the latest season).
         """
+        season = _profile_season(seasons)
         
-        # Prepare data
-        data_preview = data[:10] if isinstance(data, list) else data
-        
-        # Extract entities (teams/players mentioned)
-        entities = self._extract_entities(question, data_preview)
+        # Extract entities (teams/players mentioned) from the question and every row
+        entities = prefetch.entities if prefetch is not None else self._extract_entities(question, data)
         
         # Build contextual knowledge
         context_knowledge = ""
         
         # Add team contexts
         for team in entities["teams"]:
-            context_knowledge += self._get_team_context(team)
+            context_knowledge += self._get_team_context(team, season)
         
         # Add player contexts
         for player in entities["players"]:
-            context_knowledge += self._get_player_context(player)
+            context_knowledge += self._get_player_context(player, season)
         
         # Add general tactical trends
         if entities["teams"] or entities["players"]:
             context_knowledge += f"""
 2023-24 PREMIER LEAGUE TACTICAL TRENDS:
-{chr(10).join(f"- {trend}" for trend in self.pl_context["tactical_trends_2023_24"])}
+{chr(10).join(f"- {trend}" for trend in self.tactical_trends)}
 """
         
         # Build conversation history
@@ -224,6 +232,14 @@ TEAM CONTEXT - {team_name}:
                 role = msg.get("role", "user")
                 content = msg.get("content", "")
                 conv_context += f"{role.upper()}: {content}\n\n"
+
+        # The lookups ran while the context above was built; take whatever made the deadline
+        if prefetch is not None:
+            with profiling.stage("tactical_prefetch_wait"):
+                data = prefetch.result()
+
+        # Prepare data
+        data_preview = data[:10] if isinstance(data, list) else data
         
         # Prepare data string
         data_str = json.dumps(data_preview, indent=2) if data_preview else "No specific match data provided."
@@ -284,8 +300,12 @@ NOW ANALYZE:
         
         try:
             chat = self.model.start_chat(history=[])
-            response = chat.send_message(prompt)
+            with llm_limiter.slot(prompt_chars=len(prompt)):
+                response = chat.send_message(prompt)
+            profiling.record("prompt", model="tactical", prompt_chars=len(prompt), response_chars=len(response.text))
             return response.text.strip()
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"❌ Tactical Analysis Error: {e}")
             return f"Failed to generate analysis: {str(e)}"
@@ -294,20 +314,22 @@ NOW ANALYZE:
         self, 
         data: Any, 
         question: str,
-        history: List[Dict[str, str]] = None
+        history: List[Dict[str, str]] = None,
+        seasons: Optional[List[str]] = None
     ) -> str:
         """
         Generates expert explanation paragraph mixing stats + tactical knowledge
         """
+        season = _profile_season(seasons)
         short_data = data[:10] if isinstance(data, list) else data
-        entities = self._extract_entities(question, short_data)
+        entities = self._extract_entities(question, data)
         
         # Build context
         context_knowledge = ""
         for team in entities["teams"]:
-            context_knowledge += self._get_team_context(team)
+            context_knowledge += self._get_team_context(team, season)
         for player in entities["players"]:
-            context_knowledge += self._get_player_context(player)
+            context_knowledge += self._get_player_context(player, season)
         
         # Conversation history
         conv_context = ""
@@ -344,8 +366,12 @@ Don't just report stats - explain them through tactical lens.
 
         try:
             chat = self.model.start_chat(history=[])
-            response = chat.send_message(prompt)
+            with llm_limiter.slot(prompt_chars=len(prompt)):
+                response = chat.send_message(prompt)
+            profiling.record("prompt", model="explained", prompt_chars=len(prompt), response_chars=len(response.text))
             return response.text.strip()
+        except Overloaded:
+            raise
         except Exception as e:
             print(f"❌ Explanation Error: {e}")
             return f"Failed to explain: {str(e)}"
\ No newline at end of file
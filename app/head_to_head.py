@@ -0,0 +1,104 @@
+# app/head_to_head.py
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from app.season_data import SeasonData, get_season_data, on_season_reload
+from app.standings import _day
+
+# How many players to list as key contributors
+H2H_TOP_CONTRIBUTORS = 5
+
+def pair_key(team_a: str, team_b: str) -> Tuple[str, str]:
+    """Unordered pair: (a, b) and (b, a) share one entry"""
+    return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
+
+class HeadToHead:
+    """
+    Every fixture between each pair of teams (all loaded seasons), with per-match player
+    goal contributions, so a head-to-head question is one dict lookup plus a sum over a
+    handful of fixtures.
+    """
+
+    def __init__(self, fixtures: Dict[Tuple[str, str], List[Dict[str, Any]]]):
+        self.fixtures = fixtures
+
+    @classmethod
+    def build(cls, season: SeasonData) -> "HeadToHead":
+        contributions = defaultdict(list)
+        for p in season.performances:
+            stats = p.get("stats") or {}
+            goals = stats.get("goals") or 0
+            assists = stats.get("goalAssist") or 0
+            if goals or assists:
+                contributions[p["match_id"]].append(
+                    {"player": p["name"], "team": stats.get("team"), "goals": goals, "assists": assists})
+
+        fixtures = defaultdict(list)
+        # season.matches is in date order, so each pair's fixtures are too
+        for m in season.matches:
+            fixtures[pair_key(m["home"], m["away"])].append({
+                "match_id": m["id"],
+                "season": m.get("season"),
+                "round": m["round"],
+                "date": _day(m.get("date") or 0),
+                "home": m["home"],
+                "away": m["away"],
+                "score": f"{m['home_goals']}-{m['away_goals']}",
+                "home_goals": m["home_goals"],
+                "away_goals": m["away_goals"],
+                "contributions": contributions.get(m["id"], []),
+            })
+        return cls(dict(fixtures))
+
+    def lookup(self, team_a: str, team_b: str, season: Optional[str] = None) -> Dict[str, Any]:
+        fixtures = self.fixtures.get(pair_key(team_a, team_b), [])
+        if season:
+            fixtures = [f for f in fixtures if f["season"] == season]
+        if not fixtures:
+            raise KeyError(f"no matches between '{team_a}' and '{team_b}'")
+
+        wins = {team_a: 0, team_b: 0}
+        goals = {team_a: 0, team_b: 0}
+        draws = 0
+        players = {}
+        for f in fixtures:
+            goals[f["home"]] += f["home_goals"]
+            goals[f["away"]] += f["away_goals"]
+            if f["home_goals"] == f["away_goals"]:
+                draws += 1
+            else:
+                wins[f["home"] if f["home_goals"] > f["away_goals"] else f["away"]] += 1
+            for c in f["contributions"]:
+                row = players.setdefault(c["player"], {"player": c["player"], "team": c["team"],
+                                                       "goals": 0, "assists": 0})
+                row["goals"] += c["goals"]
+                row["assists"] += c["assists"]
+
+        top = sorted(players.values(), key=lambda r: (-(r["goals"] + r["assists"]), -r["goals"], r["player"]))
+        return {
+            "teams": [team_a, team_b],
+            "played": len(fixtures),
+            "wins": wins,
+            "draws": draws,
+            "goals": goals,
+            "fixtures": [{k: f[k] for k in ("season", "round", "date", "home", "away", "score")} for f in fixtures],
+            "key_players": top[:H2H_TOP_CONTRIBUTORS],
+        }
+
+_h2h = None
+_h2h_lock = threading.Lock()
+
+def _reload_h2h(season_data: SeasonData):
+    global _h2h
+    _h2h = HeadToHead.build(season_data)
+
+def get_head_to_head() -> HeadToHead:
+    global _h2h
+    # also picks up a new dataset version, which rebuilds the index through the reload hook
+    season_data = get_season_data()
+    if _h2h is None:
+        with _h2h_lock:
+            if _h2h is None:
+                _h2h = HeadToHead.build(season_data)
+                on_season_reload(_reload_h2h)
+    return _h2h
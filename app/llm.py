@@ -0,0 +1,24 @@
+# app/llm.py
+import os
+import threading
+
+# Gemini is configured once per process, on first use, so importing the app stays cheap
+_genai = None
+_genai_lock = threading.Lock()
+
+def get_genai():
+    """Imports and configures google.generativeai on first call"""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                api_key = os.environ.get("GOOGLE_API_KEY")
+                if not api_key:
+                    raise RuntimeError("Set GOOGLE_API_KEY environment variable before starting the server.")
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _genai = genai
+    return _genai
+
+def build_model(model_name: str, **kwargs):
+    return get_genai().GenerativeModel(model_name, **kwargs)
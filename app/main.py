@@ -1,23 +1,75 @@
 # app/api.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Any
-import json, traceback, os, re, time
-import google.generativeai as genai
+from typing import List, Dict, Any, Optional
+import asyncio, json, traceback, os, re, threading, time
 from app.football_intelligence_engine import TacticalAnalyzer
-from app.cypher_guard import execute_safe_cypher_and_format_results
+from app.query_fanout import execute_fanout, caveat as fanout_caveat
+from app.cypher_guard import (execute_safe_cypher_and_format_results, query_shapes, repair_cypher,
+                              classify_cypher_error, LLM_RETRYABLE_ERRORS, cypher_repairs)
 from app.neo4j_client import db
+from app.coalescing import SingleFlight, coalescing_key
+from app.admission import Overloaded, chat_admission, batch_admission, llm_limiter, db_limiter, llm_priority
+from app.llm import build_model
+from app.result_store import RESULT_PAGE_SIZE, ResultExpired, first_page_payload, result_store
+from app.answer_renderer import render_trivial_answer
+from app.tools import run_tool, tools_prompt
+from app.seasons import resolve_seasons, named_seasons
+from app import profiling
 
 # --- CONFIG --- #
-API_KEY = os.environ["GOOGLE_API_KEY"]
-if not API_KEY:
-    raise RuntimeError("Set GOOGLE_API_KEY environment variable before starting the server.")
-genai.configure(api_key=API_KEY)
-
 MODEL_NAME = os.environ.get("GENAI_MODEL")
-
-app = FastAPI(title="Football Analytics AI Backend")
+BATCH_MAX_PARALLELISM = int(os.environ.get("BATCH_MAX_PARALLELISM", "8"))
+BATCH_MAX_QUESTIONS = int(os.environ.get("BATCH_MAX_QUESTIONS", "5000"))
+# A failed warm-up (e.g. Neo4j still starting) is retried after 1s, 2s, 4s, ... up to this
+WARM_UP_RETRY_MAX = float(os.environ.get("WARM_UP_RETRY_MAX", "30"))
+
+# Set once the per-worker warm-up (Gemini models, DB pool, schema catalog, profiles) has finished
+_ready = threading.Event()
+_warm_up_error = None
+_warm_up_attempts = 0
+
+def warm_up() -> bool:
+    global _warm_up_error, _warm_up_attempts
+    _warm_up_attempts += 1
+    start = time.perf_counter()
+    try:
+        get_model("cypher")
+        get_model("opinion")
+        get_model("text")
+        db.warm_up()
+        tactical_analyzer.warm_up()
+    except Exception as e:
+        _warm_up_error = str(e)
+        traceback.print_exc()
+        return False
+    _warm_up_error = None
+    _ready.set()
+    print(f"✅ Worker ready in {time.perf_counter() - start:.2f}s")
+    return True
+
+async def warm_up_until_ready():
+    # each step is cached once it succeeds, so a retry only redoes what failed
+    delay = 1.0
+    while not await run_in_threadpool(warm_up):
+        print(f"🔁 Warm-up failed, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, WARM_UP_RETRY_MAX)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs in each worker after fork; warm-up happens in the background so /ready can report progress
+    warm_up_task = asyncio.create_task(warm_up_until_ready())
+    yield
+    warm_up_task.cancel()
+    db.close()
+
+app = FastAPI(title="Football Analytics AI Backend", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
@@ -25,10 +77,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 class ChatRequest(BaseModel):
     message: str
     history: List[Dict[str, Any]] = []
+    # ask for the LLM paragraph even when a templated answer is possible
+    enrich: bool = False
+    # e.g. ["2023-24"]; default: seasons named in the question, else the latest
+    seasons: Optional[List[str]] = None
+    # LLM calls are shared fairly between sessions; requests without one share a single slot
+    session_id: Optional[str] = None
+
+class BatchQuestion(BaseModel):
+    id: Optional[str] = None
+    message: str
+    history: List[Dict[str, Any]] = []
+    enrich: bool = False
+    seasons: Optional[List[str]] = None
+
+class BatchChatRequest(BaseModel):
+    questions: List[BatchQuestion]
+    parallelism: Optional[int] = None
+    session_id: Optional[str] = None
 
 # --- UPDATED SYSTEM PROMPT --- #
 SYSTEM_PROMPT = """
@@ -70,11 +141,12 @@ That said, if we weight creativity higher, Palmer or Ødegaard would be strong c
 ### QUERY STRATEGY FOR OPINIONS
 ===========================
 
-For subjective questions, fetch MULTIPLE metrics in ONE query:
+For subjective questions, fetch MULTIPLE metrics. When they all come from the same pattern, use ONE query:
 
 ```cypher
 MATCH (p:Player)-[r:PLAYED_IN]->(m:Match)
-WHERE r.minutesPlayed > 1000  // Filter for regular starters
+WHERE ($seasons IS NULL OR m.season IN $seasons)  // Always scope to the seasons in scope
+  AND r.minutesPlayed > 1000  // Filter for regular starters
 RETURN 
   p.name,
   SUM(r.goals) as goals,
@@ -90,6 +162,22 @@ LIMIT 20
 
 Then YOU analyze this data and form an opinion.
 
+When the metrics need DIFFERENT patterns (team results + player actions, attacking + defensive),
+do NOT chain OPTIONAL MATCH / WITH aggregations into one giant query (it multiplies rows and is slow).
+Return a "queries" list instead (at most 4) of small independent queries. The backend runs them in parallel
+and joins their rows on the column named in "key", so every query must return that column under the same name:
+
+```json
+{
+  "queries": [
+    {"name": "attacking", "key": "player", "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE ($seasons IS NULL OR m.season IN $seasons) AND p.name IN ['Mohamed Salah', 'Erling Haaland'] RETURN p.name AS player, SUM(r.goals) AS goals, SUM(r.expectedGoals) AS xG"},
+    {"name": "creative", "key": "player", "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE ($seasons IS NULL OR m.season IN $seasons) AND p.name IN ['Mohamed Salah', 'Erling Haaland'] RETURN p.name AS player, SUM(r.keyPass) AS keyPasses, SUM(r.goalAssist) AS assists"}
+  ],
+  "explanation": "...",
+  "analysis_mode": "opinion"
+}
+```
+
 ===========================
 ### OPINION RESPONSE FORMAT
 ===========================
@@ -115,7 +203,7 @@ The `analysis_mode: "opinion"` flag tells the backend to trigger deep analysis i
 **Q: "Who was the best player this season?"**
 ```json
 {
-  "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE r.minutesPlayed > 1000 RETURN p.name, SUM(r.goals) as goals, SUM(r.goalAssist) as assists, SUM(r.expectedGoals)/100.0 as xG, SUM(r.keyPass) as keyPasses, SUM(r.minutesPlayed) as mins ORDER BY goals DESC LIMIT 15",
+  "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE ($seasons IS NULL OR m.season IN $seasons) AND r.minutesPlayed > 1000 RETURN p.name, SUM(r.goals) as goals, SUM(r.goalAssist) as assists, SUM(r.expectedGoals)/100.0 as xG, SUM(r.keyPass) as keyPasses, SUM(r.minutesPlayed) as mins ORDER BY goals DESC LIMIT 15",
   "params": {},
   "explanation": "Fetching comprehensive attacking metrics to evaluate top performers",
   "confidence": "high",
@@ -126,8 +214,11 @@ The `analysis_mode: "opinion"` flag tells the backend to trigger deep analysis i
 **Q: "Which team had the strongest defense?"**
 ```json
 {
-  "cypher": "MATCH (t:Team) OPTIONAL MATCH (t)<-[:HOME_TEAM]-(h:Match) WITH t, sum(toInteger(split(h.score, '-')[1])) as homeConceded OPTIONAL MATCH (t)<-[:AWAY_TEAM]-(a:Match) WITH t, homeConceded, sum(toInteger(split(a.score, '-')[0])) as awayConceded MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE r.team = t.name RETURN t.name, homeConceded + awayConceded as goalsConceded, SUM(r.totalTackle) as tackles, SUM(r.interceptionWon) as interceptions, SUM(r.totalClearance) as clearances ORDER BY goalsConceded ASC LIMIT 10",
-  "params": {},
+  "queries": [
+    {"name": "conceded_home", "key": "team", "cypher": "MATCH (h:Match)-[:HOME_TEAM]->(t:Team) WHERE ($seasons IS NULL OR h.season IN $seasons) RETURN t.name AS team, sum(toInteger(split(h.score, '-')[1])) AS concededHome"},
+    {"name": "conceded_away", "key": "team", "cypher": "MATCH (a:Match)-[:AWAY_TEAM]->(t:Team) WHERE ($seasons IS NULL OR a.season IN $seasons) RETURN t.name AS team, sum(toInteger(split(a.score, '-')[0])) AS concededAway"},
+    {"name": "defending", "key": "team", "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE ($seasons IS NULL OR m.season IN $seasons) RETURN r.team AS team, SUM(r.totalTackle) AS tackles, SUM(r.interceptionWon) AS interceptions, SUM(r.totalClearance) AS clearances"}
+  ],
   "explanation": "Combining goals conceded with defensive actions to evaluate defensive strength",
   "confidence": "high",
   "analysis_mode": "opinion"
@@ -137,7 +228,7 @@ The `analysis_mode: "opinion"` flag tells the backend to trigger deep analysis i
 **Q: "Was Salah better than Haaland?"**
 ```json
 {
-  "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE p.name IN ['Mohamed Salah', 'Erling Haaland'] RETURN p.name, SUM(r.goals) as goals, SUM(r.goalAssist) as assists, SUM(r.expectedGoals)/100.0 as xG, SUM(r.totalShots) as shots, SUM(r.keyPass) as keyPasses, SUM(r.bigChanceCreated) as chances, SUM(r.minutesPlayed) as mins ORDER BY goals DESC",
+  "cypher": "MATCH (p:Player)-[r:PLAYED_IN]->(m:Match) WHERE ($seasons IS NULL OR m.season IN $seasons) AND p.name IN ['Mohamed Salah', 'Erling Haaland'] RETURN p.name, SUM(r.goals) as goals, SUM(r.goalAssist) as assists, SUM(r.expectedGoals)/100.0 as xG, SUM(r.totalShots) as shots, SUM(r.keyPass) as keyPasses, SUM(r.bigChanceCreated) as chances, SUM(r.minutesPlayed) as mins ORDER BY goals DESC",
   "params": {},
   "explanation": "Comparing attacking output and creativity to evaluate which player had greater impact",
   "confidence": "high",
@@ -157,13 +248,18 @@ The `analysis_mode: "opinion"` flag tells the backend to trigger deep analysis i
 
 **DATASET INFORMATION:**
 - **League:** English Premier League
-- **Season:** 2023-2024 (Complete)
-- **Date Range:** August 2023 - May 2024
-- **Coverage:** All 380 matches of the season
+- **Seasons:** One or more complete seasons stored side by side (380 matches each)
+- **Season property:** Every Match has `m.season` and every PLAYED_IN has `r.season`, formatted "YYYY-YY" (e.g. "2023-24")
+
+**SEASON SCOPING (MANDATORY):**
+The backend passes the seasons in scope as the `$seasons` list parameter (null when the graph has no seasons).
+- Filter EVERY Match you bind with `WHERE ($seasons IS NULL OR <var>.season IN $seasons)`, even for one season
+- Never write season values as literals and never add `seasons` to "params"
+- To compare seasons, keep the filter and return `m.season` as a column
 
 **DEFAULT BEHAVIOR:**
-Unless the user specifies a date range or round number, query ALL available matches.
-DO NOT ask for clarification about "which season" - the database contains exactly one season.
+Unless the user specifies a date range or round number, query ALL matches of the seasons in scope.
+DO NOT ask for clarification about "which season" - the backend picks the seasons named in the question, or the latest one.
 
 ===========================
 ### FINAL REMINDER
@@ -179,17 +275,8 @@ When faced with subjective questions (best, better, strongest, most impressive,
 You are an expert analyst. Users expect YOUR judgment, not a request for more specificity.
 """
 
-# Configure models
-cypher_model = genai.GenerativeModel(
-    MODEL_NAME,
-    generation_config={"response_mime_type": "application/json"},
-    system_instruction=SYSTEM_PROMPT
-)
-
 # NEW: Opinion Analysis Model
-opinion_model = genai.GenerativeModel(
-    MODEL_NAME,
-    system_instruction="""
+OPINION_SYSTEM_PROMPT = """
 You are a Premier League expert analyst who forms STRONG OPINIONS backed by data.
 
 When given player/team statistics, you:
@@ -210,13 +297,32 @@ STRUCTURE (6-8 sentences):
 
 TONE: Confident but fair. Like a pundit on Match of the Day who has done their homework.
 """
-)
 
-tactical_analyzer = TacticalAnalyzer(MODEL_NAME, API_KEY)
+# Models are built lazily, once per worker
+_models = {}
+_models_lock = threading.Lock()
+
+def get_model(kind: str):
+    if kind not in _models:
+        with _models_lock:
+            if kind not in _models:
+                if kind == "cypher":
+                    _models[kind] = build_model(
+                        MODEL_NAME,
+                        generation_config={"response_mime_type": "application/json"},
+                        system_instruction=SYSTEM_PROMPT + tools_prompt()
+                    )
+                elif kind == "opinion":
+                    _models[kind] = build_model(MODEL_NAME, system_instruction=OPINION_SYSTEM_PROMPT)
+                else:
+                    _models[kind] = build_model(MODEL_NAME)
+    return _models[kind]
+
+tactical_analyzer = TacticalAnalyzer(MODEL_NAME)
 
 def ask_model_for_cypher(user_question: str, context_history: List[Dict[str, str]] = None) -> str:
     try:
-        chat = cypher_model.start_chat(history=[])
+        chat = get_model("cypher").start_chat(history=[])
         
         if context_history:
             for msg in context_history[-6:]:
@@ -228,15 +334,23 @@ def ask_model_for_cypher(user_question: str, context_history: List[Dict[str, str
                 else:
                     chat.history.append({"role": "user", "parts": [content]})
         
-        response = chat.send_message(user_question)
+        with llm_limiter.slot(prompt_chars=len(user_question)
+                              + sum(len(str(m.get("content", ""))) for m in (context_history or [])[-6:])):
+            response = chat.send_message(user_question)
+        profiling.record("prompt", model="cypher", prompt_chars=len(user_question),
+                         history_chars=sum(len(str(m.get("content", ""))) for m in (context_history or [])[-6:]),
+                         response_chars=len(response.text))
         return response.text.strip()
         
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"❌ CRITICAL GEMINI API ERROR: {e}")
         traceback.print_exc()
         return "{}"
 
-def generate_opinion_analysis(results_json: Any, user_question: str, history: List[Dict[str, str]] = None) -> str:
+def generate_opinion_analysis(results_json: Any, user_question: str, history: List[Dict[str, str]] = None,
+                              caveat: str = None, seasons: Optional[List[str]] = None) -> str:
     """
     NEW FUNCTION: Generates expert opinion based on data
     """
@@ -254,6 +368,12 @@ def generate_opinion_analysis(results_json: Any, user_question: str, history: Li
             content = msg.get("content", "")
             conv_context += f"{role.upper()}: {content}\n\n"
     
+    # where the players/teams in the result sit in their position group, precomputed
+    percentiles = tactical_analyzer.percentile_context(user_question, results_json, seasons)
+    percentile_block = f"\nPERCENTILE RANKS (p90 = better than 90% of peers):\n{percentiles}" if percentiles else ""
+    if caveat:
+        percentile_block += f"\nDATA GAPS (say so in your answer): {caveat}"
+    
     opinion_prompt = f"""
 {conv_context if conv_context else "First question in conversation"}
 
@@ -261,9 +381,11 @@ USER QUESTION: {user_question}
 
 RETRIEVED DATA:
 {json.dumps(data_to_send, indent=2)}
+{percentile_block}
 
 YOUR TASK:
 Form a STRONG, DATA-BACKED OPINION answering the user's question.
+If PERCENTILE RANKS are given, use them to judge whether a number is elite, average or poor for that position.
 
 If they asked "Who was the best player?":
 - Pick ONE player as your top choice
@@ -285,19 +407,27 @@ Write 6-8 sentences in one cohesive paragraph.
 """
     
     try:
-        chat = opinion_model.start_chat(history=[])
-        response = chat.send_message(opinion_prompt)
+        chat = get_model("opinion").start_chat(history=[])
+        with llm_limiter.slot(prompt_chars=len(opinion_prompt)):
+            response = chat.send_message(opinion_prompt)
+        profiling.record("prompt", model="opinion", prompt_chars=len(opinion_prompt), response_chars=len(response.text))
         return response.text.strip()
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"❌ Opinion Generation Error: {e}")
         return f"Failed to generate analysis: {str(e)}"
 
-def ask_model_to_summarize(results_json: Any, user_question: str, history: List[Dict[str, str]] = None, is_opinion: bool = False) -> str:
+def ask_model_to_summarize(results_json: Any, user_question: str, history: List[Dict[str, str]] = None, is_opinion: bool = False,
+                           enrich: bool = False, caveat: str = None, seasons: Optional[List[str]] = None) -> str:
     """
-    UPDATED: Routes to opinion analysis if needed, or returns raw lists
+    UPDATED: Routes to opinion analysis if needed, or returns raw lists.
+    `caveat` (e.g. a fan-out part that failed) is passed to the model or appended to the answer.
+    `seasons` (the ones in scope) picks the season the profile and percentile context come from.
     """
+    note = f"\n\n_{caveat}_" if caveat else ""
     if not results_json:
-        return "I couldn't find any results. This usually means:\n1. The player/team name is spelled differently in the database.\n2. The specific match didn't happen in the 23/24 PL season."
+        return "I couldn't find any results. This usually means:\n1. The player/team name is spelled differently in the database.\n2. The specific match didn't happen in the selected season(s)."
 
     # NEW: Detect if user wants a raw list (no analysis)
     list_keywords = ["list", "all players", "all teams", "show me", "give me all", "names of", "who are"]
@@ -319,16 +449,16 @@ def ask_model_to_summarize(results_json: Any, user_question: str, history: List[
         
         # Format nicely
         if len(items) <= 50:
-            return "\n".join(f"• {item}" for item in items)
+            return "\n".join(f"• {item}" for item in items) + note
         else:
             # For long lists, show count and first 50
             preview = "\n".join(f"• {item}" for item in items[:])
-            return f"Found {len(items)} results. Here are the first 50:\n\n{preview}\n\n(Use filters to narrow down the list)"
+            return f"Found {len(items)} results. Here are the first 50:\n\n{preview}\n\n(Use filters to narrow down the list)" + note
 
     # NEW: Check if this is an opinion question
     if is_opinion:
         print("🎯 GENERATING EXPERT OPINION")
-        return generate_opinion_analysis(results_json, user_question, history)
+        return generate_opinion_analysis(results_json, user_question, history, caveat=caveat, seasons=seasons)
 
     data_to_send = results_json
     if isinstance(results_json, list) and len(results_json) > 50:
@@ -337,15 +467,18 @@ def ask_model_to_summarize(results_json: Any, user_question: str, history: List[
     # Check if user wants explanation + stats
     if any(k in user_question.lower() for k in ["explain", "why", "reason", "because"]):
         print("🎯 Generating EXPLAINED PARAGRAPH")
-        return tactical_analyzer.generate_explained_paragraph(data_to_send, user_question, history)
-
-    # Check if tactical analysis is needed
-    if tactical_analyzer.should_use_tactical_analysis(user_question):
-        print("🎯 Generating TACTICAL ANALYSIS")
-        return tactical_analyzer.generate_tactical_analysis(data_to_send, user_question, history)
+        return tactical_analyzer.generate_explained_paragraph(data_to_send, user_question, history,
+                                                              seasons=seasons) + note
+
+    # Scalars and short label/number tables don't need a paragraph unless asked for
+    if not enrich:
+        templated = render_trivial_answer(results_json)
+        if templated:
+            print("⚡ RETURNING TEMPLATED ANSWER (no LLM call)")
+            return templated + note
     
     # Otherwise, basic summary
-    text_model = genai.GenerativeModel(MODEL_NAME)
+    text_model = get_model("text")
     
     summary_prompt = (
         "You are a Premier League expert analyst.\n"
@@ -356,12 +489,17 @@ def ask_model_to_summarize(results_json: Any, user_question: str, history: List[
         "4. Tactical interpretation\n\n"
         f"User Question: {user_question}\n"
         f"Data: {json.dumps(data_to_send, indent=2)}\n\n"
-        "Write as one paragraph, no bullet points."
+        + (f"Data gaps (mention them): {caveat}\n\n" if caveat else "")
+        + "Write as one paragraph, no bullet points."
     )
     
     try:
-        response = text_model.generate_content(summary_prompt)
+        with llm_limiter.slot(prompt_chars=len(summary_prompt)):
+            response = text_model.generate_content(summary_prompt)
+        profiling.record("prompt", model="summary", prompt_chars=len(summary_prompt), response_chars=len(response.text))
         return response.text.strip()
+    except Overloaded:
+        raise
     except Exception as e:
         print(f"❌ SUMMARIZATION ERROR: {e}")
         return f"Data found: {json.dumps(data_to_send[:3])}..."
@@ -379,17 +517,32 @@ def extract_json_from_model_text(text: str):
             pass
     return None
 
-@app.post("/chat")
-async def chat_endpoint(req: ChatRequest):
+def run_chat_pipeline(message: str, history: List[Dict[str, Any]], enrich: bool = False,
+                      seasons: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Cypher generation, DB query and summarization for one question (blocking)"""
     try:
+        # Every generated query is scoped to these through $seasons
+        requested_seasons = seasons
+        try:
+            seasons = resolve_seasons(message, seasons)
+        except ValueError as e:
+            return {"response": f"I can't answer that: {e}."}
+
         # Check for tactical questions
-        if tactical_analyzer.should_use_tactical_analysis(req.message):
+        if tactical_analyzer.should_use_tactical_analysis(message):
             print("🎯 BYPASSING CYPHER – Tactical question detected")
-            analysis = tactical_analyzer.generate_tactical_analysis([], req.message, req.history)
+            with profiling.stage("tactical_analysis"):
+                # stats for the named teams/players load in parallel while the prompt is built
+                prefetch = tactical_analyzer.prefetch_stats(message, seasons)
+                analysis = tactical_analyzer.generate_tactical_analysis([], message, history, prefetch=prefetch,
+                                                                        seasons=seasons)
             return {"response": analysis}
 
+        question = f"{message}\n\n(Seasons in scope: {', '.join(seasons)})" if seasons else message
+
         # Get Cypher query
-        proposed_text = ask_model_for_cypher(req.message, req.history)
+        with profiling.stage("generate_cypher"):
+            proposed_text = ask_model_for_cypher(question, history)
         print(f"AI RAW OUTPUT: {proposed_text}") 
 
         parsed = extract_json_from_model_text(proposed_text)
@@ -400,34 +553,93 @@ async def chat_endpoint(req: ChatRequest):
         if parsed.get("clarify"):
             return {"response": parsed.get("clarify")}
 
+        # Precomputed lookups (standings, ...) skip Cypher entirely
+        if parsed.get("tool"):
+            print(f"🧰 TOOL CALL: {parsed.get('tool')} {parsed.get('args')}")
+            with profiling.stage("tool"):
+                # only a season the user actually named overrides a tool's own default
+                # (e.g. head_to_head covers every loaded season)
+                named = named_seasons(message, requested_seasons)
+                tool_result = run_tool(parsed["tool"], parsed.get("args") or {},
+                                       default_season=named[-1] if len(named) == 1 else None)
+            if tool_result.get("status") != "ok":
+                return {"response": f"I couldn't look that up: {tool_result.get('message')}"}
+            raw = tool_result.get("data")
+            with profiling.stage("summarize"):
+                final = ask_model_to_summarize(raw, message, history,
+                                               is_opinion=parsed.get("analysis_mode") == "opinion",
+                                               enrich=enrich, seasons=seasons)
+            return {"response": final, **first_page_payload(raw)}
+
         cypher = parsed.get("cypher") or parsed.get("query")
         params = parsed.get("params", {}) or {}
+        # always bound: the prompt's `$seasons IS NULL OR ...` keeps queries valid without seasons
+        params["seasons"] = seasons or None
         is_opinion = parsed.get("analysis_mode") == "opinion"  # NEW FLAG
+
+        # Several small independent queries: run together, joined on their key column
+        if parsed.get("queries") and not cypher:
+            print(f"🔀 FAN-OUT: {len(parsed['queries'])} queries")
+            with profiling.stage("execute_fanout"):
+                exec_result = execute_fanout(parsed["queries"], params)
+            if exec_result.get("status") != "ok":
+                return {"response": f"I encountered a database error: {exec_result.get('message')}"}
+            raw = exec_result.get("data")
+            gaps = fanout_caveat(exec_result)
+            with profiling.stage("summarize"):
+                final = ask_model_to_summarize(raw, message, history, is_opinion=is_opinion,
+                                               enrich=enrich, caveat=gaps, seasons=seasons)
+            coverage = {k: exec_result[k] for k in ("merged_on", "failed", "dropped", "truncated")}
+            return {"response": final, "fanout": coverage, **first_page_payload(raw)}
         
         if not cypher:
             return {"response": "I couldn't generate a valid query for that request."}
 
         # Execute Cypher
-        exec_result = execute_safe_cypher_and_format_results(cypher, params, max_rows=2000)
+        with profiling.stage("execute_cypher"):
+            exec_result = execute_safe_cypher_and_format_results(cypher, params, max_rows=2000)
 
-        # Self-correction loop
+        # Self-correction: known mistakes are rewritten locally first
+        if exec_result.get("status") == "error":
+            repaired, fixes = repair_cypher(cypher, params)
+            if fixes:
+                print(f"🔧 LOCAL REPAIR ({', '.join(fixes)}): {repaired}")
+                with profiling.stage("execute_repaired"):
+                    exec_result = execute_safe_cypher_and_format_results(repaired, params, max_rows=2000)
+                cypher = repaired
+                cypher_repairs.record_local(fixes, exec_result.get("status") == "ok")
+
+        # ...then the model gets one retry, if the error is one a rewrite can fix
         if exec_result.get("status") == "error":
-            print(f"⚠️ Query Error: {exec_result.get('message')} - Retrying...")
-            
-            retry_prompt = (
-                f"The previous Cypher query failed.\n"
-                f"Your Query: {cypher}\n"
-                f"Database Error: {exec_result.get('message')}\n"
-                "Please fix the syntax."
-            )
-            
-            retry_text = ask_model_for_cypher(retry_prompt, req.history)
-            parsed_retry = extract_json_from_model_text(retry_text)
-            
-            if parsed_retry and (parsed_retry.get("cypher") or parsed_retry.get("query")):
-                cypher = parsed_retry.get("cypher") or parsed_retry.get("query")
-                print(f"🔄 RETRYING WITH: {cypher}")
-                exec_result = execute_safe_cypher_and_format_results(cypher, params, max_rows=2000)
+            error_kind = classify_cypher_error(exec_result.get("message"), exec_result.get("code"))
+            cypher_repairs.record_error(error_kind)
+            if error_kind not in LLM_RETRYABLE_ERRORS:
+                print(f"⚠️ Query Error ({error_kind}): {exec_result.get('message')} - not retrying")
+                cypher_repairs.record_skipped()
+            else:
+                print(f"⚠️ Query Error ({error_kind}): {exec_result.get('message')} - Retrying...")
+
+                retry_prompt = (
+                    f"The previous Cypher query failed.\n"
+                    f"Your Query: {cypher}\n"
+                    f"Database Error: {exec_result.get('message')}\n"
+                    "Please fix the syntax."
+                )
+
+                with profiling.stage("regenerate_cypher"):
+                    retry_text = ask_model_for_cypher(retry_prompt, history)
+                parsed_retry = extract_json_from_model_text(retry_text)
+
+                if parsed_retry and (parsed_retry.get("cypher") or parsed_retry.get("query")):
+                    cypher = parsed_retry.get("cypher") or parsed_retry.get("query")
+                    print(f"🔄 RETRYING WITH: {cypher}")
+                    with profiling.stage("execute_retry"):
+                        exec_result = execute_safe_cypher_and_format_results(cypher, params, max_rows=2000)
+                cypher_repairs.record_llm(exec_result.get("status") == "ok")
+
+        # Nothing matched: the summarizer explains that without another model call
+        if exec_result.get("status") == "error" and classify_cypher_error(exec_result.get("message")) == "empty":
+            return {"response": ask_model_to_summarize([], message, history)}
 
         if exec_result.get("status") != "ok":
             return {"response": f"I encountered a database error: {exec_result.get('message')}"}
@@ -435,9 +647,200 @@ async def chat_endpoint(req: ChatRequest):
         raw = exec_result.get("data")
 
         # Summarize with opinion flag
-        final = ask_model_to_summarize(raw, req.message, req.history, is_opinion=is_opinion)
-        return {"response": final, "raw": raw}
-
+        with profiling.stage("summarize"):
+            final = ask_model_to_summarize(raw, message, history, is_opinion=is_opinion, enrich=enrich,
+                                           seasons=seasons)
+        # Only the first page goes inline; the full result is served by GET /results/{id}
+        return {"response": final, **first_page_payload(raw)}
+
+    except Overloaded:
+        raise
     except Exception as e:
         traceback.print_exc()
-        return {"response": "System error occurred.", "error": str(e)}
\ No newline at end of file
+        return {"response": "System error occurred.", "error": str(e)}
+
+def run_prioritized(priority: str, session_id: Optional[str], fn, *args):
+    """fn(*args) on this (worker) thread with its LLM calls scheduled as `priority` for `session_id`"""
+    with llm_priority(priority, session_id):
+        return fn(*args)
+
+chat_flights = SingleFlight()
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"response": exc.message},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+def _deadline_budget(request: Request):
+    # optional client budget in ms; the queue never waits longer than CHAT_QUEUE_TIMEOUT anyway
+    value = request.headers.get("X-Deadline-Ms")
+    try:
+        return max(0.0, float(value) / 1000) if value else None
+    except ValueError:
+        return None
+
+def _variant(enrich: bool, seasons: Optional[List[str]]) -> str:
+    # requests that differ only in these options must not share a result
+    return ("enrich" if enrich else "") + ("|" + ",".join(sorted(seasons)) if seasons else "")
+
+@app.post("/chat")
+async def chat_endpoint(req: ChatRequest, request: Request):
+    budget = _deadline_budget(request)
+
+    # Opt-in profiling (PROFILING_ENABLED): runs alone, never coalesced with other requests
+    if profiling.profiling_allowed(request.headers.get("X-Profile") or request.query_params.get("profile")):
+        async with chat_admission.admit(budget):
+            return await run_in_threadpool(run_prioritized, "interactive", req.session_id,
+                                           profiling.run_profiled, req.message, run_chat_pipeline,
+                                           req.message, req.history, req.enrich, req.seasons)
+
+    async def admitted_run():
+        async with chat_admission.admit(budget):
+            return await run_in_threadpool(run_prioritized, "interactive", req.session_id, run_chat_pipeline,
+                                           req.message, req.history, req.enrich, req.seasons)
+
+    # Identical questions arriving while one is already running share its result
+    key = coalescing_key(req.message, req.history, variant=_variant(req.enrich, req.seasons))
+    return await chat_flights.run(key, admitted_run)
+
+@app.post("/chat/batch")
+async def chat_batch_endpoint(req: BatchChatRequest):
+    """
+    Runs many questions through the same pipeline concurrently and streams one NDJSON
+    record per question as it completes, followed by a summary record.
+    Caches, models and the DB connection pool are the process-wide ones; identical
+    questions in the batch are coalesced like on /chat. Questions are admitted through
+    batch_admission, so batches can't take the threads interactive /chat needs, and at most
+    `parallelism` of them are pending at a time.
+    """
+    if len(req.questions) > BATCH_MAX_QUESTIONS:
+        return JSONResponse(status_code=413,
+                            content={"response": f"At most {BATCH_MAX_QUESTIONS} questions per batch."})
+    parallelism = max(1, min(req.parallelism or BATCH_MAX_PARALLELISM, BATCH_MAX_PARALLELISM))
+
+    async def answer(index: int, q: BatchQuestion) -> Dict[str, Any]:
+        start = time.perf_counter()
+
+        async def admitted_run():
+            async with batch_admission.admit():
+                return await run_in_threadpool(run_prioritized, "batch", req.session_id, run_chat_pipeline,
+                                               q.message, q.history, q.enrich, q.seasons)
+
+        try:
+            key = coalescing_key(q.message, q.history, variant=_variant(q.enrich, q.seasons))
+            result = await chat_flights.run(key, admitted_run)
+        except Overloaded as e:
+            result = {"response": e.message, "error": "overloaded"}
+        except Exception as e:
+            result = {"response": "System error occurred.", "error": str(e)}
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        return {"index": index, "id": q.id, "elapsed_ms": elapsed_ms, **result}
+
+    async def stream():
+        batch_start = time.perf_counter()
+        records: asyncio.Queue = asyncio.Queue()
+        # one shared iterator: each question is taken by exactly one of `parallelism` workers
+        pending = iter(enumerate(req.questions))
+
+        async def worker():
+            for index, q in pending:
+                await records.put(await answer(index, q))
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(parallelism, len(req.questions)))]
+        timings = []
+        errors = 0
+        try:
+            for _ in range(len(req.questions)):
+                record = await records.get()
+                timings.append(record["elapsed_ms"])
+                errors += 1 if record.get("error") else 0
+                yield json.dumps(record, default=str) + "\n"
+        finally:
+            for task in workers:
+                task.cancel()
+
+        timings.sort()
+        pct = lambda q: timings[min(len(timings) - 1, int(q * len(timings)))] if timings else 0
+        summary = {
+            "count": len(timings),
+            "errors": errors,
+            "parallelism": parallelism,
+            "total_ms": round((time.perf_counter() - batch_start) * 1000, 1),
+            "mean_ms": round(sum(timings) / len(timings), 1) if timings else 0,
+            "p50_ms": pct(0.5),
+            "p95_ms": pct(0.95),
+            "max_ms": timings[-1] if timings else 0,
+        }
+        yield json.dumps({"summary": summary}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/standings")
+def standings_endpoint(round: Optional[int] = None, date: Optional[str] = None,
+                       team: Optional[str] = None, top: Optional[int] = None, season: Optional[str] = None):
+    return run_tool("standings", {"round": round, "date": date, "team": team, "top": top, "season": season})
+
+@app.get("/players/similar")
+def similar_players_endpoint(name: str, k: int = 10, metric: str = "cosine", same_position: bool = True,
+                             season: Optional[str] = None):
+    return run_tool("similar_players", {"player": name, "k": k, "metric": metric,
+                                        "same_position": same_position, "season": season})
+
+@app.get("/form/player")
+def player_form_endpoint(name: str, last: Optional[int] = None, since: Optional[str] = None,
+                         before: Optional[str] = None, season: Optional[str] = None):
+    return run_tool("player_form", {"player": name, "last": last, "since": since, "before": before,
+                                    "season": season})
+
+@app.get("/form/team")
+def team_form_endpoint(name: str, last: Optional[int] = None, since: Optional[str] = None,
+                       before: Optional[str] = None, season: Optional[str] = None):
+    return run_tool("team_form", {"team": name, "last": last, "since": since, "before": before,
+                                  "season": season})
+
+@app.get("/head-to-head")
+def head_to_head_endpoint(team_a: str, team_b: str, season: Optional[str] = None):
+    return run_tool("head_to_head", {"team_a": team_a, "team_b": team_b, "season": season})
+
+@app.get("/results/{result_id}")
+def results_endpoint(result_id: str, offset: int = 0, limit: int = RESULT_PAGE_SIZE):
+    """Further pages of a chat result, columnar (column names once, then value rows)"""
+    try:
+        page = result_store.page(result_id, offset, limit)
+    except ResultExpired:
+        return JSONResponse(status_code=410, content={
+            "response": f"Result expired (results are kept for {result_store.ttl:.0f}s); ask the question again."})
+    if page is None:
+        # workers on other hosts only see it with a shared RESULT_STORE_DIR (or sticky routing)
+        return JSONResponse(status_code=404, content={"response": "Result not found on this server."})
+    return page
+
+@app.get("/health")
+def health_endpoint():
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready_endpoint():
+    if _ready.is_set():
+        return {"ready": True}
+    return JSONResponse(status_code=503, content={"ready": False, "error": _warm_up_error,
+                                                  "attempts": _warm_up_attempts})
+
+@app.get("/stats")
+def stats_endpoint():
+    return {
+        "coalescing": dict(chat_flights.stats),
+        "admission": {
+            **chat_admission.stats,
+            "in_flight": chat_admission.in_flight,
+            "queue_depth": chat_admission.queued,
+            "batch": {**batch_admission.stats, "in_flight": batch_admission.in_flight,
+                      "queue_depth": batch_admission.queued},
+        },
+        "stages": {"llm": llm_limiter.snapshot(), "db": dict(db_limiter.stats)},
+        "query_shapes": query_shapes.snapshot(),
+        "cypher_repair": cypher_repairs.snapshot(),
+    }
@@ -1,6 +1,7 @@
 # app/neo4j_client.py
-from neo4j import GraphDatabase
-import os, time
+from neo4j import GraphDatabase, Query
+import os, time, threading
+from app import profiling
 
 NEO_URI = os.environ.get("NEO4J_URI")
 NEO_USER = os.environ.get("NEO4J_USER")
@@ -10,29 +11,63 @@ class Neo4jClient:
     def __init__(self, uri=NEO_URI, auth=(NEO_USER, NEO_PASS)):
         self.uri = uri
         self.auth = auth
-        self.driver = GraphDatabase.driver(self.uri, auth=self.auth)
+        # the driver (and its pool) is opened on first use, i.e. inside each worker process
+        self._driver = None
+        self._driver_lock = threading.Lock()
         # cache for schema metadata
         self._labels = None
         self._rels = None
         self._prop_keys = None
+        self._label_props = {}
+        self._rel_props = {}
         self._ts = 0
         self._ttl = 300
+        self._schema_lock = threading.Lock()
+        self._refresh_flag_lock = threading.Lock()
+        self._refreshing = False
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            with self._driver_lock:
+                if self._driver is None:
+                    self._driver = GraphDatabase.driver(self.uri, auth=self.auth)
+        return self._driver
 
     def close(self):
-        self.driver.close()
+        if self._driver is not None:
+            self._driver.close()
+            self._driver = None
+
+    def warm_up(self):
+        # open pooled connections and load the schema catalog before serving traffic
+        self.driver.verify_connectivity()
+        self._refresh_schema(force=True)
 
-    def query(self, query, params=None, timeout_seconds=30):
-        # runs query and returns list of dict rows
+    def query(self, query, params=None, timeout_seconds=None):
+        # runs query and returns list of dict rows; the server aborts it after timeout_seconds
+        # (None: the server's default)
         with self.driver.session() as session:
-            result = session.run(query, params or {})
+            result = session.run(Query(query, timeout=timeout_seconds), params or {})
             # convert to dicts
             rows = [record.data() for record in result]
+            if profiling.active():
+                summary = result.consume()
+                profiling.record("db", rows=len(rows), query_type=summary.query_type,
+                                 available_after_ms=summary.result_available_after,
+                                 consumed_after_ms=summary.result_consumed_after,
+                                 counters={k: v for k, v in vars(summary.counters).items() if v and not k.startswith("_")})
             return rows
 
+    def get_dataset_version(self):
+        # bumped by scripts/import_data.py --incremental, 0 if the graph was never versioned
+        rows = self.query("MATCH (d:Dataset {name: 'premier_league'}) RETURN d.version AS version")
+        return rows[0]["version"] if rows else 0
+
     # Schema helpers (cached)
-    def _refresh_schema(self, force=False):
-        if not force and self._labels and (time.time() - self._ts) < self._ttl:
-            return
+    # The catalog is loaded synchronously once; after the TTL it is served stale while a
+    # single background thread refreshes it, so requests never wait on the procedure calls.
+    def _load_schema(self):
         with self.driver.session() as session:
             try:
                 labels = [r["label"] for r in session.run("CALL db.labels()")]
@@ -47,11 +82,58 @@ class Neo4jClient:
                 prop_keys = [r.value(0) for r in prop_rows]
             except Exception:
                 prop_keys = []
+            label_props = {}
+            try:
+                rows = session.run("CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName")
+                for r in rows:
+                    for label in r["nodeLabels"]:
+                        props = label_props.setdefault(label, set())
+                        if r["propertyName"]:
+                            props.add(r["propertyName"])
+            except Exception:
+                label_props = {}
+            rel_props = {}
+            try:
+                rows = session.run("CALL db.schema.relTypeProperties() YIELD relType, propertyName")
+                for r in rows:
+                    # relType comes back as ":`PLAYED_IN`"
+                    rel = r["relType"].lstrip(":").strip("`")
+                    props = rel_props.setdefault(rel, set())
+                    if r["propertyName"]:
+                        props.add(r["propertyName"])
+            except Exception:
+                rel_props = {}
         self._labels = set(labels)
         self._rels = set(rels)
         self._prop_keys = set(prop_keys)
+        self._label_props = label_props
+        self._rel_props = rel_props
         self._ts = time.time()
 
+    def _background_refresh(self):
+        try:
+            with self._schema_lock:
+                self._load_schema()
+        except Exception as e:
+            print(f"⚠️ Schema refresh failed, keeping cached catalog: {e}")
+        finally:
+            self._refreshing = False
+
+    def _refresh_schema(self, force=False):
+        if force or self._labels is None:
+            with self._schema_lock:
+                # another thread may have loaded it while we waited
+                if force or self._labels is None:
+                    self._load_schema()
+            return
+        if (time.time() - self._ts) < self._ttl:
+            return
+        with self._refresh_flag_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
     def get_labels(self, refresh=False):
         self._refresh_schema(force=refresh)
         return list(self._labels or [])
@@ -64,5 +146,14 @@ class Neo4jClient:
         self._refresh_schema(force=refresh)
         return list(self._prop_keys or [])
 
-# single exported client instance
+    def get_label_properties(self, label, refresh=False):
+        # None means the label is not in the catalog (or the catalog could not be read)
+        self._refresh_schema(force=refresh)
+        return self._label_props.get(label)
+
+    def get_rel_properties(self, rel_type, refresh=False):
+        self._refresh_schema(force=refresh)
+        return self._rel_props.get(rel_type)
+
+# single exported client instance (no connection is made until first use)
 db = Neo4jClient()
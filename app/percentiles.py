@@ -0,0 +1,102 @@
+# app/percentiles.py
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+from app.profile_store import PER90_STATS, POSITION_NAMES, ProfileStore, get_profile_store
+from app.season_data import get_season_data, on_season_reload
+
+# Only players with this many minutes form the distributions (and get percentiles)
+PERCENTILE_MIN_MINUTES = 600
+# How many stats per entity go into a prompt (the most extreme ones)
+PERCENTILE_PROMPT_STATS = 8
+
+TEAM_STATS = ["goals_for_pm", "goals_against_pm", "xg_pm", "passes_pm", "pass_accuracy",
+              "long_ball_share", "crosses_pm", "tackles_pm", "interceptions_pm"]
+# For these a lower value is better, so the percentile is flipped
+LOWER_IS_BETTER = {"goals_against_pm"}
+
+class PercentileTables:
+    """
+    Sorted per-position distributions of every per-90 stat (and team per-match stats),
+    so the percentile of any value is a bisect away.
+    """
+
+    def __init__(self, store: ProfileStore, min_minutes: int = PERCENTILE_MIN_MINUTES):
+        self.store = store
+        self.min_minutes = min_minutes
+        self.tables: Dict[Tuple[str, str], List[float]] = {}
+
+        groups: Dict[str, list] = {}
+        for p in store.players.values():
+            if p.minutes >= min_minutes and p.position:
+                groups.setdefault(p.position, []).append(p)
+        for position, players in groups.items():
+            for stat in PER90_STATS:
+                self.tables[(position, stat)] = sorted(p.per90[stat] for p in players)
+
+        for stat in TEAM_STATS:
+            self.tables[("TEAM", stat)] = sorted(getattr(t, stat) for t in store.teams.values())
+
+    def rank(self, group: str, stat: str, value: float) -> Optional[float]:
+        """Percentile (0-100) of `value` within the group's distribution, ties counted half"""
+        values = self.tables.get((group, stat))
+        if not values:
+            return None
+        below = bisect.bisect_left(values, value)
+        at_or_below = bisect.bisect_right(values, value)
+        pct = 100.0 * (below + at_or_below) / (2 * len(values))
+        return 100.0 - pct if stat in LOWER_IS_BETTER else pct
+
+    def player_percentiles(self, name: str) -> Dict[str, Tuple[float, float]]:
+        p = self.store.players.get(name)
+        if not p or p.minutes < self.min_minutes:
+            return {}
+        result = {}
+        for stat in PER90_STATS:
+            pct = self.rank(p.position, stat, p.per90[stat])
+            if pct is not None:
+                result[stat] = (p.per90[stat], round(pct))
+        return result
+
+    def team_percentiles(self, name: str) -> Dict[str, Tuple[float, float]]:
+        t = self.store.teams.get(name)
+        if not t:
+            return {}
+        return {stat: (getattr(t, stat), round(self.rank("TEAM", stat, getattr(t, stat)))) for stat in TEAM_STATS}
+
+    def player_context(self, name: str) -> str:
+        ranks = self.player_percentiles(name)
+        if not ranks:
+            return ""
+        p = self.store.players[name]
+        group = POSITION_NAMES.get(p.position, p.position) + "s"
+        return (f"- {name} vs {group} ({self.min_minutes}+ mins), per 90: "
+                f"{_format_extremes(ranks)}\n")
+
+    def team_context(self, name: str) -> str:
+        ranks = self.team_percentiles(name)
+        if not ranks:
+            return ""
+        return f"- {name} vs the league, per match: {_format_extremes(ranks)}\n"
+
+def _format_extremes(ranks: Dict[str, Tuple[float, float]]) -> str:
+    # the stats furthest from the median say the most about a profile
+    ordered = sorted(ranks.items(), key=lambda kv: -abs(kv[1][1] - 50))[:PERCENTILE_PROMPT_STATS]
+    return ", ".join(f"{stat} {value} (p{pct})" for stat, (value, pct) in ordered)
+
+# keyed by season, like the profile stores they are built from
+_tables: Dict[str, PercentileTables] = {}
+_tables_lock = threading.Lock()
+
+def _reload_tables(season_data):
+    _tables.clear()
+
+on_season_reload(_reload_tables)
+
+def get_percentile_tables(season: Optional[str] = None) -> PercentileTables:
+    key = season or get_season_data().latest_season or ""
+    if key not in _tables:
+        with _tables_lock:
+            if key not in _tables:
+                _tables[key] = PercentileTables(get_profile_store(key or None))
+    return _tables[key]
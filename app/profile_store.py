@@ -0,0 +1,277 @@
+# app/profile_store.py
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+from app.season_data import SeasonData, get_season_data, on_season_reload
+
+# Players below this many minutes get a profile line but no archetype
+MIN_MINUTES_FOR_ARCHETYPE = 450
+
+POSITION_NAMES = {"G": "Goalkeeper", "D": "Defender", "M": "Midfielder", "F": "Forward"}
+
+PER90_STATS = [
+    "goals", "expectedGoals", "goalAssist", "expectedAssists", "keyPass", "bigChanceCreated",
+    "totalShots", "totalPass", "accuratePass", "totalLongBalls", "totalCross", "touches",
+    "totalTackle", "interceptionWon", "totalClearance", "ballRecovery", "aerialWon", "duelWon",
+    "saves", "goalsPrevented",
+]
+
+class TeamProfile(NamedTuple):
+    name: str
+    matches: int
+    goals_for_pm: float
+    goals_against_pm: float
+    xg_pm: float
+    passes_pm: float
+    pass_accuracy: float
+    long_ball_share: float
+    crosses_pm: float
+    tackles_pm: float
+    interceptions_pm: float
+    style: List[str]
+    key_players: List[str]
+
+class PlayerProfile(NamedTuple):
+    name: str
+    team: str
+    position: str
+    appearances: int
+    minutes: int
+    per90: Dict[str, float]
+    archetype: Optional[str]
+
+def _num(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+def _quantile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class ProfileStore:
+    """
+    Team style fingerprints and player role archetypes derived from the season data.
+    Lookups are plain dict hits; nothing here queries the database after build().
+    """
+
+    def __init__(self, teams: Dict[str, TeamProfile], players: Dict[str, PlayerProfile]):
+        self.teams = teams
+        self.players = players
+
+    @classmethod
+    def build(cls, season: SeasonData) -> "ProfileStore":
+        players = cls._build_players(season)
+        teams = cls._build_teams(season, players)
+        return cls(teams, players)
+
+    @staticmethod
+    def _build_players(season: SeasonData) -> Dict[str, PlayerProfile]:
+        totals = defaultdict(lambda: defaultdict(float))
+        meta = {}
+        team_minutes = defaultdict(lambda: defaultdict(float))
+        for p in season.performances:
+            stats = p.get("stats") or {}
+            minutes = _num(stats.get("minutesPlayed"))
+            if minutes <= 0:
+                continue
+            name = p["name"]
+            meta.setdefault(name, p.get("position") or "")
+            team_minutes[name][stats.get("team", "")] += minutes
+            acc = totals[name]
+            acc["minutes"] += minutes
+            acc["appearances"] += 1
+            for key in PER90_STATS:
+                acc[key] += _num(stats.get(key))
+
+        profiles = {}
+        for name, acc in totals.items():
+            per90 = {key: round(acc[key] * 90 / acc["minutes"], 2) for key in PER90_STATS}
+            team = max(team_minutes[name].items(), key=lambda kv: kv[1])[0]
+            profiles[name] = PlayerProfile(name, team, meta[name], int(acc["appearances"]),
+                                           int(acc["minutes"]), per90, None)
+
+        # Archetype thresholds are relative to qualified players in the same position
+        by_position = defaultdict(list)
+        for prof in profiles.values():
+            if prof.minutes >= MIN_MINUTES_FOR_ARCHETYPE:
+                by_position[prof.position].append(prof)
+        for position, group in by_position.items():
+            high = {key: _quantile([g.per90[key] for g in group], 0.75) for key in PER90_STATS}
+            for prof in group:
+                profiles[prof.name] = prof._replace(archetype=_archetype(position, prof.per90, high))
+        return profiles
+
+    @staticmethod
+    def _build_teams(season: SeasonData, players: Dict[str, PlayerProfile]) -> Dict[str, TeamProfile]:
+        goals = defaultdict(lambda: [0, 0, 0])  # matches, for, against
+        for m in season.matches:
+            goals[m["home"]][0] += 1
+            goals[m["home"]][1] += m["home_goals"]
+            goals[m["home"]][2] += m["away_goals"]
+            goals[m["away"]][0] += 1
+            goals[m["away"]][1] += m["away_goals"]
+            goals[m["away"]][2] += m["home_goals"]
+
+        sums = defaultdict(lambda: defaultdict(float))
+        for p in season.performances:
+            stats = p.get("stats") or {}
+            acc = sums[stats.get("team")]
+            for key in ("expectedGoals", "totalPass", "accuratePass", "totalLongBalls",
+                        "totalCross", "totalTackle", "interceptionWon"):
+                acc[key] += _num(stats.get(key))
+
+        raw = {}
+        for team, (played, scored, conceded) in goals.items():
+            if not played:
+                continue
+            acc = sums[team]
+            raw[team] = {
+                "matches": played,
+                "goals_for_pm": scored / played,
+                "goals_against_pm": conceded / played,
+                "xg_pm": acc["expectedGoals"] / played,
+                "passes_pm": acc["totalPass"] / played,
+                "pass_accuracy": acc["accuratePass"] / acc["totalPass"] if acc["totalPass"] else 0.0,
+                "long_ball_share": acc["totalLongBalls"] / acc["totalPass"] if acc["totalPass"] else 0.0,
+                "crosses_pm": acc["totalCross"] / played,
+                "tackles_pm": acc["totalTackle"] / played,
+                "interceptions_pm": acc["interceptionWon"] / played,
+            }
+
+        squads = defaultdict(list)
+        for prof in players.values():
+            squads[prof.team].append(prof)
+
+        def bands(key):
+            values = [r[key] for r in raw.values()]
+            return _quantile(values, 0.25), _quantile(values, 0.75)
+
+        b = {key: bands(key) for key in ("passes_pm", "long_ball_share", "crosses_pm", "xg_pm", "goals_against_pm")}
+        ball_winning = [r["tackles_pm"] + r["interceptions_pm"] for r in raw.values()]
+        ball_winning_high = _quantile(ball_winning, 0.75)
+
+        def top(key, value):
+            return value > 0 and value >= b[key][1]
+
+        def bottom(key, value):
+            # only meaningful when the league actually spreads out on this stat
+            return b[key][0] < b[key][1] and value <= b[key][0]
+
+        teams = {}
+        for team, r in raw.items():
+            style = []
+            if top("passes_pm", r["passes_pm"]):
+                style.append("possession-heavy build-up")
+            elif bottom("passes_pm", r["passes_pm"]):
+                style.append("low-possession, reactive")
+            if top("long_ball_share", r["long_ball_share"]):
+                style.append("direct, long-ball oriented")
+            elif bottom("long_ball_share", r["long_ball_share"]):
+                style.append("short-passing build-up")
+            if ball_winning_high > 0 and r["tackles_pm"] + r["interceptions_pm"] >= ball_winning_high:
+                style.append("aggressive ball-winning out of possession")
+            if top("crosses_pm", r["crosses_pm"]):
+                style.append("wide, crossing-heavy attacks")
+            if top("xg_pm", r["xg_pm"]):
+                style.append("high chance creation")
+            if bottom("goals_against_pm", r["goals_against_pm"]):
+                style.append("tight defence")
+            elif top("goals_against_pm", r["goals_against_pm"]):
+                style.append("leaky defence")
+
+            squad = sorted(squads.get(team, []),
+                           key=lambda pr: (pr.per90["goals"] + pr.per90["goalAssist"]) * pr.minutes,
+                           reverse=True)
+            key_players = [f"{pr.name} ({pr.archetype or POSITION_NAMES.get(pr.position, pr.position)})"
+                           for pr in squad[:3]]
+            teams[team] = TeamProfile(
+                team, r["matches"],
+                round(r["goals_for_pm"], 2), round(r["goals_against_pm"], 2), round(r["xg_pm"], 2),
+                round(r["passes_pm"], 1), round(r["pass_accuracy"] * 100, 1),
+                round(r["long_ball_share"] * 100, 1), round(r["crosses_pm"], 1),
+                round(r["tackles_pm"], 1), round(r["interceptions_pm"], 1),
+                style, key_players,
+            )
+        return teams
+
+    def team_context(self, name: str) -> str:
+        t = self.teams.get(name)
+        if not t:
+            return ""
+        return f"""
+TEAM CONTEXT - {t.name} ({t.matches} matches):
+- Style Fingerprint: {', '.join(t.style) or 'league-average profile'}
+- Per Match: {t.goals_for_pm} scored, {t.goals_against_pm} conceded, {t.xg_pm} xG, {t.passes_pm} passes ({t.pass_accuracy}% accurate)
+- Long-Ball Share: {t.long_ball_share}% | Crosses: {t.crosses_pm} | Tackles: {t.tackles_pm} | Interceptions: {t.interceptions_pm}
+- Key Players: {', '.join(t.key_players) or 'N/A'}
+"""
+
+    def player_context(self, name: str) -> str:
+        p = self.players.get(name)
+        if not p:
+            return ""
+        s = p.per90
+        role = p.archetype or POSITION_NAMES.get(p.position, p.position or "Player")
+        return (f"\nPLAYER PROFILE - {p.name} ({p.team}): {role}. "
+                f"{p.appearances} apps, {p.minutes} mins. Per 90: {s['goals']} goals, {s['expectedGoals']} xG, "
+                f"{s['goalAssist']} assists, {s['keyPass']} key passes, {s['totalTackle']} tackles, "
+                f"{s['interceptionWon']} interceptions\n")
+
+def _archetype(position: str, s: Dict[str, float], high: Dict[str, float]) -> str:
+    def is_high(key):
+        return s[key] > 0 and s[key] >= high[key]
+
+    if position == "G":
+        if is_high("saves") or is_high("goalsPrevented"):
+            return "Shot-stopping goalkeeper"
+        if is_high("totalLongBalls"):
+            return "Distributing goalkeeper - launches attacks long"
+        return "Goalkeeper"
+    if position == "D":
+        if is_high("totalCross") or is_high("keyPass"):
+            return "Attacking full-back - width and final-third delivery"
+        if is_high("aerialWon") and is_high("totalClearance"):
+            return "Aerial stopper - dominant in the box"
+        if is_high("totalPass"):
+            return "Ball-playing defender - builds from the back"
+        return "Defensive stopper"
+    if position == "M":
+        if (is_high("totalTackle") or is_high("interceptionWon")) and not is_high("keyPass"):
+            return "Ball-winning midfielder - screens and recovers possession"
+        if is_high("keyPass") or is_high("expectedAssists"):
+            return "Creative playmaker - chance creation between the lines"
+        if is_high("expectedGoals") or is_high("goals"):
+            return "Goal-threat midfielder - late runs into the box"
+        if is_high("totalPass"):
+            return "Deep-lying distributor - tempo setter"
+        return "Box-to-box midfielder"
+    if position == "F":
+        if is_high("expectedGoals") and not is_high("touches"):
+            return "Penalty-box striker - elite positioning, limited build-up involvement"
+        if is_high("keyPass") or is_high("bigChanceCreated"):
+            return "Creative forward - drops in and creates"
+        if is_high("totalShots"):
+            return "High-volume shooter"
+        return "Forward - works the channels"
+    return POSITION_NAMES.get(position, "Player")
+
+# one store per season ("" for a graph without seasons)
+_stores: Dict[str, ProfileStore] = {}
+_store_lock = threading.Lock()
+
+def _reload_stores(season_data: SeasonData):
+    # rebuilt from the new data on next use
+    _stores.clear()
+
+on_season_reload(_reload_stores)
+
+def get_profile_store(season: Optional[str] = None) -> ProfileStore:
+    """Profiles of one season (default: the latest)"""
+    season_data = get_season_data()
+    key = season or season_data.latest_season or ""
+    if key not in _stores:
+        with _store_lock:
+            if key not in _stores:
+                _stores[key] = ProfileStore.build(season_data.for_season(key or None))
+    return _stores[key]
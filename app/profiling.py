@@ -0,0 +1,133 @@
+# app/profiling.py
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# --- CONFIG --- #
+# Off unless explicitly enabled; PROFILE_TOKEN (if set) must be sent as the X-Profile header value
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "0.005"))
+
+# The profile of the request running in this context; None (the common case) makes every hook a no-op
+_current: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("request_profile", default=None)
+
+def profiling_allowed(flag: Optional[str]) -> bool:
+    """Whether a request's X-Profile header / ?profile= value turns profiling on"""
+    if not PROFILING_ENABLED or not flag:
+        return False
+    return flag == PROFILE_TOKEN if PROFILE_TOKEN else flag.lower() in ("1", "true", "yes")
+
+def active() -> bool:
+    return _current.get() is not None
+
+def record(kind: str, **data):
+    """Adds an event (cypher, db, prompt, ...) to the current request's profile, if any"""
+    profile = _current.get()
+    if profile is not None:
+        profile.events.append({"kind": kind, "at_ms": profile.elapsed_ms(), **data})
+
+@contextmanager
+def stage(name: str):
+    """Times a pipeline stage for the current request's profile (free when not profiling)"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stages.append({"stage": name, "start_ms": round((start - profile.start) * 1000, 1),
+                               "ms": round((time.perf_counter() - start) * 1000, 1)})
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class RequestProfile:
+    def __init__(self, label: str):
+        self.id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.label = label
+        self.start = time.perf_counter()
+        self.events = []
+        self.stages = []
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.start) * 1000, 1)
+
+    def write(self, sampler: StackSampler, total_ms: float, error: Optional[str]) -> str:
+        """profile.json (summary + events) and stacks.folded (flamegraph.pl / speedscope input)"""
+        path = os.path.join(PROFILE_DIR, self.id)
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "stacks.folded"), "w", encoding="utf-8") as f:
+            for stack, count in sampler.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        summary = {
+            "id": self.id,
+            "label": self.label,
+            "total_ms": total_ms,
+            "error": error,
+            "sample_interval_ms": sampler.interval * 1000,
+            "samples": sum(sampler.counts.values()),
+            "stages": self.stages,
+            "cypher": [e for e in self.events if e["kind"] == "cypher"],
+            "db": [e for e in self.events if e["kind"] == "db"],
+            "prompts": [e for e in self.events if e["kind"] == "prompt"],
+            "events": self.events,
+        }
+        with open(os.path.join(path, "profile.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, default=str)
+        return path
+
+def run_profiled(label: str, fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """
+    Runs fn(*args) on this thread while sampling its stack, then writes the artifact.
+    The returned dict gets a "profile" entry with the artifact id and path.
+    """
+    profile = RequestProfile(label)
+    token = _current.set(profile)
+    sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+    sampler.start()
+    error = None
+    try:
+        result = fn(*args)
+    except Exception as e:
+        error = repr(e)
+        raise
+    finally:
+        sampler.stop()
+        _current.reset(token)
+        path = profile.write(sampler, profile.elapsed_ms(), error)
+        print(f"🔬 Profile written to {path}")
+    return {**result, "profile": {"id": profile.id, "path": path}}
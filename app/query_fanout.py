@@ -0,0 +1,135 @@
+# app/query_fanout.py
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from app.admission import Overloaded
+from app.cypher_guard import execute_safe_cypher_and_format_results, repair_cypher, cypher_repairs
+
+# --- CONFIG --- #
+# A "queries" answer is cut to this many queries, and their merged result to this many rows
+FANOUT_MAX_QUERIES = int(os.environ.get("FANOUT_MAX_QUERIES", "4"))
+FANOUT_MAX_ROWS = int(os.environ.get("FANOUT_MAX_ROWS", "2000"))
+
+_pool = ThreadPoolExecutor(max_workers=max(1, FANOUT_MAX_QUERIES * 2), thread_name_prefix="query-fanout")
+
+def _run_one(cypher: str, params: Dict[str, Any], max_rows: int) -> Dict[str, Any]:
+    # each query gets its own session; a failed one gets the local repair, never an LLM retry
+    result = execute_safe_cypher_and_format_results(cypher, params, max_rows=max_rows)
+    if result.get("status") == "error":
+        repaired, fixes = repair_cypher(cypher, params)
+        if fixes:
+            result = execute_safe_cypher_and_format_results(repaired, params, max_rows=max_rows)
+            cypher_repairs.record_local(fixes, result.get("status") == "ok")
+    return result
+
+def _merge_key(specs: List[Dict[str, Any]], results: Dict[str, List[Dict[str, Any]]]) -> Optional[str]:
+    """The declared key if every result has it, else the first column all results share"""
+    columns = [list(rows[0]) for rows in results.values() if rows]
+    if not columns:
+        return None
+    declared = [s.get("key") for s in specs if s.get("key")]
+    for key in declared + columns[0]:
+        if all(key in c for c in columns):
+            return key
+    return None
+
+def concatenate(results: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Every part's rows, each tagged with the part it came from"""
+    return [{"query": name, **row} for name, rows in results.items() for row in rows]
+
+def merge_by_key(results: Dict[str, List[Dict[str, Any]]], key: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Outer join of the named results on `key`, in first-seen order. A column that two
+    queries both return with different values is kept as "<query>.<column>".
+    None when a key value can't be joined on (a node, map or list).
+    """
+    merged: Dict[Any, Dict[str, Any]] = {}
+    for name, rows in results.items():
+        for row in rows:
+            try:
+                target = merged.setdefault(row[key], {key: row[key]})
+            except TypeError:
+                return None
+            for column, value in row.items():
+                if column == key:
+                    continue
+                if column in target and target[column] != value:
+                    column = f"{name}.{column}"
+                target[column] = value
+    return list(merged.values())
+
+def execute_fanout(specs: List[Dict[str, Any]], params: Dict[str, Any] = None,
+                   max_rows: int = FANOUT_MAX_ROWS) -> Dict[str, Any]:
+    """
+    Runs the model's independent small queries ({"name", "cypher", "params", "key"}) at
+    once, then joins them on their shared key column (or, without one, concatenates their
+    rows tagged with a "query" column), so "data" is always a list of rows.
+    Parts that fail are listed under "failed"; it is an error only if none returns rows.
+    Same {"status", "data"} shape as execute_safe_cypher_and_format_results, plus the
+    coverage fields and caveat(), which describes what the answer is missing.
+    """
+    specs = [s for s in specs if isinstance(s, dict) and (s.get("cypher") or s.get("query"))]
+    if not specs:
+        return {"status": "error", "message": "No queries to run."}
+    dropped = len(specs) - FANOUT_MAX_QUERIES
+    specs = specs[:FANOUT_MAX_QUERIES]
+
+    names = []
+    for i, spec in enumerate(specs):
+        name = str(spec.get("name") or f"q{i}")
+        names.append(name if name not in names else f"{name}{i}")
+    per_query_rows = max(1, max_rows // len(specs))
+    # each part runs in a copy of this context, so the request's profile and LLM priority follow it
+    futures = {name: _pool.submit(contextvars.copy_context().run, _run_one,
+                                  spec.get("cypher") or spec.get("query"),
+                                  {**(spec.get("params") or {}), **(params or {})}, per_query_rows)
+               for name, spec in zip(names, specs)}
+
+    results, failed = {}, {}
+    for name, future in futures.items():
+        try:
+            outcome = future.result()
+        except Overloaded:
+            raise
+        except Exception as e:
+            outcome = {"status": "error", "message": str(e)}
+        if outcome.get("status") == "ok":
+            results[name] = outcome["data"]
+        else:
+            failed[name] = outcome.get("message")
+    for name, message in failed.items():
+        print(f"⚠️ Fan-out query '{name}' failed: {message}")
+
+    if not results:
+        return {"status": "error", "message": "; ".join(f"{n}: {m}" for n, m in failed.items())}
+
+    if len(results) == 1:
+        key, data = None, next(iter(results.values()))
+    else:
+        key = _merge_key(specs, results)
+        data = merge_by_key(results, key) if key is not None else None
+        if data is None:
+            key, data = None, concatenate(results)
+    truncated = len(data) > max_rows
+    return {
+        "status": "ok",
+        "data": data[:max_rows] if truncated else data,
+        "merged_on": key,
+        "failed": failed,
+        "dropped": max(0, dropped),
+        "truncated": truncated,
+        "parts": len(specs) + max(0, dropped),
+    }
+
+def caveat(result: Dict[str, Any]) -> Optional[str]:
+    """One sentence on what a fan-out answer is missing (None if nothing)"""
+    missing = list(result.get("failed") or {})
+    notes = []
+    if missing or result.get("dropped"):
+        answered = result["parts"] - len(missing) - result.get("dropped", 0)
+        notes.append(f"only {answered} of the {result['parts']} requested data sets could be retrieved"
+                     + (f" ({', '.join(missing)} failed)" if missing else ""))
+    if result.get("truncated"):
+        notes.append(f"the combined result was cut to {len(result['data'])} rows")
+    return ("Based on partial data: " + "; ".join(notes) + ".") if notes else None
@@ -0,0 +1,153 @@
+# app/result_store.py
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+RESULT_TTL_SECONDS = float(os.environ.get("RESULT_TTL_SECONDS", "600"))
+RESULT_STORE_MAX_ENTRIES = int(os.environ.get("RESULT_STORE_MAX_ENTRIES", "500"))
+RESULT_PAGE_SIZE = int(os.environ.get("RESULT_PAGE_SIZE", "20"))
+RESULT_MAX_PAGE_SIZE = 500
+# Results are also written here so every worker on the host can serve any result_id.
+# Several hosts need this on shared storage, or sticky routing per client.
+RESULT_STORE_DIR = os.environ.get("RESULT_STORE_DIR", os.path.join(tempfile.gettempdir(), "football-results"))
+_RESULT_ID = re.compile(r"[0-9a-f]{32}")
+
+class ResultExpired(Exception):
+    """The result existed but its TTL has passed"""
+
+def to_columnar(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """[{a: 1, b: 2}, {a: 3, b: 4}] -> {"columns": ["a", "b"], "rows": [[1, 2], [3, 4]]}"""
+    columns: List[str] = []
+    seen = set()
+    for row in rows:
+        for key in row:
+            if key not in seen:
+                seen.add(key)
+                columns.append(key)
+    return {"columns": columns, "rows": [[row.get(c) for c in columns] for row in rows]}
+
+class ResultStore:
+    """
+    Query results kept server-side for a short TTL so responses only carry the first page.
+    Each result is a JSON file in `directory` (shared by the workers of a host) with an
+    LRU-bounded in-memory copy in front; expired entries are dropped on access and on insert.
+    """
+
+    def __init__(self, ttl: float = RESULT_TTL_SECONDS, max_entries: int = RESULT_STORE_MAX_ENTRIES,
+                 directory: Optional[str] = RESULT_STORE_DIR):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.directory = directory
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept_at = 0.0
+
+    def _path(self, result_id: str) -> str:
+        return os.path.join(self.directory, f"{result_id}.json")
+
+    def put(self, rows: List[Dict[str, Any]]) -> str:
+        result_id = uuid.uuid4().hex
+        expires = time.time() + self.ttl
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = self._path(result_id) + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"expires": expires, "rows": rows}, f, default=str)
+                os.replace(tmp_path, self._path(result_id))
+            except OSError as e:
+                # still served by this worker from memory
+                print(f"⚠️ Result {result_id} not shared with other workers: {e}")
+        with self._lock:
+            self._evict(time.time())
+            self._entries[result_id] = (expires, rows)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id: str) -> Optional[List[Dict[str, Any]]]:
+        """The rows, None for an unknown id; raises ResultExpired once the TTL has passed"""
+        if not _RESULT_ID.fullmatch(result_id or ""):
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is not None:
+                if entry[0] <= now:
+                    del self._entries[result_id]
+                    raise ResultExpired(result_id)
+                self._entries.move_to_end(result_id)
+                return entry[1]
+        # minted by another worker (or evicted from memory here)
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(result_id), encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if stored["expires"] <= now:
+            raise ResultExpired(result_id)
+        with self._lock:
+            self._entries[result_id] = (stored["expires"], stored["rows"])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return stored["rows"]
+
+    def page(self, result_id: str, offset: int = 0, limit: int = RESULT_PAGE_SIZE) -> Optional[Dict[str, Any]]:
+        rows = self.get(result_id)
+        if rows is None:
+            return None
+        offset = max(0, offset)
+        limit = max(1, min(limit, RESULT_MAX_PAGE_SIZE))
+        chunk = rows[offset:offset + limit]
+        next_offset = offset + len(chunk)
+        return {
+            "result_id": result_id,
+            "total": len(rows),
+            "offset": offset,
+            "next_offset": next_offset if next_offset < len(rows) else None,
+            **to_columnar(chunk),
+        }
+
+    def _evict(self, now: float):
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+        # files are swept at most once per TTL, by whichever worker gets there first
+        if self.directory and now - self._swept_at > self.ttl:
+            self._swept_at = now
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    # written once, so mtime + TTL is its expiry
+                    if os.path.getmtime(path) + self.ttl <= now:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+result_store = ResultStore()
+
+def first_page_payload(rows: Any, page_size: int = RESULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Fields added to a chat response: "raw" is the first page in the same columnar form
+    as GET /results/{id}; result_id (when there is more) fetches the rest.
+    """
+    if not isinstance(rows, list):
+        return {"raw": rows}
+    page = rows[:page_size]
+    raw = {"total": len(rows), "offset": 0, "next_offset": len(page) if len(rows) > len(page) else None,
+           **to_columnar(page)}
+    if len(rows) > page_size:
+        raw = {"result_id": result_store.put(rows), **raw}
+    return {"raw": raw}
@@ -0,0 +1,160 @@
+# app/rolling_form.py
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.season_data import SeasonData, get_season_data, on_season_reload
+from app.standings import _day
+
+PLAYER_FORM_STATS = [
+    "minutesPlayed", "goals", "goalAssist", "expectedGoals", "expectedAssists", "totalShots",
+    "onTargetScoringAttempt", "keyPass", "bigChanceCreated", "totalTackle", "interceptionWon",
+    "saves",
+]
+TEAM_FORM_STATS = ["points", "won", "drawn", "lost", "goals_for", "goals_against", "expectedGoals"]
+
+def _num(value) -> float:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+class _Timeline:
+    """
+    One entity's matches in date order with cumulative sums of every stat,
+    so the total over matches [i, j) is prefix[j] - prefix[i].
+    """
+
+    def __init__(self, days: List[str], opponents: List[str], results: List[str], values: np.ndarray):
+        self.days = days
+        self.opponents = opponents
+        self.results = results
+        self.prefix = np.zeros((len(days) + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=self.prefix[1:])
+
+    def span(self, last: Optional[int], since: Optional[str], before: Optional[str]):
+        """[i, j) of the last `last` matches played before `before` and on or after `since`"""
+        j = bisect.bisect_left(self.days, before) if before else len(self.days)
+        i = bisect.bisect_left(self.days, since) if since else 0
+        if last:
+            i = max(i, j - last)
+        return min(i, j), j
+
+    def totals(self, i: int, j: int) -> np.ndarray:
+        return self.prefix[j] - self.prefix[i]
+
+    def rolling(self, column: int, window: int) -> np.ndarray:
+        """Total of one stat over every window of `window` consecutive matches"""
+        column_prefix = self.prefix[:, column]
+        return column_prefix[window:] - column_prefix[:-window]
+
+class RollingForm:
+    """Date-ordered per-player and per-team stat timelines with prefix sums, for rolling-window queries"""
+
+    def __init__(self, players: Dict[str, _Timeline], teams: Dict[str, _Timeline]):
+        self.players = players
+        self.teams = teams
+
+    @classmethod
+    def build(cls, season: SeasonData) -> "RollingForm":
+        by_player = defaultdict(list)
+        team_xg = defaultdict(float)
+        for p in season.performances:
+            stats = p.get("stats") or {}
+            team_xg[(p["match_id"], stats.get("team"))] += _num(stats.get("expectedGoals"))
+            if _num(stats.get("minutesPlayed")) <= 0:
+                continue
+            m = season.match_by_id[p["match_id"]]
+            home = stats.get("team") == m["home"]
+            scored, conceded = (m["home_goals"], m["away_goals"]) if home else (m["away_goals"], m["home_goals"])
+            by_player[p["name"]].append((
+                (m.get("date") or 0, m["id"]), _day(m.get("date") or 0),
+                m["away"] if home else m["home"], _result(scored, conceded),
+                [_num(stats.get(key)) for key in PLAYER_FORM_STATS],
+            ))
+
+        by_team = defaultdict(list)
+        for m in season.matches:
+            for team, opponent, scored, conceded in ((m["home"], m["away"], m["home_goals"], m["away_goals"]),
+                                                     (m["away"], m["home"], m["away_goals"], m["home_goals"])):
+                result = _result(scored, conceded)
+                by_team[team].append((
+                    (m.get("date") or 0, m["id"]), _day(m.get("date") or 0), opponent, result,
+                    [{"W": 3, "D": 1, "L": 0}[result], result == "W", result == "D", result == "L",
+                     scored, conceded, team_xg[(m["id"], team)]],
+                ))
+
+        def timelines(rows_by_entity, width):
+            built = {}
+            for name, rows in rows_by_entity.items():
+                rows.sort(key=lambda row: row[0])
+                values = np.array([row[4] for row in rows], dtype=np.float64).reshape(len(rows), width)
+                built[name] = _Timeline([row[1] for row in rows], [row[2] for row in rows],
+                                        [row[3] for row in rows], values)
+            return built
+
+        return cls(timelines(by_player, len(PLAYER_FORM_STATS)), timelines(by_team, len(TEAM_FORM_STATS)))
+
+    def player_form(self, name: str, last: Optional[int] = 5, since: Optional[str] = None,
+                    before: Optional[str] = None) -> Dict[str, Any]:
+        """Totals and per-match averages over a player's last N appearances (or a date range)"""
+        timeline = self.players.get(name)
+        if timeline is None:
+            raise KeyError(f"no appearances for '{name}'")
+        return _window(name, timeline, PLAYER_FORM_STATS, *timeline.span(last, since, before))
+
+    def team_form(self, team: str, last: Optional[int] = 5, since: Optional[str] = None,
+                  before: Optional[str] = None) -> Dict[str, Any]:
+        timeline = self.teams.get(team)
+        if timeline is None:
+            raise KeyError(f"no matches for '{team}'")
+        return _window(team, timeline, TEAM_FORM_STATS, *timeline.span(last, since, before))
+
+    def best_run(self, name: str, stat: str, window: int = 5, team: bool = False) -> Dict[str, Any]:
+        """The `window` consecutive matches with the highest total of `stat`"""
+        timeline = (self.teams if team else self.players).get(name)
+        stats = TEAM_FORM_STATS if team else PLAYER_FORM_STATS
+        if timeline is None:
+            raise KeyError(f"no matches for '{name}'")
+        if stat not in stats:
+            raise ValueError(f"stat must be one of {', '.join(stats)}")
+        window = max(1, min(window, len(timeline.days)))
+        totals = timeline.rolling(stats.index(stat), window)
+        start = int(np.argmax(totals))
+        return _window(name, timeline, stats, start, start + window)
+
+def _result(scored: int, conceded: int) -> str:
+    return "W" if scored > conceded else "D" if scored == conceded else "L"
+
+def _window(name: str, timeline: _Timeline, stats: List[str], i: int, j: int) -> Dict[str, Any]:
+    """Matches [i, j) of a timeline: totals from two prefix rows, averages per match"""
+    played = j - i
+    totals = timeline.totals(i, j)
+    return {
+        "name": name,
+        "matches": played,
+        "from": timeline.days[i] if played else None,
+        "to": timeline.days[j - 1] if played else None,
+        "results": "".join(timeline.results[i:j]),
+        "opponents": timeline.opponents[i:j],
+        "totals": {stat: round(float(v), 2) for stat, v in zip(stats, totals)},
+        "per_match": {stat: round(float(v) / played, 2) if played else 0.0 for stat, v in zip(stats, totals)},
+    }
+
+# one index per season ("" for a graph without seasons)
+_forms: Dict[str, RollingForm] = {}
+_forms_lock = threading.Lock()
+
+def _reload_forms(season_data: SeasonData):
+    for season in list(_forms):
+        _forms[season] = RollingForm.build(season_data.for_season(season or None))
+
+def get_rolling_form(season: Optional[str] = None) -> RollingForm:
+    """Rolling-form index of one season (default: the latest)"""
+    season_data = get_season_data()
+    key = season or season_data.latest_season or ""
+    if key not in _forms:
+        with _forms_lock:
+            if key not in _forms:
+                if not _forms:
+                    on_season_reload(_reload_forms)
+                _forms[key] = RollingForm.build(season_data.for_season(key or None))
+    return _forms[key]
@@ -0,0 +1,116 @@
+# app/season_data.py
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from app.neo4j_client import db
+from app.season_snapshot import open_snapshot
+
+# How often get_season_data() checks the (:Dataset) version written by the importer
+DATASET_VERSION_CHECK_SECONDS = float(os.environ.get("DATASET_VERSION_CHECK_SECONDS", "60"))
+
+# One pass over the graph per process; the in-memory indexes (profiles, standings, ...) are built from this.
+MATCHES_QUERY = """
+MATCH (m:Match)-[:HOME_TEAM]->(h:Team), (m)-[:AWAY_TEAM]->(a:Team)
+RETURN m.id AS id, m.season AS season, m.round AS round, m.date AS date, m.score AS score,
+       h.name AS home, a.name AS away
+"""
+
+PERFORMANCES_QUERY = """
+MATCH (p:Player)-[r:PLAYED_IN]->(m:Match)
+RETURN p.id AS player_id, p.name AS name, p.slug AS slug, p.position AS position,
+       m.id AS match_id, properties(r) AS stats
+"""
+
+def parse_score(score: Optional[str]):
+    """'2-1' -> (2, 1); None for missing or malformed scores"""
+    try:
+        home, away = str(score).split("-")
+        return int(home), int(away)
+    except (ValueError, AttributeError):
+        return None
+
+class SeasonData:
+    """
+    Matches and player performances held in plain Python structures.
+    Holds every season in the graph; for_season() gives the per-season view the analytics use.
+    """
+
+    def __init__(self, matches: List[Dict[str, Any]], performances: List[Dict[str, Any]]):
+        self.matches = []
+        for m in matches:
+            goals = parse_score(m.get("score"))
+            if goals is None:
+                continue
+            self.matches.append({**m, "home_goals": goals[0], "away_goals": goals[1]})
+        self.matches.sort(key=lambda m: (m.get("date") or 0, m["id"]))
+        self.match_by_id = {m["id"]: m for m in self.matches}
+        self.performances = [p for p in performances if p["match_id"] in self.match_by_id]
+        self.teams = sorted({m["home"] for m in self.matches} | {m["away"] for m in self.matches})
+        self.seasons = sorted({m["season"] for m in self.matches if m.get("season")})
+        self._by_season: Dict[str, "SeasonData"] = {}
+
+    @property
+    def latest_season(self) -> Optional[str]:
+        return self.seasons[-1] if self.seasons else None
+
+    def for_season(self, season: Optional[str]) -> "SeasonData":
+        """Only the matches (and their performances) of one season; self for None or an unseasoned graph"""
+        if not season or not self.seasons or self.seasons == [season]:
+            return self
+        if season not in self._by_season:
+            self._by_season[season] = SeasonData(
+                [m for m in self.matches if m.get("season") == season], self.performances)
+        return self._by_season[season]
+
+    @classmethod
+    def from_graph(cls) -> "SeasonData":
+        return cls(db.query(MATCHES_QUERY), db.query(PERFORMANCES_QUERY))
+
+    @classmethod
+    def load(cls, version=None) -> "SeasonData":
+        """
+        From the importer's memory-mapped snapshot when it matches the graph's dataset
+        version (or the graph is unreachable), otherwise from the graph.
+        """
+        snapshot = open_snapshot()
+        if snapshot is not None and (version is None or snapshot.version == version):
+            return snapshot.to_season_data()
+        return cls.from_graph()
+
+_season_data = None
+_season_version = None
+_version_checked_at = 0.0
+_season_lock = threading.Lock()
+_reload_listeners: List[Callable[[SeasonData], Any]] = []
+
+def on_season_reload(callback: Callable[[SeasonData], Any]):
+    """Registers a callback run with the new SeasonData whenever the dataset version changes"""
+    _reload_listeners.append(callback)
+
+def _dataset_version():
+    try:
+        return db.get_dataset_version()
+    except Exception:
+        return _season_version
+
+def get_season_data(refresh: bool = False) -> SeasonData:
+    global _season_data, _season_version, _version_checked_at
+    if _season_data is not None and not refresh:
+        if time.monotonic() - _version_checked_at < DATASET_VERSION_CHECK_SECONDS:
+            return _season_data
+        _version_checked_at = time.monotonic()
+        if _dataset_version() == _season_version:
+            return _season_data
+        refresh = True
+
+    with _season_lock:
+        if _season_data is None or refresh:
+            reloading = _season_data is not None
+            _season_version = _dataset_version()
+            _season_data = SeasonData.load(_season_version)
+            _version_checked_at = time.monotonic()
+            if reloading:
+                for callback in _reload_listeners:
+                    callback(_season_data)
+    return _season_data
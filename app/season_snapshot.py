@@ -0,0 +1,235 @@
+# app/season_snapshot.py
+import json
+import math
+import mmap
+import os
+import struct
+from typing import Any, Dict, Iterable, List, Optional
+import numpy as np
+
+# Binary copy of the season data written by scripts/import_data.py --snapshot.
+# Layout: MAGIC, uint32 header length, JSON header (column directory), then 8-byte aligned
+# little-endian columns. Workers mmap the file read-only, so the column pages are shared
+# between processes and nothing is parsed except the small header and the string table.
+SNAPSHOT_FILE = os.environ.get(
+    "SEASON_SNAPSHOT_FILE", os.path.join(os.path.dirname(__file__), "..", "data", "season_snapshot.bin"))
+MAGIC = b"PLSNAP\x00\x01"
+FORMAT_VERSION = 1
+
+INT_MISSING = np.iinfo(np.int32).min
+STR_MISSING = -1
+
+class _StringTable:
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def id(self, value: Optional[str]) -> int:
+        if value is None:
+            return STR_MISSING
+        value = str(value)
+        if value not in self.index:
+            self.index[value] = len(self.values)
+            self.values.append(value)
+        return self.index[value]
+
+def _stat_kind(values: Iterable[Any]) -> str:
+    # the widest type seen, whatever the order: str > float > int > bool (a bool among
+    # ints is stored as 0/1 rather than every int reading back as True/False)
+    seen = set()
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            seen.add("bool")
+        elif isinstance(v, int):
+            seen.add("int")
+        elif isinstance(v, float):
+            seen.add("float")
+        else:
+            return "str"
+    for kind in ("float", "int", "bool"):
+        if kind in seen:
+            return kind
+    return "int"
+
+def write_snapshot(path: str, matches: List[Dict[str, Any]], performances: List[Dict[str, Any]],
+                   version: int = 0) -> Dict[str, int]:
+    """
+    `matches` and `performances` have the shape of the MATCHES_QUERY / PERFORMANCES_QUERY rows
+    in app/season_data.py (performances carry a `stats` dict = the PLAYED_IN properties).
+    Matches without a parseable score are skipped, like SeasonData does.
+    """
+    from app.season_data import parse_score
+
+    strings = _StringTable()
+    kept = []
+    for m in matches:
+        goals = parse_score(m.get("score"))
+        if goals is not None:
+            kept.append((m, goals))
+    match_row = {m["id"]: i for i, (m, _) in enumerate(kept)}
+
+    players: Dict[Any, int] = {}
+    player_rows = []
+    perf_rows = []
+    for p in performances:
+        if p["match_id"] not in match_row:
+            continue
+        if p["player_id"] not in players:
+            players[p["player_id"]] = len(player_rows)
+            player_rows.append(p)
+        perf_rows.append(p)
+
+    columns: Dict[str, np.ndarray] = {
+        "match.id": np.array([m["id"] for m, _ in kept], dtype="<i8"),
+        "match.season": np.array([strings.id(m.get("season")) for m, _ in kept], dtype="<i4"),
+        "match.round": np.array([m.get("round") or 0 for m, _ in kept], dtype="<i4"),
+        "match.date": np.array([m.get("date") if m.get("date") is not None else INT_MISSING
+                                for m, _ in kept], dtype="<i8"),
+        "match.home_goals": np.array([g[0] for _, g in kept], dtype="<i2"),
+        "match.away_goals": np.array([g[1] for _, g in kept], dtype="<i2"),
+        "match.home": np.array([strings.id(m["home"]) for m, _ in kept], dtype="<i4"),
+        "match.away": np.array([strings.id(m["away"]) for m, _ in kept], dtype="<i4"),
+        "player.id": np.array([p["player_id"] for p in player_rows], dtype="<i8"),
+        "player.name": np.array([strings.id(p.get("name")) for p in player_rows], dtype="<i4"),
+        "player.slug": np.array([strings.id(p.get("slug")) for p in player_rows], dtype="<i4"),
+        "player.position": np.array([strings.id(p.get("position")) for p in player_rows], dtype="<i4"),
+        "perf.player": np.array([players[p["player_id"]] for p in perf_rows], dtype="<i4"),
+        "perf.match": np.array([match_row[p["match_id"]] for p in perf_rows], dtype="<i4"),
+    }
+
+    stat_keys = sorted({key for p in perf_rows for key in (p.get("stats") or {})})
+    stats = []
+    for key in stat_keys:
+        values = [(p.get("stats") or {}).get(key) for p in perf_rows]
+        kind = _stat_kind(values)
+        if kind == "float":
+            data = np.array([math.nan if v is None else float(v) for v in values], dtype="<f8")
+        elif kind == "str":
+            data = np.array([strings.id(v) for v in values], dtype="<i4")
+        else:
+            data = np.array([INT_MISSING if v is None else int(v) for v in values], dtype="<i4")
+        columns[f"stat.{key}"] = data
+        stats.append({"key": key, "kind": kind})
+
+    blob = b"".join(s.encode("utf-8") for s in strings.values)
+    offsets = np.zeros(len(strings.values) + 1, dtype="<i8")
+    np.cumsum([len(s.encode("utf-8")) for s in strings.values], out=offsets[1:])
+    columns["strings.offsets"] = offsets
+    columns["strings.blob"] = np.frombuffer(blob, dtype="u1")
+
+    directory = {}
+    position = 0
+    for name, data in columns.items():
+        directory[name] = {"dtype": data.dtype.str, "offset": position, "count": int(data.size)}
+        position += -(-data.nbytes // 8) * 8
+    header = json.dumps({
+        "format": FORMAT_VERSION, "version": version,
+        "matches": len(kept), "players": len(player_rows), "performances": len(perf_rows),
+        "stats": stats, "columns": directory,
+    }).encode("utf-8")
+    data_start = -(-(len(MAGIC) + 4 + len(header)) // 8) * 8
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header)) + header)
+        for name, data in columns.items():
+            f.seek(data_start + directory[name]["offset"])
+            f.write(data.tobytes())
+        f.truncate(data_start + position)
+    os.replace(tmp_path, path)
+    return {"matches": len(kept), "players": len(player_rows), "performances": len(perf_rows),
+            "stats": len(stats), "bytes": data_start + position}
+
+class SeasonSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+    column(name) returns zero-copy numpy arrays; to_season_data() builds the SeasonData
+    the in-memory indexes use.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_FILE):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a season snapshot")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        self.header = json.loads(self._mm[header_start:header_start + header_len])
+        if self.header["format"] != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {self.header['format']}")
+        self._data_start = -(-(header_start + header_len) // 8) * 8
+        self.version = self.header["version"]
+        self.stat_kinds = {s["key"]: s["kind"] for s in self.header["stats"]}
+
+        offsets = self.column("strings.offsets")
+        blob = self.column("strings.blob").tobytes()
+        self.strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        self._lists: Dict[str, list] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        spec = self.header["columns"][name]
+        return np.frombuffer(self._mm, dtype=spec["dtype"], count=spec["count"],
+                             offset=self._data_start + spec["offset"])
+
+    def _list(self, name: str) -> list:
+        # Python-object copy of a column, made once, for row-by-row access
+        if name not in self._lists:
+            self._lists[name] = self.column(name).tolist()
+        return self._lists[name]
+
+    def _string(self, index: int) -> Optional[str]:
+        return None if index == STR_MISSING else self.strings[index]
+
+    def _stat_rows(self) -> List[Dict[str, Any]]:
+        # each performance's PLAYED_IN properties as a plain dict, decoded column by column;
+        # the index builds call .get many times per row, so a lazy view costs more than it saves
+        keys, columns = [], []
+        for key, kind in self.stat_kinds.items():
+            values = self.column(f"stat.{key}").tolist()
+            if kind == "float":
+                values = [None if v != v else v for v in values]
+            elif kind == "str":
+                values = [self._string(v) for v in values]
+            elif kind == "bool":
+                values = [None if v == INT_MISSING else bool(v) for v in values]
+            else:
+                values = [None if v == INT_MISSING else v for v in values]
+            keys.append(key)
+            columns.append(values)
+        return [{key: value for key, value in zip(keys, row) if value is not None} for row in zip(*columns)]
+
+    def matches(self) -> List[Dict[str, Any]]:
+        s = self._string
+        rows = zip(self._list("match.id"), self._list("match.season"), self._list("match.round"),
+                   self._list("match.date"), self._list("match.home_goals"), self._list("match.away_goals"),
+                   self._list("match.home"), self._list("match.away"))
+        return [{"id": mid, "season": s(season), "round": rnd, "date": None if date == INT_MISSING else date,
+                 "score": f"{hg}-{ag}", "home": s(home), "away": s(away)}
+                for mid, season, rnd, date, hg, ag, home, away in rows]
+
+    def performances(self) -> List[Dict[str, Any]]:
+        s = self._string
+        players = [{"player_id": pid, "name": s(name), "slug": s(slug), "position": s(position)}
+                   for pid, name, slug, position in zip(self._list("player.id"), self._list("player.name"),
+                                                        self._list("player.slug"), self._list("player.position"))]
+        match_ids = self._list("match.id")
+        return [{**players[player], "match_id": match_ids[match], "stats": stats}
+                for player, match, stats in zip(self._list("perf.player"), self._list("perf.match"),
+                                                self._stat_rows())]
+
+    def to_season_data(self):
+        from app.season_data import SeasonData
+        return SeasonData(self.matches(), self.performances())
+
+def open_snapshot(path: str = SNAPSHOT_FILE) -> Optional[SeasonSnapshot]:
+    """The snapshot at `path`, or None if there is none (or it can't be read)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        return SeasonSnapshot(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Ignoring season snapshot {path}: {e}")
+        return None
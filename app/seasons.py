@@ -0,0 +1,64 @@
+# app/seasons.py
+import re
+from typing import Iterable, List, Optional
+from app.season_data import get_season_data
+
+# Seasons are stored as "YYYY-YY" (m.season / r.season), e.g. "2023-24"
+_SEASON = re.compile(r"\b(19|20)?(\d{2})\s*[-/]\s*(?:19|20)?(\d{2})\b")
+
+def normalize_season(value: Optional[str]) -> Optional[str]:
+    """'23/24', '2023/2024', '2023-24' -> '2023-24'; None if it isn't a season"""
+    if not value:
+        return None
+    match = _SEASON.search(str(value))
+    if not match:
+        return None
+    century, start, end = match.group(1) or "20", int(match.group(2)), int(match.group(3))
+    if (start + 1) % 100 != end:
+        return None
+    return f"{century}{start:02d}-{end:02d}"
+
+def seasons_in_question(question: str) -> List[str]:
+    seasons = []
+    for match in _SEASON.finditer(question or ""):
+        season = normalize_season(match.group(0))
+        if season and season not in seasons:
+            seasons.append(season)
+    return seasons
+
+def available_seasons() -> List[str]:
+    """Seasons present in the graph, oldest first (empty if the graph has none or is unreachable)"""
+    try:
+        return get_season_data().seasons
+    except Exception:
+        return []
+
+def resolve_seasons(question: str, requested: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Seasons a question is about: the explicitly requested ones, else those named in the
+    question ('last season' is the one before the latest), else the latest season.
+    Raises ValueError if a named season isn't loaded, rather than answering for another one.
+    """
+    available = available_seasons()
+    if not available:
+        return []
+    wanted = _wanted_seasons(question, requested, available)
+    missing = [s for s in wanted if s not in available]
+    if missing:
+        raise ValueError(f"no data for season {', '.join(missing)}. Available: {', '.join(available)}")
+    return sorted(set(wanted)) or [available[-1]]
+
+def named_seasons(question: str, requested: Optional[Iterable[str]] = None,
+                  available: Optional[List[str]] = None) -> List[str]:
+    """Like resolve_seasons, but empty when neither the request nor the question names a season"""
+    available = available_seasons() if available is None else available
+    return sorted({s for s in _wanted_seasons(question, requested, available) if s in available})
+
+def _wanted_seasons(question: str, requested: Optional[Iterable[str]], available: List[str]) -> List[str]:
+    if requested:
+        # a value that isn't a season at all is reported as given
+        return [normalize_season(s) or str(s) for s in requested]
+    wanted = seasons_in_question(question)
+    if not wanted and re.search(r"\blast season\b", question or "", flags=re.IGNORECASE) and len(available) > 1:
+        wanted = [available[-2]]
+    return wanted
@@ -0,0 +1,100 @@
+# app/similarity.py
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.profile_store import PER90_STATS, POSITION_NAMES, ProfileStore, get_profile_store
+from app.season_data import get_season_data, on_season_reload
+
+# Players need this many minutes for their per-90 numbers to be comparable
+SIMILARITY_MIN_MINUTES = 900
+
+class PlayerSimilarity:
+    """
+    Nearest neighbours over per-90 stat vectors.
+    Features are z-scored within each position group, so 'similar' means a similar
+    profile relative to players in the same role. The matrix is one contiguous float32 array.
+    """
+
+    def __init__(self, names: List[str], teams: List[str], positions: List[str],
+                 minutes: List[int], per90: np.ndarray):
+        self.names = names
+        self.teams = teams
+        self.positions = np.array(positions)
+        self.minutes = minutes
+        self.index = {name: i for i, name in enumerate(names)}
+
+        features = np.array(per90, dtype=np.float64)
+        for position in set(positions):
+            rows = self.positions == position
+            mean = features[rows].mean(axis=0)
+            std = features[rows].std(axis=0)
+            std[std == 0] = 1.0
+            features[rows] = (features[rows] - mean) / std
+        self.matrix = np.ascontiguousarray(features, dtype=np.float32)
+        self.sq_norms = np.einsum("ij,ij->i", self.matrix, self.matrix)
+        norms = np.sqrt(self.sq_norms)
+        norms[norms == 0] = 1.0
+        self.unit = np.ascontiguousarray(self.matrix / norms[:, None], dtype=np.float32)
+
+    @classmethod
+    def build(cls, store: ProfileStore, min_minutes: int = SIMILARITY_MIN_MINUTES) -> "PlayerSimilarity":
+        qualified = [p for p in store.players.values() if p.minutes >= min_minutes and p.position]
+        per90 = np.array([[p.per90[key] for key in PER90_STATS] for p in qualified], dtype=np.float64)
+        return cls([p.name for p in qualified], [p.team for p in qualified],
+                   [p.position for p in qualified], [p.minutes for p in qualified],
+                   per90.reshape(len(qualified), len(PER90_STATS)))
+
+    def similar(self, name: str, k: int = 10, metric: str = "cosine",
+                same_position: bool = True) -> List[Dict[str, Any]]:
+        i = self.index.get(name)
+        if i is None:
+            raise KeyError(f"{name} has fewer than {SIMILARITY_MIN_MINUTES} minutes or is unknown")
+        if metric == "cosine":
+            scores = self.unit @ self.unit[i]
+        elif metric == "euclidean":
+            # higher is better: negative squared distance, from precomputed norms
+            scores = 2 * (self.matrix @ self.matrix[i]) - self.sq_norms - self.sq_norms[i]
+        else:
+            raise ValueError("metric must be 'cosine' or 'euclidean'")
+
+        scores = scores.astype(np.float64)
+        scores[i] = -np.inf
+        if same_position:
+            scores[self.positions != self.positions[i]] = -np.inf
+
+        candidates = int(np.isfinite(scores).sum())
+        k = max(0, min(k, candidates))
+        if k == 0:
+            return []
+        # partial sort: O(n) selection of the top k, then sort only those k
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        rows = []
+        for j in top:
+            score = float(scores[j]) if metric == "cosine" else float(np.sqrt(max(0.0, -scores[j])))
+            rows.append({
+                "player": self.names[j],
+                "team": self.teams[j],
+                "position": POSITION_NAMES.get(self.positions[j], self.positions[j]),
+                "minutes": self.minutes[j],
+                "similarity" if metric == "cosine" else "distance": round(score, 4),
+            })
+        return rows
+
+# keyed by season, like the profile stores they are built from
+_similarity: Dict[str, PlayerSimilarity] = {}
+_similarity_lock = threading.Lock()
+
+def _reload_similarity(season_data):
+    _similarity.clear()
+
+on_season_reload(_reload_similarity)
+
+def get_similarity(season: Optional[str] = None) -> PlayerSimilarity:
+    key = season or get_season_data().latest_season or ""
+    if key not in _similarity:
+        with _similarity_lock:
+            if key not in _similarity:
+                _similarity[key] = PlayerSimilarity.build(get_profile_store(key or None))
+    return _similarity[key]
@@ -0,0 +1,163 @@
+# app/standings.py
+import bisect
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from app.season_data import SeasonData, get_season_data, on_season_reload
+
+FORM_LENGTH = 5
+
+class TeamStanding(NamedTuple):
+    position: int
+    team: str
+    played: int
+    won: int
+    drawn: int
+    lost: int
+    goals_for: int
+    goals_against: int
+    goal_difference: int
+    points: int
+    form: str  # most recent result last, e.g. "WWDLW"
+
+class _Series:
+    """
+    Cumulative league tables after each group of matches (a round, or a calendar day).
+    Snapshots are kept per group, so an update only recomputes from the first changed group.
+    """
+
+    def __init__(self):
+        self.keys: List[Any] = []
+        self.signatures: List[Tuple] = []
+        self.tables: List[List[TeamStanding]] = []
+        self.states: List[Dict[str, tuple]] = []
+
+    def update(self, groups: List[Tuple[Any, List[Dict[str, Any]]]], teams: List[str]) -> int:
+        """Returns the index of the first recomputed group (len(groups) if nothing changed)"""
+        signatures = [tuple(sorted((m["id"], m["home_goals"], m["away_goals"]) for m in ms)) for _, ms in groups]
+        start = 0
+        while (start < len(self.keys) and start < len(groups)
+               and self.keys[start] == groups[start][0] and self.signatures[start] == signatures[start]):
+            start += 1
+        if start == len(groups) == len(self.keys):
+            return start
+
+        del self.keys[start:], self.signatures[start:], self.tables[start:], self.states[start:]
+        state = dict(self.states[start - 1]) if start else {t: (0, 0, 0, 0, 0, 0, 0, "") for t in teams}
+        for (key, matches), signature in zip(groups[start:], signatures[start:]):
+            for m in matches:
+                self._apply(state, m["home"], m["home_goals"], m["away_goals"])
+                self._apply(state, m["away"], m["away_goals"], m["home_goals"])
+            self.keys.append(key)
+            self.signatures.append(signature)
+            self.states.append(dict(state))
+            self.tables.append(self._rank(state))
+        return start
+
+    @staticmethod
+    def _apply(state, team, scored, conceded):
+        played, won, drawn, lost, gf, ga, points, form = state.get(team, (0, 0, 0, 0, 0, 0, 0, ""))
+        if scored > conceded:
+            won, points, result = won + 1, points + 3, "W"
+        elif scored == conceded:
+            drawn, points, result = drawn + 1, points + 1, "D"
+        else:
+            lost, result = lost + 1, "L"
+        state[team] = (played + 1, won, drawn, lost, gf + scored, ga + conceded, points,
+                       (form + result)[-FORM_LENGTH:])
+
+    @staticmethod
+    def _rank(state) -> List[TeamStanding]:
+        ordered = sorted(state.items(), key=lambda kv: (-kv[1][6], -(kv[1][4] - kv[1][5]), -kv[1][4], kv[0]))
+        return [
+            TeamStanding(i, team, p, w, d, l, gf, ga, gf - ga, pts, form)
+            for i, (team, (p, w, d, l, gf, ga, pts, form)) in enumerate(ordered, 1)
+        ]
+
+class StandingsTable:
+    """Precomputed standings after every round and after every matchday date"""
+
+    def __init__(self):
+        self.by_round = _Series()
+        self.by_date = _Series()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, season: SeasonData) -> "StandingsTable":
+        table = cls()
+        table.update(season)
+        return table
+
+    def update(self, season: SeasonData):
+        rounds: Dict[int, list] = {}
+        days: Dict[str, list] = {}
+        for m in season.matches:
+            rounds.setdefault(m["round"], []).append(m)
+            if m.get("date"):
+                days.setdefault(_day(m["date"]), []).append(m)
+        with self._lock:
+            changed_round = self.by_round.update(sorted(rounds.items()), season.teams)
+            self.by_date.update(sorted(days.items()), season.teams)
+        return changed_round
+
+    @property
+    def last_round(self) -> int:
+        return self.by_round.keys[-1] if self.by_round.keys else 0
+
+    def after_round(self, round_num: int) -> List[TeamStanding]:
+        i = bisect.bisect_right(self.by_round.keys, round_num) - 1
+        return self.by_round.tables[i] if i >= 0 else []
+
+    def on_date(self, day: str) -> List[TeamStanding]:
+        """Table including every match played on or before `day` (YYYY-MM-DD)"""
+        i = bisect.bisect_right(self.by_date.keys, day) - 1
+        return self.by_date.tables[i] if i >= 0 else []
+
+    def query(self, round_num: Optional[int] = None, date: Optional[str] = None,
+              team: Optional[str] = None, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        if date:
+            table = self.on_date(date[:10])
+        else:
+            table = self.after_round(round_num or self.last_round)
+        if team:
+            table = [row for row in table if row.team == team]
+        elif top:
+            table = table[:top]
+        return [row._asdict() for row in table]
+
+    def team_history(self, team: str) -> List[Dict[str, Any]]:
+        """Position and points of one team after every round"""
+        rows = []
+        for round_num, table in zip(self.by_round.keys, self.by_round.tables):
+            for row in table:
+                if row.team == team:
+                    rows.append({"round": round_num, "position": row.position, "points": row.points,
+                                 "goal_difference": row.goal_difference, "form": row.form})
+        return rows
+
+def _day(timestamp) -> str:
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+    return str(timestamp)[:10]
+
+# one table per season ("" for a graph without seasons)
+_standings: Dict[str, StandingsTable] = {}
+_standings_lock = threading.Lock()
+
+def _reload_standings(season_data: SeasonData):
+    # newly imported rounds only recompute from the first round that changed
+    for season, table in list(_standings.items()):
+        table.update(season_data.for_season(season or None))
+
+def get_standings(season: Optional[str] = None) -> StandingsTable:
+    """Standings of one season (default: the latest)"""
+    # also picks up a new dataset version, which reaches the tables through the reload hook
+    season_data = get_season_data()
+    key = season or season_data.latest_season or ""
+    if key not in _standings:
+        with _standings_lock:
+            if key not in _standings:
+                if not _standings:
+                    on_season_reload(_reload_standings)
+                _standings[key] = StandingsTable.build(season_data.for_season(key or None))
+    return _standings[key]
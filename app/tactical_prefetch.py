@@ -0,0 +1,104 @@
+# app/tactical_prefetch.py
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+from app.neo4j_client import db
+from app.admission import db_limiter
+
+# --- CONFIG --- #
+# The stats lookups never add more than this to a tactical answer
+TACTICAL_PREFETCH_TIMEOUT = float(os.environ.get("TACTICAL_PREFETCH_TIMEOUT", "1.5"))
+TACTICAL_PREFETCH_WORKERS = int(os.environ.get("TACTICAL_PREFETCH_WORKERS", "8"))
+
+# Small, fixed, parameterized queries (one shape each, so Neo4j plans them once).
+# $seasons is null on a graph imported before seasons existed.
+TEAM_QUERY = """
+MATCH (t:Team {name: $team})<-[:HOME_TEAM|AWAY_TEAM]-(m:Match)
+WHERE $seasons IS NULL OR m.season IN $seasons
+MATCH (p:Player)-[r:PLAYED_IN]->(m)
+WHERE r.team = $team
+RETURN t.name AS team, count(DISTINCT m) AS matches, sum(r.goals) AS goals,
+       sum(r.expectedGoals) AS xG, sum(r.totalShots) AS shots, sum(r.bigChanceCreated) AS bigChances,
+       sum(r.totalPass) AS passes, sum(r.accuratePass) AS accuratePasses, sum(r.totalCross) AS crosses,
+       sum(r.totalTackle) AS tackles, sum(r.interceptionWon) AS interceptions
+"""
+
+PLAYER_QUERY = """
+MATCH (p:Player {name: $player})-[r:PLAYED_IN]->(m:Match)
+WHERE $seasons IS NULL OR m.season IN $seasons
+RETURN p.name AS player, p.position AS position, collect(DISTINCT r.team)[0] AS team,
+       count(m) AS appearances, sum(r.minutesPlayed) AS minutes, sum(r.goals) AS goals,
+       sum(r.goalAssist) AS assists, sum(r.expectedGoals) AS xG, sum(r.expectedAssists) AS xA,
+       sum(r.totalShots) AS shots, sum(r.keyPass) AS keyPasses, sum(r.totalTackle) AS tackles,
+       sum(r.interceptionWon) AS interceptions
+"""
+
+FIXTURES_QUERY = """
+MATCH (m:Match)-[:HOME_TEAM]->(h:Team), (m)-[:AWAY_TEAM]->(a:Team)
+WHERE ($seasons IS NULL OR m.season IN $seasons)
+  AND ((h.name = $team_a AND a.name = $team_b) OR (h.name = $team_b AND a.name = $team_a))
+RETURN m.season AS season, m.round AS round, h.name AS home, a.name AS away, m.score AS score
+ORDER BY m.date
+"""
+
+_pool = ThreadPoolExecutor(max_workers=TACTICAL_PREFETCH_WORKERS, thread_name_prefix="tactical-prefetch")
+
+def _run(query: str, params: Dict[str, Any], deadline: float) -> List[Dict[str, Any]]:
+    # each call checks out its own session, so the lookups run side by side; the server
+    # stops a lookup at the deadline, so a late one doesn't keep its slot and thread
+    with db_limiter.slot():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("deadline passed while queued")
+        return db.query(query, params, timeout_seconds=remaining)
+
+class TacticalPrefetch:
+    """
+    Stats lookups for the teams and players detected in a tactical question, started
+    immediately on a shared pool; result() collects whatever finished by the deadline.
+    """
+
+    def __init__(self, entities: Dict[str, Dict[str, int]], seasons: Optional[List[str]] = None,
+                 timeout: float = TACTICAL_PREFETCH_TIMEOUT):
+        self.entities = entities
+        self.deadline = time.monotonic() + timeout
+        seasons = seasons or None
+        teams = list(entities.get("teams", {}))
+        self._futures = {}
+        for team in teams:
+            self._submit(("teams", team), TEAM_QUERY, {"team": team, "seasons": seasons})
+        for player in entities.get("players", {}):
+            self._submit(("players", player), PLAYER_QUERY, {"player": player, "seasons": seasons})
+        if len(teams) == 2:
+            self._submit(("fixtures", " v ".join(teams)), FIXTURES_QUERY,
+                         {"team_a": teams[0], "team_b": teams[1], "seasons": seasons})
+
+    def _submit(self, key, query, params):
+        # in a copy of the caller's context, so the request's profile sees the lookup
+        self._futures[key] = _pool.submit(contextvars.copy_context().run, _run, query, params, self.deadline)
+
+    def result(self) -> Dict[str, List[Dict[str, Any]]]:
+        """{"teams": [...], "players": [...], "fixtures": [...]}; late or failed lookups are left out"""
+        done, pending = wait(self._futures.values(), timeout=max(0.0, self.deadline - time.monotonic()))
+        for future in pending:
+            future.cancel()
+
+        data: Dict[str, List[Dict[str, Any]]] = {}
+        for (kind, name), future in self._futures.items():
+            if future not in done:
+                print(f"⏱️ Tactical prefetch for {name} missed the deadline")
+                continue
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"⚠️ Tactical prefetch for {name} failed: {e}")
+                continue
+            if kind == "fixtures":
+                data.setdefault(kind, []).extend(rows)
+            else:
+                data.setdefault(kind, []).extend(row for row in rows if row.get("appearances", row.get("matches")))
+        if pending:
+            data["missing"] = [name for (_, name), future in self._futures.items() if future in pending]
+        return data
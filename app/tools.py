@@ -0,0 +1,191 @@
+# app/tools.py
+import json
+from typing import Any, Callable, Dict, Optional
+from app.entity_matcher import get_dataset_matcher
+from app.standings import get_standings
+from app.similarity import get_similarity
+from app.head_to_head import get_head_to_head
+from app.rolling_form import PLAYER_FORM_STATS, TEAM_FORM_STATS, get_rolling_form
+from app.seasons import available_seasons, normalize_season
+
+# Precomputed lookups the Cypher model can call instead of writing a query.
+# Each tool takes keyword args from the model's JSON and returns a list of row dicts.
+_TOOLS: Dict[str, Dict[str, Any]] = {}
+
+def tool(name: str, description: str, args: Dict[str, str]):
+    def register(fn: Callable[..., list]):
+        _TOOLS[name] = {"fn": fn, "description": description, "args": args}
+        return fn
+    return register
+
+def resolve_team(name: Optional[str]) -> Optional[str]:
+    """'Spurs' -> 'Tottenham Hotspur' (unchanged if nothing matches)"""
+    if not name:
+        return None
+    hits = [h for h in get_dataset_matcher().scan(name) if h[2] == "teams"]
+    return hits[0][3] if hits else name
+
+def resolve_player(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    hits = [h for h in get_dataset_matcher().scan(name) if h[2] == "players"]
+    return hits[0][3] if hits else name
+
+def resolve_season(season: Optional[str]) -> Optional[str]:
+    """'23/24' -> '2023-24'; None means the latest season"""
+    if not season:
+        return None
+    normalized = normalize_season(season)
+    available = available_seasons()
+    if available and normalized not in available:
+        raise ValueError(f"no data for season '{season}'. Available: {', '.join(available)}")
+    return normalized
+
+def run_tool(name: str, args: Dict[str, Any], default_season: Optional[str] = None) -> Dict[str, Any]:
+    """Same result shape as execute_safe_cypher_and_format_results"""
+    spec = _TOOLS.get(name)
+    if not spec:
+        return {"status": "error", "message": f"Unknown tool '{name}'. Available: {', '.join(sorted(_TOOLS))}"}
+    if default_season and "season" in spec["args"] and not (args or {}).get("season"):
+        args = {**(args or {}), "season": default_season}
+    unknown = set(args or {}) - set(spec["args"])
+    if unknown:
+        return {"status": "error", "message": f"Unknown arguments for {name}: {', '.join(sorted(unknown))}"}
+    try:
+        rows = spec["fn"](**(args or {}))
+    except (TypeError, ValueError, KeyError) as e:
+        return {"status": "error", "message": f"Tool {name} failed: {e}"}
+    if not rows:
+        return {"status": "error", "message": "No results (empty). Check the team/player name or range."}
+    return {"status": "ok", "data": json.loads(json.dumps(rows, default=str))}
+
+def tools_prompt() -> str:
+    """Tool section appended to the Cypher model's system prompt"""
+    lines = [
+        "",
+        "===========================",
+        "### PRECOMPUTED TOOLS (PREFER THESE WHEN THEY FIT)",
+        "===========================",
+        "Instead of a Cypher query you may answer with:",
+        '{"tool": "<name>", "args": {...}, "explanation": "...", "confidence": "high"}',
+        "",
+    ]
+    for name, spec in sorted(_TOOLS.items()):
+        args = ", ".join(f"{arg}: {desc}" for arg, desc in spec["args"].items())
+        lines.append(f"- **{name}**: {spec['description']} Args: {args}")
+    return "\n".join(lines) + "\n"
+
+@tool(
+    "standings",
+    "League table after a round or on a date, with points, goal difference, position and last-5 form. "
+    "Use for 'where were Arsenal after round 20', 'who led the league at Christmas'.",
+    {
+        "round": "int, table after this round (default: latest)",
+        "date": "YYYY-MM-DD, table including all matches played on or before this date",
+        "team": "optional team name, only that team's row",
+        "top": "optional int, only the first N rows",
+        "season": "optional season, e.g. '2023-24' (default: latest)",
+    },
+)
+def standings_tool(round: int = None, date: str = None, team: str = None, top: int = None, season: str = None):
+    return get_standings(resolve_season(season)).query(round_num=int(round) if round else None, date=date,
+                                 team=resolve_team(team), top=int(top) if top else None)
+
+@tool(
+    "team_position_history",
+    "A team's position, points, goal difference and form after every round.",
+    {"team": "team name", "season": "optional season, e.g. '2023-24' (default: latest)"},
+)
+def team_position_history_tool(team: str, season: str = None):
+    return get_standings(resolve_season(season)).team_history(resolve_team(team))
+
+@tool(
+    "similar_players",
+    "Players with the most similar per-90 statistical profile (same position, 900+ minutes). "
+    "Use for 'who plays like Rodri', 'find a replacement for Saka'.",
+    {
+        "player": "player name",
+        "k": "optional int, how many players (default 10)",
+        "metric": "optional 'cosine' (default) or 'euclidean'",
+        "same_position": "optional bool, default true",
+        "season": "optional season, e.g. '2023-24' (default: latest)",
+    },
+)
+def similar_players_tool(player: str, k: int = 10, metric: str = "cosine", same_position: bool = True,
+                         season: str = None):
+    return get_similarity(resolve_season(season)).similar(resolve_player(player), k=int(k), metric=metric,
+                                    same_position=_flag(same_position, default=True))
+
+def _flag(value, default: bool) -> bool:
+    # the model sends booleans as JSON true/false, but also as "false" / "no" / 0
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() not in ("false", "0", "no", "")
+    return bool(value)
+
+def _form_length(last, since, before) -> Optional[int]:
+    if last:
+        return int(last)
+    return None if since or before else 5
+
+_FORM_ARGS = {
+    "last": "optional int, number of most recent matches (default 5, or all matches in the date range)",
+    "since": "optional YYYY-MM-DD, only matches on or after this date",
+    "before": "optional YYYY-MM-DD, only matches before this date",
+    "season": "optional season, e.g. '2023-24' (default: latest)",
+}
+
+@tool(
+    "player_form",
+    f"A player's totals and per-match averages over their last N appearances or a date range, "
+    f"with results and opponents. Stats: {', '.join(PLAYER_FORM_STATS)}. "
+    "Use for 'Haaland's goals in his last 10 games'.",
+    {"player": "player name", **_FORM_ARGS},
+)
+def player_form_tool(player: str, last: int = None, since: str = None, before: str = None, season: str = None):
+    return [get_rolling_form(resolve_season(season)).player_form(
+        resolve_player(player), last=_form_length(last, since, before), since=since, before=before)]
+
+@tool(
+    "team_form",
+    f"A team's results and totals over its last N matches or a date range. Stats: {', '.join(TEAM_FORM_STATS)}. "
+    "Use for 'Arsenal's form over the last 5 matches', 'how did Liverpool do in December'.",
+    {"team": "team name", **_FORM_ARGS},
+)
+def team_form_tool(team: str, last: int = None, since: str = None, before: str = None, season: str = None):
+    return [get_rolling_form(resolve_season(season)).team_form(
+        resolve_team(team), last=_form_length(last, since, before), since=since, before=before)]
+
+@tool(
+    "best_run",
+    "The best stretch of N consecutive matches for a player or team by one stat. "
+    "Use for 'Palmer's best 5-game spell', 'City's best run of points'.",
+    {
+        "player": "player name (or team)",
+        "team": "team name (or player)",
+        "stat": "stat to maximise, one of the player_form / team_form stats",
+        "window": "optional int, matches in the run (default 5)",
+        "season": "optional season, e.g. '2023-24' (default: latest)",
+    },
+)
+def best_run_tool(stat: str, player: str = None, team: str = None, window: int = 5, season: str = None):
+    if not player and not team:
+        raise ValueError("give a player or a team")
+    form = get_rolling_form(resolve_season(season))
+    if team:
+        return [form.best_run(resolve_team(team), stat, window=int(window), team=True)]
+    return [form.best_run(resolve_player(player), stat, window=int(window))]
+
+@tool(
+    "head_to_head",
+    "Every match between two teams with wins, draws, aggregate goals and the players with most "
+    "goals + assists in those games. Use for 'how did City do against Arsenal', 'Liverpool v Everton record'.",
+    {
+        "team_a": "team name",
+        "team_b": "team name",
+        "season": "optional season, e.g. '2023-24' (default: every loaded season)",
+    },
+)
+def head_to_head_tool(team_a: str, team_b: str, season: str = None):
+    return [get_head_to_head().lookup(resolve_team(team_a), resolve_team(team_b), resolve_season(season))]
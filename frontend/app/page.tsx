@@ -13,6 +13,8 @@ export default function HomePage() {
   const [isLoading, setIsLoading] = useState(false);
   const [regeneratingIndex, setRegeneratingIndex] = useState<number | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  // one id per tab, so the backend can share LLM capacity fairly between users
+  const sessionId = useRef(crypto.randomUUID());
 
   const scrollToBottom = () => messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
   useEffect(() => scrollToBottom(), [messages, isLoading]);
@@ -29,7 +31,8 @@ export default function HomePage() {
         headers: { "Content-Type": "application/json" }, 
         body: JSON.stringify({ 
           message: messageText,
-          history: history
+          history: history,
+          session_id: sessionId.current
         }) 
       });
       
@@ -9,7 +9,7 @@ os.makedirs(DATA_DIR, exist_ok=True)
 
 # --- CONFIGURATION ---
 TOURNAMENT_ID = 17       # Premier League is always ID 17
-TARGET_SEASON = "23/24"  # The specific season you requested
+TARGET_SEASONS = ["22/23", "23/24"]  # Every season to scrape in one run (Sofascore 'year' format)
 # ---------------------
 
 def get_headers():
@@ -18,21 +18,25 @@ def get_headers():
         "Referer": "https://www.sofascore.com/",
     }
 
-def get_season_id_for_pl():
+def get_season_ids_for_pl():
+    """Sofascore season id for every TARGET_SEASONS entry that exists (one request)"""
     url = f"https://www.sofascore.com/api/v1/unique-tournament/{TOURNAMENT_ID}/seasons"
-    print(f"🔍 Looking for Season '{TARGET_SEASON}' in Premier League...")
+    print(f"🔍 Looking for Seasons {', '.join(TARGET_SEASONS)} in Premier League...")
     try:
         response = requests.get(url, headers=get_headers(), impersonate="chrome120", timeout=15)
         data = response.json()
+        season_ids = {}
         for season in data.get('seasons', []):
-            if season['year'] == TARGET_SEASON:
-                print(f"✅ Found Season ID: {season['id']}")
-                return season['id']
-        print(f"❌ Could not find season {TARGET_SEASON}")
-        return None
+            if season['year'] in TARGET_SEASONS:
+                print(f"✅ Found Season {season['year']}: ID {season['id']}")
+                season_ids[season['year']] = season['id']
+        for year in TARGET_SEASONS:
+            if year not in season_ids:
+                print(f"❌ Could not find season {year}")
+        return season_ids
     except Exception as e:
-        print(f"❌ Error finding season: {e}")
-        return None
+        print(f"❌ Error finding seasons: {e}")
+        return {}
 
 def get_matches_for_round(season_id, round_num):
     url = f"https://www.sofascore.com/api/v1/unique-tournament/{TOURNAMENT_ID}/season/{season_id}/events/round/{round_num}"
@@ -43,14 +47,11 @@ def get_matches_for_round(season_id, round_num):
         print(f"   ⚠️ Error fetching Round {round_num}: {e}")
         return None
 
-# --- MAIN EXECUTION ---
-print(f"--- Premier League {TARGET_SEASON} Scraper ---")
-
-season_id = get_season_id_for_pl()
-all_matches = []
-
-if season_id:
-    print("\n📥 Starting Round-by-Round Extraction...")
+def scrape_season(year, season_id):
+    """All played matches of one season, tagged with the stored season name ('23/24' -> '2023-24')"""
+    season_name = f"20{year[:2]}-{year[-2:]}"
+    matches = []
+    print(f"\n📥 Starting Round-by-Round Extraction for {year}...")
     
     for round_num in range(1, 39):
         print(f"   > Scraping Round {round_num}/38...", end="\r")
@@ -71,6 +72,7 @@ if season_id:
 
                 match_info = {
                     "match_id": event['id'],
+                    "season": season_name,
                     "round": round_num,
                     "date_timestamp": event.get('startTimestamp'),
                     "status": status_type,
@@ -78,17 +80,28 @@ if season_id:
                     "away_team": event['awayTeam']['name'],
                     "score": f"{event['homeScore'].get('display', 0)}-{event['awayScore'].get('display', 0)}"
                 }
-                all_matches.append(match_info)
+                matches.append(match_info)
         
         time.sleep(0.5)
+    return matches
 
-    print(f"\n\n✅ Extraction Complete!")
-    print(f"Total Matches Found: {len(all_matches)}")
-    
-    filename = "premier_league_23_24_matchs.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(all_matches, f, indent=4)
-    print(f"📂 Saved to {filename}")
+# --- MAIN EXECUTION ---
+print(f"--- Premier League {', '.join(TARGET_SEASONS)} Scraper ---")
+
+season_ids = get_season_ids_for_pl()
+
+if season_ids:
+    for year, season_id in season_ids.items():
+        all_matches = scrape_season(year, season_id)
+
+        print(f"\n\n✅ Extraction Complete for {year}!")
+        print(f"Total Matches Found: {len(all_matches)}")
+        
+        # e.g. premier_league_23_24_matchs.json, the name the importer looks for
+        filename = os.path.join(DATA_DIR, f"premier_league_{year.replace('/', '_')}_matchs.json")
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(all_matches, f, indent=4)
+        print(f"📂 Saved to {filename}")
 
 else:
-    print("Script stopped: Season ID not found.")
\ No newline at end of file
+    print("Script stopped: no Season ID found.")
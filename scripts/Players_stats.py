@@ -7,9 +7,10 @@ DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # --- CONFIGURATION ---
-INPUT_FILE = "premier_league_23_24_matchs.json" 
+TARGET_SEASONS = ["22/23", "23/24"]  # Same list as PL_seasons_matchs.py
 # CHANGED: Replaced '/' with '_' to avoid file creation errors
-OUTPUT_FILE = "premier_league_detailed_players_23_24.json"
+INPUT_FILE = os.path.join(DATA_DIR, "premier_league_{}_matchs.json")
+OUTPUT_FILE = os.path.join(DATA_DIR, "premier_league_detailed_players_{}.json")
 # ---------------------
 
 def get_headers():
@@ -27,7 +28,7 @@ def get_lineups(match_id):
     except:
         return None
 
-def extract_player_details(match_id, team_name, player_entry):
+def extract_player_details(match_id, season, team_name, player_entry):
     """
     Extracts the data but REMOVES 'rating' and 'ratingVersions'.
     """
@@ -44,6 +45,7 @@ def extract_player_details(match_id, team_name, player_entry):
     return {
         # --- Context ---
         "match_id": match_id,
+        "season": season,
         "team_name": team_name,
         
         # --- Player Identity ---
@@ -65,51 +67,65 @@ def extract_player_details(match_id, team_name, player_entry):
         "statistics": stats 
     }
 
-# --- MAIN EXECUTION ---
+def scrape_season(year):
+    """Lineup stats for every match of one season. Returns False if the user stopped the run."""
+    input_file = INPUT_FILE.format(year.replace('/', '_'))
+    output_file = OUTPUT_FILE.format(year.replace('/', '_'))
+    season_name = f"20{year[:2]}-{year[-2:]}"
 
-# 1. Load Match IDs
-if not os.path.exists(INPUT_FILE):
-    print(f"❌ Error: {INPUT_FILE} not found. Run the Season Scraper first.")
-    exit()
+    # 1. Load Match IDs
+    if not os.path.exists(input_file):
+        print(f"❌ Error: {input_file} not found. Run the Season Scraper first.")
+        return True
 
-with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-    matches = json.load(f)
+    with open(input_file, 'r', encoding='utf-8') as f:
+        matches = json.load(f)
 
-print(f"Loaded {len(matches)} matches. Starting Deep Extraction...")
-all_detailed_players = []
+    print(f"[{year}] Loaded {len(matches)} matches. Starting Deep Extraction...")
+    all_detailed_players = []
+    completed = True
 
-try:
-    for index, match in enumerate(matches):
-        m_id = match['match_id']
-        home = match['home_team']
-        away = match['away_team']
-        
-        # Optional: Skip postponed matches if the input file still has them
-        status = match.get('status', 'finished')
-        if status == 'postponed' or status == 'canceled':
-             print(f"[{index+1}/{len(matches)}] ⏩ SKIPPING (Postponed): {home} vs {away}")
-             continue
+    try:
+        for index, match in enumerate(matches):
+            m_id = match['match_id']
+            home = match['home_team']
+            away = match['away_team']
+            season = match.get('season', season_name)
+            
+            # Optional: Skip postponed matches if the input file still has them
+            status = match.get('status', 'finished')
+            if status == 'postponed' or status == 'canceled':
+                 print(f"[{index+1}/{len(matches)}] ⏩ SKIPPING (Postponed): {home} vs {away}")
+                 continue
 
-        print(f"[{index+1}/{len(matches)}] Fetching: {home} vs {away}...", end="\r")
-        
-        data = get_lineups(m_id)
-        
-        if data and data.get('confirmed'):
-            # Process Home Team
-            for p in data.get('home', {}).get('players', []):
-                all_detailed_players.append(extract_player_details(m_id, home, p))
+            print(f"[{index+1}/{len(matches)}] Fetching: {home} vs {away}...", end="\r")
+            
+            data = get_lineups(m_id)
             
-            # Process Away Team
-            for p in data.get('away', {}).get('players', []):
-                all_detailed_players.append(extract_player_details(m_id, away, p))
+            if data and data.get('confirmed'):
+                # Process Home Team
+                for p in data.get('home', {}).get('players', []):
+                    all_detailed_players.append(extract_player_details(m_id, season, home, p))
                 
-        time.sleep(1.0) # Safety delay
+                # Process Away Team
+                for p in data.get('away', {}).get('players', []):
+                    all_detailed_players.append(extract_player_details(m_id, season, away, p))
+                    
+            time.sleep(1.0) # Safety delay
+
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped by user. Saving data...")
+        completed = False
 
-except KeyboardInterrupt:
-    print("\n🛑 Stopped by user. Saving data...")
+    # Save to File
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(all_detailed_players, f, indent=4)
 
-# Save to File
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    json.dump(all_detailed_players, f, indent=4)
+    print(f"\n\n✅ Done! Saved detailed stats for {len(all_detailed_players)} players to {output_file}")
+    return completed
+
+# --- MAIN EXECUTION ---
 
-print(f"\n\n✅ Done! Saved detailed stats for {len(all_detailed_players)} players to {OUTPUT_FILE}")
\ No newline at end of file
+for year in TARGET_SEASONS:
+    if not scrape_season(year):
+        break
@@ -0,0 +1,47 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app.profile_store import PER90_STATS
+from app.similarity import PlayerSimilarity
+
+# Query latency of the similarity service over every player.
+# Uses the real season data with --graph, otherwise a synthetic matrix of the same shape.
+
+def synthetic(n_players, seed=0):
+    rng = np.random.default_rng(seed)
+    names = [f"Player {i}" for i in range(n_players)]
+    positions = ["GDDDMMMFF"[i % 9] for i in range(n_players)]
+    per90 = rng.gamma(2.0, 1.0, size=(n_players, len(PER90_STATS)))
+    return PlayerSimilarity(names, ["Team"] * n_players, positions, [2000] * n_players, per90)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark top-k similar player queries")
+    parser.add_argument("--players", type=int, default=600, help="synthetic player count")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", choices=["cosine", "euclidean"], default="cosine")
+    parser.add_argument("--graph", action="store_true", help="build from Neo4j instead of synthetic data")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.graph:
+        from app.similarity import get_similarity
+        service = get_similarity()
+    else:
+        service = synthetic(args.players)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for name in service.names:
+        t = time.perf_counter()
+        service.similar(name, k=args.k, metric=args.metric)
+        latencies.append((time.perf_counter() - t) * 1e6)
+    latencies.sort()
+
+    print(f"{len(service.names)} players x {service.matrix.shape[1]} features, built in {build_ms:.1f} ms")
+    print(f"top-{args.k} {args.metric}: median {statistics.median(latencies):.1f} us, "
+          f"p95 {latencies[int(0.95 * len(latencies))]:.1f} us, max {latencies[-1]:.1f} us")
@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app.season_snapshot import write_snapshot
+
+# Worker start-up cost of loading the season data from JSON vs the memory-mapped snapshot.
+# Each variant runs in a fresh interpreter; RSS is the resident size after loading minus
+# that of an interpreter that only imported the same modules.
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+INT_STATS = ["minutesPlayed", "touches", "totalPass", "accuratePass", "keyPass", "totalLongBalls",
+             "accurateLongBalls", "totalCross", "goals", "goalAssist", "totalShots", "totalTackle",
+             "interceptionWon", "totalClearance", "ballRecovery", "duelWon", "duelLost", "aerialWon",
+             "aerialLost", "fouls", "wasFouled", "saves"]
+FLOAT_STATS = ["expectedGoals", "expectedAssists", "goalsPrevented"]
+
+LOADERS = {
+    "baseline": "pass",
+    "json": (
+        "import json\n"
+        "from app.season_data import SeasonData\n"
+        "data = json.load(open(PATH + '.json'))\n"
+        "season = SeasonData(data['matches'], data['performances'])\n"
+    ),
+    "snapshot (open)": (
+        "from app.season_snapshot import SeasonSnapshot\n"
+        "snapshot = SeasonSnapshot(PATH + '.bin')\n"
+        "goals = int(snapshot.column('stat.goals').sum())\n"
+    ),
+    "snapshot (SeasonData)": (
+        "from app.season_snapshot import SeasonSnapshot\n"
+        "season = SeasonSnapshot(PATH + '.bin').to_season_data()\n"
+    ),
+    # what a worker actually does at start-up: the season data plus the indexes built from it
+    "json + indexes": (
+        "import json\n"
+        "from app.season_data import SeasonData\n"
+        "data = json.load(open(PATH + '.json'))\n"
+        "season = SeasonData(data['matches'], data['performances'])\n"
+        "ProfileStore.build(season), RollingForm.build(season)\n"
+    ),
+    "snapshot + indexes": (
+        "from app.season_snapshot import SeasonSnapshot\n"
+        "season = SeasonSnapshot(PATH + '.bin').to_season_data()\n"
+        "ProfileStore.build(season), RollingForm.build(season)\n"
+    ),
+}
+
+# module imports happen before the timer, so every variant pays (and is charged) the same
+MEASURE = """
+import json, sys, time
+import app.season_data, app.season_snapshot
+from app.profile_store import ProfileStore
+from app.rolling_form import RollingForm
+PATH = sys.argv[1]
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+# current resident set in KB (Linux)
+rss = next(int(line.split()[1]) for line in open("/proc/self/status") if line.startswith("VmRSS:"))
+print(elapsed, rss)
+"""
+
+def synthetic(seasons, players_per_side, seed=0):
+    rng = random.Random(seed)
+    teams = [f"Team {i}" for i in range(20)]
+    matches, performances = [], []
+    match_id = 1
+    for s in range(seasons):
+        season = f"20{20 + s}-{21 + s}"
+        for round_num in range(1, 39):
+            shuffled = rng.sample(teams, len(teams))
+            for home, away in zip(shuffled[::2], shuffled[1::2]):
+                matches.append({"id": match_id, "season": season, "round": round_num,
+                                "date": 1_600_000_000 + s * 31_536_000 + round_num * 604_800,
+                                "score": f"{rng.randint(0, 4)}-{rng.randint(0, 4)}", "home": home, "away": away})
+                for team in (home, away):
+                    for k in range(players_per_side):
+                        stats = {"team": team, "season": season, "is_sub": k >= 11}
+                        stats.update({key: rng.randint(0, 60) for key in INT_STATS})
+                        stats.update({key: round(rng.random(), 4) for key in FLOAT_STATS})
+                        player_id = teams.index(team) * 100 + k
+                        performances.append({"player_id": player_id, "name": f"Player {player_id}",
+                                             "slug": f"player-{player_id}", "position": "GDMF"[k % 4],
+                                             "match_id": match_id, "stats": stats})
+                match_id += 1
+    return matches, performances
+
+def measure(code, path, runs):
+    timings, rss = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", MEASURE.format(code=code), path],
+                             cwd=ROOT, check=True, capture_output=True, text=True).stdout.split()
+        timings.append(float(out[0]))
+        rss.append(int(out[1]))
+    return statistics.median(timings), statistics.median(rss)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark season data loading: JSON vs binary snapshot")
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--players-per-side", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    matches, performances = synthetic(args.seasons, args.players_per_side)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "season")
+        with open(path + ".json", "w", encoding="utf-8") as f:
+            json.dump({"matches": matches, "performances": performances}, f)
+        write_snapshot(path + ".bin", matches, performances)
+        print(f"{len(matches)} matches, {len(performances)} performances: "
+              f"JSON {os.path.getsize(path + '.json') / 1e6:.1f} MB, "
+              f"snapshot {os.path.getsize(path + '.bin') / 1e6:.1f} MB")
+
+        _, base_rss = measure(LOADERS["baseline"], path, args.runs)
+        for name, code in LOADERS.items():
+            if name == "baseline":
+                continue
+            seconds, rss = measure(code, path, args.runs)
+            print(f"{name:>22}: {seconds * 1000:8.1f} ms, {(rss - base_rss) / 1024:+6.1f} MB RSS "
+                  f"(median of {args.runs})")
@@ -0,0 +1,31 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Measures how long a fresh interpreter takes to import the API module,
+# i.e. the per-worker cost paid on every restart / scale-out.
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+def time_import(module, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark import time of the backend")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # baseline: bare interpreter start-up, subtracted from the import timings
+    base = statistics.median(time_import("sys", args.runs))
+    timings = time_import(args.module, args.runs)
+    print(f"import {args.module}: median {statistics.median(timings) - base:.3f}s "
+          f"(min {min(timings) - base:.3f}s, max {max(timings) - base:.3f}s, {args.runs} runs)")
+    print("For a per-module breakdown: python -X importtime -c 'import app.main'")
@@ -1,14 +1,35 @@
+import argparse
+import csv
+import glob
+import hashlib
 import json
 import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from neo4j import GraphDatabase
+from neo4j.exceptions import TransientError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app.season_snapshot import write_snapshot
+from app.seasons import normalize_season
 
 # --- CONFIGURATION ---
 URI = "" 
 AUTH = () 
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
-MATCHES_FILE = os.path.join(DATA_DIR, "premier_league_23_24_matchs.json")
-PLAYERS_FILE = os.path.join(DATA_DIR, "premier_league_detailed_players_23_24.json")
+# One pair of files per season, e.g. premier_league_23_24_matchs.json (written by the scrapers)
+MATCHES_FILE_PATTERN = os.path.join(DATA_DIR, "premier_league_{}_matchs.json")
+PLAYERS_FILE_PATTERN = os.path.join(DATA_DIR, "premier_league_detailed_players_{}.json")
+# Per-match content hashes from the last import (used by --incremental)
+MANIFEST_FILE = os.path.join(DATA_DIR, "import_manifest.json")
+# Memory-mapped copy of the imported data that API workers load instead of querying the graph
+SNAPSHOT_FILE = os.path.join(DATA_DIR, "season_snapshot.bin")
+DATASET_NAME = "premier_league"
 
 # --- ✅ CORRECTED MAPPING (CamelCase) ---
 # Now the 'Value' (Right side) matches what your AI expects.
@@ -67,6 +88,22 @@ STAT_MAPPING = {
     "penaltySave": "penaltySave"
 }
 
+# Column types for the neo4j-admin CSV headers. Anything not listed here is an int.
+FLOAT_STATS = {
+    "rating", "expectedGoals", "expectedAssists", "expectedGoalsOnTarget", "goalsPrevented"
+}
+BOOLEAN_STATS = {"is_sub"}
+
+# Season filters are on every generated query, so both sides are indexed
+SEASON_INDEXES = [
+    "CREATE INDEX match_season IF NOT EXISTS FOR (m:Match) ON (m.season)",
+    "CREATE INDEX played_in_season IF NOT EXISTS FOR ()-[r:PLAYED_IN]-() ON (r.season)",
+]
+
+# Parallel import tuning
+SHARED_NODE_BATCH = 500
+DEADLOCK_RETRIES = 5
+
 class FootballGraph:
     def __init__(self, uri, auth):
         self.driver = GraphDatabase.driver(uri, auth=auth)
@@ -74,6 +111,11 @@ class FootballGraph:
     def close(self):
         self.driver.close()
 
+    def create_indexes(self):
+        with self.driver.session() as session:
+            for statement in SEASON_INDEXES:
+                session.run(statement).consume()
+
     def load_matches(self, matches_data):
         with self.driver.session() as session:
             for match in matches_data:
@@ -90,13 +132,141 @@ class FootballGraph:
                     print(f"Processed {count} player records...", end="\r")
             print(f"\n✅ Imported {len(players_data)} player performances.")
 
+    def create_shared_nodes(self, players_data):
+        """
+        Preliminary pass for the parallel import: MERGE every Team and Player once,
+        so the workers only MATCH them and never race to create the same node.
+        """
+        teams = sorted({p['team_name'] for p in players_data})
+        players = {}
+        for p in players_data:
+            players.setdefault(p['player_id'], {
+                "id": p['player_id'], "name": p['name'], "slug": p['slug'],
+                "position": p['position'], "market_value": p.get('market_value', 0),
+                "country": p.get('country', 'Unknown'),
+            })
+        players = list(players.values())
+
+        with self.driver.session() as session:
+            session.execute_write(lambda tx: tx.run(
+                "UNWIND $teams AS name MERGE (:Team {name: name})", teams=teams).consume())
+            for i in range(0, len(players), SHARED_NODE_BATCH):
+                batch = players[i:i + SHARED_NODE_BATCH]
+                session.execute_write(lambda tx: tx.run("""
+                UNWIND $rows AS row
+                MERGE (p:Player {id: row.id})
+                ON CREATE SET
+                    p.name = row.name, p.slug = row.slug, p.position = row.position,
+                    p.market_value = row.market_value, p.country = row.country
+                """, rows=batch).consume())
+        print(f"✅ Created shared nodes: {len(teams)} teams, {len(players)} players.")
+
+    def load_players_parallel(self, players_data, workers=4):
+        """
+        Loads PLAYED_IN edges with `workers` concurrent sessions.
+        Rows are partitioned by match, so no two workers ever write edges of the same Match.
+        Returns per-worker stats (rows, matches, retries, seconds, rows_per_sec).
+        """
+        self.create_shared_nodes(players_data)
+
+        by_match = defaultdict(list)
+        for p in players_data:
+            by_match[p['match_id']].append({
+                "player_id": p['player_id'],
+                "props": self._performance_props(p),
+            })
+        partitions = [[] for _ in range(workers)]
+        for i, item in enumerate(by_match.items()):
+            partitions[i % workers].append(item)
+
+        total = len(players_data)
+        done = [0]
+        progress_lock = threading.Lock()
+
+        def run_worker(worker_id):
+            stats = {"worker": worker_id, "rows": 0, "matches": 0, "retries": 0}
+            start = time.perf_counter()
+            with self.driver.session() as session:
+                for match_id, rows in partitions[worker_id]:
+                    stats["retries"] += self._write_with_retry(
+                        session, self._create_match_performances, match_id, rows)
+                    stats["rows"] += len(rows)
+                    stats["matches"] += 1
+                    with progress_lock:
+                        done[0] += len(rows)
+                        print(f"Processed {done[0]}/{total} player records...", end="\r")
+            elapsed = time.perf_counter() - start
+            stats["seconds"] = round(elapsed, 2)
+            stats["rows_per_sec"] = round(stats["rows"] / elapsed, 1) if elapsed else 0.0
+            return stats
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run_worker, range(workers)))
+
+        print(f"\n✅ Imported {total} player performances with {workers} workers.")
+        for r in results:
+            print(f"   worker {r['worker']}: {r['rows']} rows / {r['matches']} matches in {r['seconds']}s "
+                  f"({r['rows_per_sec']} rows/s, {r['retries']} retries)")
+        return results
+
+    def remove_stale_performances(self, match_id, player_ids):
+        """Drops PLAYED_IN edges of a re-imported match whose player is no longer in its lineup"""
+        with self.driver.session() as session:
+            session.execute_write(lambda tx: tx.run("""
+            MATCH (p:Player)-[r:PLAYED_IN]->(:Match {id: $match_id})
+            WHERE NOT p.id IN $player_ids
+            DELETE r
+            """, match_id=match_id, player_ids=player_ids).consume())
+
+    def get_dataset_version(self):
+        """0 when the graph has no :Dataset node (nothing imported yet, or an older import)"""
+        with self.driver.session() as session:
+            record = session.run("MATCH (d:Dataset {name: $name}) RETURN d.version AS version",
+                                 name=DATASET_NAME).single()
+        return (record["version"] or 0) if record else 0
+
+    def set_dataset_version(self, version):
+        """Downstream caches compare this version to know when the data changed"""
+        with self.driver.session() as session:
+            session.execute_write(lambda tx: tx.run("""
+            MERGE (d:Dataset {name: $name})
+            SET d.version = $version, d.updatedAt = timestamp()
+            """, name=DATASET_NAME, version=version).consume())
+
+    @staticmethod
+    def _write_with_retry(session, work, *args):
+        """
+        execute_write already retries transient errors for a while; this adds a bounded
+        outer retry with jittered backoff for deadlocks that outlast it.
+        Returns how many retries were needed.
+        """
+        for attempt in range(DEADLOCK_RETRIES + 1):
+            try:
+                session.execute_write(work, *args)
+                return attempt
+            except TransientError:
+                if attempt == DEADLOCK_RETRIES:
+                    raise
+                time.sleep(random.uniform(0, 0.1 * 2 ** attempt))
+
+    @staticmethod
+    def _create_match_performances(tx, match_id, rows):
+        query = """
+        MATCH (m:Match {id: $match_id})
+        UNWIND $rows AS row
+        MATCH (p:Player {id: row.player_id})
+        MERGE (p)-[r:PLAYED_IN]->(m)
+        SET r = row.props
+        """
+        tx.run(query, match_id=match_id, rows=rows).consume()
+
     @staticmethod
     def _create_match_nodes(tx, m):
         # (Standard Match Import - No changes needed here)
         query = """
         MERGE (m:Match {id: $match_id})
         SET m.date = $date, m.round = $round, m.score = $score, 
-            m.slug = $slug, m.status = $status
+            m.slug = $slug, m.status = $status, m.season = $season
         MERGE (h:Team {name: $home_team})
         MERGE (a:Team {name: $away_team})
         MERGE (m)-[:HOME_TEAM]->(h)
@@ -109,11 +279,12 @@ class FootballGraph:
                score=m.get('score', '0-0'), 
                slug=m.get('slug', ''),
                status=m.get('status', 'finished'),
+               season=m.get('season'),
                home_team=m['home_team'], 
                away_team=m['away_team'])
 
     @staticmethod
-    def _create_player_performance(tx, p):
+    def _performance_props(p):
         raw_stats = p.get('statistics', {})
         
         # 1. Start with essential metadata
@@ -122,6 +293,8 @@ class FootballGraph:
             "team": p['team_name'],
             "is_sub": p.get('is_substitute', False)
         }
+        if p.get('season'):
+            relationship_props["season"] = p['season']
 
         # 2. Loop and Clean Keys
         for key, value in raw_stats.items():
@@ -134,6 +307,12 @@ class FootballGraph:
             
             relationship_props[clean_key] = value
 
+        return relationship_props
+
+    @staticmethod
+    def _create_player_performance(tx, p):
+        relationship_props = FootballGraph._performance_props(p)
+
         # 3. Save to Neo4j
         query = """
         MATCH (m:Match {id: $match_id})
@@ -144,7 +323,7 @@ class FootballGraph:
             p.market_value = $market_value, p.country = $country
 
         MERGE (p)-[r:PLAYED_IN]->(m)
-        SET r += $props
+        SET r = $props
         """
         
         tx.run(query, 
@@ -159,19 +338,416 @@ class FootballGraph:
                props=relationship_props
                )
 
+
+# --- BULK IMPORT FILES (neo4j-admin database import) ---
+# For a fresh database, writing CSVs and running the offline importer is much faster
+# than MERGE-ing row by row through FootballGraph.
+
+def _stat_columns():
+    """Ordered PLAYED_IN stat columns (clean keys) with their neo4j-admin types"""
+    columns = []
+    for clean_key in STAT_MAPPING.values():
+        if clean_key in BOOLEAN_STATS or clean_key in columns:
+            continue
+        columns.append(clean_key)
+    return [(key, "float" if key in FLOAT_STATS else "int") for key in columns]
+
+def _extra_stat_type(kinds):
+    """neo4j-admin type for a stat outside STAT_MAPPING, from the Python types of its values"""
+    if str in kinds or (bool in kinds and kinds & {int, float}):
+        return ""
+    if float in kinds:
+        return ":double"
+    if int in kinds:
+        return ":long"
+    return ":boolean"
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+def write_bulk_import_files(matches_data, players_data, out_dir, version=1):
+    """
+    Writes node/relationship CSVs for `neo4j-admin database import full`, including the
+    :Dataset node carrying `version` (the import creates a fresh database).
+    `players_data` is consumed in a single pass, so any iterable works
+    (a list from json.load or a streaming parser). Stats outside STAT_MAPPING keep their
+    raw name, like the MERGE path; PLAYED_IN's header goes in its own file, written after
+    the pass once every key has been seen.
+    Returns row counts per file.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stat_columns = _stat_columns()
+    stat_keys = {key for key, _ in stat_columns}
+    counts = {"matches": 0, "teams": 0, "players": 0, "played_in": 0,
+              "skipped_performances": 0, "extra_stats": 0}
+
+    def open_csv(name, header):
+        f = open(os.path.join(out_dir, name), "w", newline="", encoding="utf-8")
+        writer = csv.writer(f)
+        writer.writerow(header)
+        return f, writer
+
+    files = []
+    try:
+        f, match_w = open_csv("matches.csv", [":ID(Match)", "id:long", "season", "date:long", "round:int",
+                                              "score", "slug", "status", ":LABEL"])
+        files.append(f)
+        f, team_w = open_csv("teams.csv", ["name:ID(Team)", ":LABEL"])
+        files.append(f)
+        f, dataset_w = open_csv("dataset.csv", ["name:ID(Dataset)", "version:long", "updatedAt:long", ":LABEL"])
+        files.append(f)
+        dataset_w.writerow([DATASET_NAME, version, int(time.time() * 1000), "Dataset"])
+        f, player_w = open_csv("players.csv", [":ID(Player)", "id:long", "name", "slug", "position",
+                                               "market_value:long", "country", ":LABEL"])
+        files.append(f)
+        f, home_w = open_csv("home_team.csv", [":START_ID(Match)", ":END_ID(Team)", ":TYPE"])
+        files.append(f)
+        f, away_w = open_csv("away_team.csv", [":START_ID(Match)", ":END_ID(Team)", ":TYPE"])
+        files.append(f)
+        played_file = open(os.path.join(out_dir, "played_in.csv"), "w", newline="", encoding="utf-8")
+        files.append(played_file)
+        played_w = csv.writer(played_file)
+        extra_keys = {}  # raw stat name -> set of value types, in first-seen order
+        short_rows = False  # rows written before a later extra key widened the file
+
+        teams = set()
+        match_ids = set()
+        player_ids = set()
+
+        def write_team(name):
+            if name not in teams:
+                teams.add(name)
+                team_w.writerow([name, "Team"])
+
+        for m in matches_data:
+            match_id = m['match_id']
+            match_ids.add(match_id)
+            match_w.writerow([match_id, match_id, _csv_value(m.get('season')),
+                              _csv_value(m.get('date') or m.get('date_timestamp')),
+                              m['round'], m.get('score', '0-0'), m.get('slug', ''),
+                              m.get('status', 'finished'), "Match"])
+            write_team(m['home_team'])
+            write_team(m['away_team'])
+            home_w.writerow([match_id, m['home_team'], "HOME_TEAM"])
+            away_w.writerow([match_id, m['away_team'], "AWAY_TEAM"])
+        counts["matches"] = len(match_ids)
+
+        for p in players_data:
+            # Same behaviour as the MERGE path: performances for unknown matches are ignored
+            if p['match_id'] not in match_ids:
+                counts["skipped_performances"] += 1
+                continue
+
+            write_team(p['team_name'])
+            if p['player_id'] not in player_ids:
+                # First occurrence wins, like ON CREATE SET
+                player_ids.add(p['player_id'])
+                player_w.writerow([p['player_id'], p['player_id'], p['name'], p['slug'], p['position'],
+                                   _csv_value(p.get('market_value', 0)), p.get('country', 'Unknown'), "Player"])
+
+            stats = {}
+            for key, value in p.get('statistics', {}).items():
+                if isinstance(value, (dict, list)):
+                    continue
+                clean_key = STAT_MAPPING.get(key, key)
+                stats[clean_key] = value
+                if clean_key not in stat_keys and value is not None:
+                    if clean_key not in extra_keys:
+                        extra_keys[clean_key] = set()
+                        short_rows = short_rows or counts["played_in"] > 0
+                    extra_keys[clean_key].add(type(value))
+
+            played_w.writerow([p['player_id'], p['match_id'], _csv_value(p.get('season')), p['team_name'],
+                               _csv_value(p.get('is_substitute', False)), "PLAYED_IN"]
+                              + [_csv_value(stats.get(key)) for key, _ in stat_columns]
+                              + [_csv_value(stats.get(key)) for key in extra_keys])
+            counts["played_in"] += 1
+
+        counts["teams"] = len(teams)
+        counts["players"] = len(player_ids)
+        counts["extra_stats"] = len(extra_keys)
+        f, _ = open_csv("played_in_header.csv", [":START_ID(Player)", ":END_ID(Match)", "season", "team",
+                                                 "is_sub:boolean", ":TYPE"]
+                        + [f"{key}:{kind}" for key, kind in stat_columns]
+                        + [f"{key}{_extra_stat_type(kinds)}" for key, kinds in extra_keys.items()])
+        files.append(f)
+    finally:
+        for f in files:
+            f.close()
+
+    if short_rows:
+        # pad the rows written before the last extra key appeared to the full width
+        width = 6 + len(stat_columns) + len(extra_keys)
+        path = os.path.join(out_dir, "played_in.csv")
+        with open(path, newline="", encoding="utf-8") as src, \
+                open(path + ".tmp", "w", newline="", encoding="utf-8") as dst:
+            writer = csv.writer(dst)
+            for row in csv.reader(src):
+                writer.writerow(row + [""] * (width - len(row)))
+        os.replace(path + ".tmp", path)
+
+    return counts
+
+def bulk_import_command(out_dir, database="neo4j"):
+    """The neo4j-admin invocation matching the files written by write_bulk_import_files"""
+    path = lambda name: os.path.join(out_dir, name)
+    return (
+        f"neo4j-admin database import full {database} --overwrite-destination "
+        f"--nodes=Match={path('matches.csv')} --nodes=Team={path('teams.csv')} "
+        f"--nodes=Player={path('players.csv')} --nodes=Dataset={path('dataset.csv')} "
+        f"--relationships=HOME_TEAM={path('home_team.csv')} "
+        f"--relationships=AWAY_TEAM={path('away_team.csv')} "
+        f"--relationships=PLAYED_IN={path('played_in_header.csv')},{path('played_in.csv')}"
+    )
+
+
+# --- INCREMENTAL IMPORT ---
+
+def match_content_hash(match, lineup_rows):
+    """Stable hash of a match and all its lineup rows (row order does not matter)"""
+    rows = sorted(lineup_rows, key=lambda p: (str(p['team_name']), str(p['player_id'])))
+    payload = json.dumps({"match": match, "lineups": rows}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {"version": 0, "matches": {}}
+    return _load_json(path)
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def plan_incremental_import(matches_data, players_data, manifest):
+    """
+    Compares every match against the manifest.
+    Returns (changed matches, their player rows, new hashes for all matches, counts).
+    """
+    lineups = defaultdict(list)
+    for p in players_data:
+        lineups[p['match_id']].append(p)
+
+    known = manifest.get("matches", {})
+    hashes = {}
+    changed_matches = []
+    changed_players = []
+    counts = {"unchanged": 0, "changed": 0, "new": 0}
+
+    for m in matches_data:
+        key = str(m['match_id'])
+        digest = match_content_hash(m, lineups.get(m['match_id'], []))
+        hashes[key] = digest
+        if known.get(key) == digest:
+            counts["unchanged"] += 1
+            continue
+        counts["changed" if key in known else "new"] += 1
+        changed_matches.append(m)
+        changed_players.extend(lineups.get(m['match_id'], []))
+
+    return changed_matches, changed_players, hashes, counts
+
+def next_dataset_version(manifest, db=None):
+    """One past both the manifest's and the graph's version, so every import mode moves it forward"""
+    current = manifest.get("version", 0)
+    if db is not None:
+        current = max(current, db.get_dataset_version())
+    return current + 1
+
+def record_full_import(manifest, matches_data, players_data, version, manifest_path=MANIFEST_FILE,
+                       replace=False):
+    """
+    Stores the hashes of everything a full import wrote (replacing the old ones when the
+    database was recreated) and its version, so a later --incremental run starts from it.
+    """
+    _, _, hashes, _ = plan_incremental_import(matches_data, players_data, {"matches": {}})
+    manifest["matches"] = hashes if replace else {**manifest.get("matches", {}), **hashes}
+    manifest["version"] = version
+    save_manifest(manifest, manifest_path)
+
+def run_incremental_import(db, matches_data, players_data, workers=1, manifest_path=MANIFEST_FILE):
+    """Upserts only new or changed matches, then records the hashes and bumps the dataset version"""
+    manifest = load_manifest(manifest_path)
+    # the hashes describe the graph only if it still holds the version they were recorded at
+    # (a wiped or separately re-imported graph doesn't)
+    graph_version = db.get_dataset_version()
+    trusted = graph_version == manifest.get("version", 0)
+    if not trusted:
+        print(f"⚠️ Graph is at dataset version {graph_version}, manifest at {manifest.get('version', 0)}: "
+              "re-importing every match.")
+        manifest["matches"] = {}
+    changed_matches, changed_players, hashes, counts = plan_incremental_import(
+        matches_data, players_data, manifest)
+    print(f"Incremental import: {counts['new']} new, {counts['changed']} changed, "
+          f"{counts['unchanged']} unchanged matches.")
+
+    if not changed_matches:
+        print("✅ Nothing to import.")
+        # the version the API compares snapshots against
+        return graph_version
+
+    db.load_matches(changed_matches)
+    if workers > 1:
+        db.load_players_parallel(changed_players, workers=workers)
+    else:
+        db.load_players(changed_players)
+
+    previously_known = manifest.get("matches", {})
+    for m in changed_matches:
+        if not trusted or str(m['match_id']) in previously_known:
+            player_ids = [p['player_id'] for p in changed_players if p['match_id'] == m['match_id']]
+            db.remove_stale_performances(m['match_id'], player_ids)
+
+    manifest["matches"] = {**previously_known, **hashes}
+    manifest["version"] = next_dataset_version(manifest, db)
+    db.set_dataset_version(manifest["version"])
+    save_manifest(manifest, manifest_path)
+    print(f"✅ Dataset version is now {manifest['version']}.")
+    return manifest["version"]
+
+# --- SEASONS ---
+
+def season_name(file_key):
+    """'23_24' (file name) or '23/24' (Sofascore) -> '2023-24', the stored m.season / r.season"""
+    start, end = file_key.replace("/", "_").split("_")
+    return f"20{start[-2:]}-{end[-2:]}"
+
+def season_list(value):
+    """--seasons value: '2023-24', '23/24' or '2023/2024', comma-separated -> stored form"""
+    seasons = []
+    for item in value.split(","):
+        season = normalize_season(item.strip())
+        if not season:
+            raise argparse.ArgumentTypeError(f"'{item}' is not a season (e.g. 2023-24 or 23/24)")
+        seasons.append(season)
+    return seasons
+
+def season_files(seasons=None):
+    """(season, matches path, players path) for every season on disk, optionally filtered"""
+    prefix, suffix = MATCHES_FILE_PATTERN.split("{}")
+    found = []
+    for matches_path in sorted(glob.glob(MATCHES_FILE_PATTERN.format("*"))):
+        file_key = matches_path[len(prefix):-len(suffix)]
+        season = season_name(file_key)
+        if seasons and season not in seasons:
+            continue
+        found.append((season, matches_path, PLAYERS_FILE_PATTERN.format(file_key)))
+    return found
+
+def load_seasons(seasons=None):
+    """
+    Matches and player rows of every selected season, each tagged with its season
+    (older files written before the scrapers added the field get it from the file name).
+    """
+    matches, players = [], []
+    for season, matches_path, players_path in season_files(seasons):
+        season_matches = _load_json(matches_path)
+        season_players = _load_json(players_path) if os.path.exists(players_path) else []
+        for m in season_matches:
+            m.setdefault('season', season)
+        for p in season_players:
+            p.setdefault('season', season)
+        matches.extend(season_matches)
+        players.extend(season_players)
+        print(f"Loaded season {season}: {len(season_matches)} matches, {len(season_players)} player records.")
+    return matches, players
+
+# --- SNAPSHOT ---
+
+def write_season_snapshot(matches_data, players_data, version, path=SNAPSHOT_FILE):
+    """Writes what the graph holds after the import, in the row shape app/season_data.py reads"""
+    matches = [{
+        "id": m['match_id'], "season": m.get('season'), "round": m['round'],
+        "date": m.get('date') or m.get('date_timestamp'), "score": m.get('score', '0-0'),
+        "home": m['home_team'], "away": m['away_team'],
+    } for m in matches_data]
+    performances = [{
+        "player_id": p['player_id'], "name": p['name'], "slug": p['slug'], "position": p['position'],
+        "match_id": p['match_id'], "stats": FootballGraph._performance_props(p),
+    } for p in players_data]
+    counts = write_snapshot(path, matches, performances, version=version)
+    print(f"✅ Wrote season snapshot {path} (dataset version {version}): {counts}")
+
+def _load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import Premier League data into Neo4j")
+    parser.add_argument("--bulk-csv", metavar="DIR",
+                        help="write neo4j-admin import CSVs to DIR instead of loading through Bolt")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="load player performances with N concurrent sessions (partitioned by match)")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"only upsert matches whose content hash differs from {os.path.basename(MANIFEST_FILE)}")
+    parser.add_argument("--seasons", type=season_list,
+                        help="comma-separated seasons to import, e.g. 2022-23,2023-24 (default: every season in data/)")
+    parser.add_argument("--snapshot", action="store_true",
+                        help=f"also write {os.path.basename(SNAPSHOT_FILE)}, the binary season snapshot the API loads at start-up")
+    return parser.parse_args()
+
+def _snapshot_after_import(args, matches, players, version, replaced=False):
+    if not args.snapshot:
+        return
+    # a MERGE import adds to what the graph already holds, so its snapshot covers every season;
+    # a bulk import replaces the database, so it holds exactly what was imported
+    if args.seasons and not replaced:
+        matches, players = load_seasons()
+    write_season_snapshot(matches, players, version)
+
 if __name__ == "__main__":
+    args = parse_args()
+
+    matches, players = load_seasons(args.seasons)
+
+    if args.bulk_csv:
+        # the database is replaced, so this version (in dataset.csv) is what the API will see
+        manifest = load_manifest()
+        version = next_dataset_version(manifest)
+        counts = write_bulk_import_files(matches, players, args.bulk_csv, version=version)
+        print(f"✅ Wrote bulk import files to {args.bulk_csv}: {counts}")
+        if counts["extra_stats"]:
+            print(f"ℹ️ {counts['extra_stats']} stats outside STAT_MAPPING were kept under their raw names.")
+        print("Stop the database, then run:")
+        print(bulk_import_command(args.bulk_csv))
+        print("Then, with the database started, create the season indexes:")
+        for statement in SEASON_INDEXES:
+            print(f"  {statement};")
+        record_full_import(manifest, matches, players, version, replace=True)
+        print(f"✅ Dataset version will be {version}.")
+        _snapshot_after_import(args, matches, players, version, replaced=True)
+        raise SystemExit(0)
+
     db = FootballGraph(URI, AUTH)
+    db.create_indexes()
+
+    if args.incremental:
+        version = run_incremental_import(db, matches, players, workers=args.workers)
+        db.close()
+        _snapshot_after_import(args, matches, players, version)
+        raise SystemExit(0)
 
-    if os.path.exists(MATCHES_FILE):
-        with open(MATCHES_FILE, 'r', encoding='utf-8') as f:
-            matches = json.load(f)
-            print("Importing Matches...")
-            db.load_matches(matches)
+    if matches:
+        print("Importing Matches...")
+        db.load_matches(matches)
             
-    if os.path.exists(PLAYERS_FILE):
-        with open(PLAYERS_FILE, 'r', encoding='utf-8') as f:
-            players = json.load(f)
-            print("Importing Players...")
+    if players:
+        print("Importing Players...")
+        if args.workers > 1:
+            db.load_players_parallel(players, workers=args.workers)
+        else:
             db.load_players(players)
-            
-    db.close()
\ No newline at end of file
+
+    # a full re-import is a new dataset version too (retires any older snapshot)
+    manifest = load_manifest()
+    version = next_dataset_version(manifest, db)
+    db.set_dataset_version(version)
+    record_full_import(manifest, matches, players, version)
+    print(f"✅ Dataset version is now {version}.")
+    db.close()
+    _snapshot_after_import(args, matches, players, version)